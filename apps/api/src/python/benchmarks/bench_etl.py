@@ -0,0 +1,136 @@
+"""Benchmark del motor ETL sobre reportes FACT sintéticos.
+
+Cada caso corre en un proceso nuevo para medir el pico de memoria real:
+
+    python bench_etl.py --sizes 100 1000 10000 50000 --formats xlsx xls
+    python bench_etl.py --save-baseline baseline.json
+    python bench_etl.py --tolerance 0.2           # compara contra baseline.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIRECTORIO))
+
+from generar_reporte import MAX_FILAS, contar_filas, generar_reporte
+
+TAMANOS = [100, 1000, 10000, 50000]
+
+# Referencia versionada junto al benchmark (se regenera con --save-baseline)
+BASELINE = os.path.join(DIRECTORIO, 'baseline.json')
+
+def medir(file_path, perfil):
+    """Analiza un reporte en este proceso y devuelve tiempos y memoria (modo hijo)"""
+    from etl_engine import analizar_reporte
+    from etl_metrics import memoria_pico_mb
+
+    inicio = time.perf_counter()
+    cpu = time.process_time()
+    unidades = analizar_reporte(file_path, usar_cache=False, perfil=perfil)
+    wall = time.perf_counter() - inicio
+    cpu = time.process_time() - cpu
+
+    if isinstance(unidades, dict):
+        raise RuntimeError(unidades['error'])
+
+    return {'units': len(unidades), 'wall_s': wall, 'cpu_s': cpu, 'peak_rss_mb': memoria_pico_mb()}
+
+def nombre_caso(formato, unidades, transacciones):
+    return f"{formato}-{unidades}u-{transacciones}t"
+
+def correr_caso(directorio, formato, unidades, transacciones, perfil):
+    """Genera el reporte (si no existe) y lo mide en un proceso aparte"""
+    extension = '.' + formato
+    compacto = contar_filas(unidades, transacciones) > MAX_FILAS[extension]
+    if contar_filas(unidades, transacciones, compacto=True) > MAX_FILAS[extension]:
+        return {'skipped': f"{unidades} units do not fit in one {extension} sheet"}
+
+    ruta = os.path.join(directorio, nombre_caso(formato, unidades, transacciones) + extension)
+    if not os.path.exists(ruta):
+        generar_reporte(ruta, unidades, transacciones, compacto=compacto)
+    filas = contar_filas(unidades, transacciones, compacto)
+
+    salida = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--measure', ruta, '--layout', perfil],
+        capture_output=True, text=True, env={**os.environ, 'ETL_CACHE': '0'}
+    )
+    if salida.returncode != 0:
+        return {'error': salida.stderr.strip().splitlines()[-1] if salida.stderr.strip() else 'benchmark failed'}
+
+    medicion = json.loads(salida.stdout)
+    medicion['rows'] = filas
+    medicion['rows_per_s'] = filas / medicion['wall_s'] if medicion['wall_s'] else None
+    medicion['compact'] = compacto
+    return medicion
+
+def comparar(resultados, base, tolerancia):
+    """Lista de regresiones: casos más lentos o con más memoria que la base por encima de la tolerancia"""
+    regresiones = []
+    for caso, medicion in resultados.items():
+        anterior = base.get(caso)
+        if not anterior or 'wall_s' not in medicion or 'wall_s' not in anterior:
+            continue
+        for metrica in ('wall_s', 'peak_rss_mb'):
+            if medicion[metrica] > anterior[metrica] * (1 + tolerancia):
+                regresiones.append({
+                    'case': caso,
+                    'metric': metrica,
+                    'baseline': anterior[metrica],
+                    'current': medicion[metrica],
+                    'change': medicion[metrica] / anterior[metrica] - 1
+                })
+    return regresiones
+
+def imprimir_tabla(resultados):
+    print(f"{'case':<24} {'units':>7} {'rows':>9} {'wall_s':>8} {'rows/s':>10} {'rss_mb':>8}", file=sys.stderr)
+    for caso, m in resultados.items():
+        if 'wall_s' not in m:
+            print(f"{caso:<24} {m.get('skipped') or m.get('error')}", file=sys.stderr)
+            continue
+        print(f"{caso:<24} {m['units']:>7} {m['rows']:>9} {m['wall_s']:>8.2f} {m['rows_per_s']:>10.0f} {m['peak_rss_mb']:>8.1f}", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del motor ETL con reportes sintéticos")
+    parser.add_argument('--sizes', type=int, nargs='+', default=TAMANOS, help="Unidades por reporte")
+    parser.add_argument('--transactions', type=int, default=4, help="Movimientos por unidad")
+    parser.add_argument('--formats', nargs='+', choices=['xlsx', 'xls'], default=['xlsx'])
+    parser.add_argument('--layout', default='diprosoft', help="Perfil de formato")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'cartera-lc-bench'),
+                        help="Dónde guardar (y reutilizar) los reportes generados")
+    parser.add_argument('--baseline', default=BASELINE if os.path.isfile(BASELINE) else None,
+                        help="JSON de referencia contra el cual detectar regresiones (por defecto baseline.json)")
+    parser.add_argument('--no-baseline', dest='baseline', action='store_const', const=None, help="No comparar contra una referencia")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Empeoramiento aceptado (0.2 = 20%%)")
+    parser.add_argument('--save-baseline', help="Guardar los resultados como nueva referencia")
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(medir(args.measure, args.layout)))
+        sys.exit(0)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    resultados = {}
+    for formato in args.formats:
+        for unidades in args.sizes:
+            caso = nombre_caso(formato, unidades, args.transactions)
+            resultados[caso] = correr_caso(args.data_dir, formato, unidades, args.transactions, args.layout)
+    imprimir_tabla(resultados)
+
+    reporte = {'python': sys.version.split()[0], 'cases': resultados}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            base = json.load(f)['cases']
+        reporte['regressions'] = comparar(resultados, base, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, indent=2)
+
+    print(json.dumps(reporte, indent=2))
+    sys.exit(1 if reporte.get('regressions') else 0)
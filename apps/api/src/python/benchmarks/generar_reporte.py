@@ -0,0 +1,127 @@
+"""Generador de reportes FACT sintéticos con el mismo formato de bloques que
+`reportes-cartera/FACT ENE-26.xls` (cuentas de cobro de Diprosoft).
+
+    python generar_reporte.py salida.xlsx --units 5000 --transactions 4
+"""
+import argparse
+import random
+
+ESTRELLAS = '*' * 153
+
+# Filas máximas por hoja de cada formato
+MAX_FILAS = {'.xls': 65536, '.xlsx': 1048576}
+
+def _fila(celdas, ancho=10):
+    """Arma una fila de `ancho` columnas a partir de {columna: valor}"""
+    fila = [None] * ancho
+    for columna, valor in celdas.items():
+        fila[columna] = valor
+    return fila
+
+def filas_unidad(numero, rng, transacciones, compacto=False):
+    """Filas de la cuenta de cobro de una unidad, en las mismas columnas que el FACT real"""
+    prefijo, unidad = ('LOCAL', f"L{100 + numero}") if numero % 3 else ('OF', f"OF{200 + numero}")
+    cuota = float(rng.choice([555000, 927000, 985000, 1012000, 1032000, 1230000]))
+    saldo = float(rng.choice([0, cuota, cuota * 2, cuota * 4, rng.randint(1, 5000) * 1000]))
+    cuenta = f"{numero:05d}"
+
+    filas = [
+        _fila({0: '*******', 1: 'CENTRO COMERCIAL SINTETICO     -     NIT 900000000-0'}),
+        _fila({0: '******', 1: 'CL 1 2 3  -  5555555  -  sintetico@example.com'}),
+        _fila({0: ' ', 1: f"{prefijo}: {unidad}", 9: f"Cuenta de Cobro # {cuenta}"}),
+        _fila({0: ' ', 1: f"Copropietario: PROPIETARIO {numero} SAS", 9: 'Fecha: 01/Ene/2026'}),
+        _fila({0: ESTRELLAS}),
+        _fila({0: ' ', 1: 'Fecha', 2: 'Dcto', 3: 'Nro', 4: 'C o n c e p t o', 5: 'Valor', 7: 'Saldo', 9: 'Observaciones'}),
+        _fila({0: ESTRELLAS}),
+        _fila({0: ' ', 4: 'Saldo anterior', 8: saldo}),
+    ]
+
+    for _ in range(transacciones):
+        fecha = f"{rng.randint(1, 28):02d}/Dic/25"
+        nro = f"{rng.randint(1, 99999):05d}"
+        if rng.random() < 0.7:
+            valor = -float(rng.randint(1, 20) * 50000)
+            saldo += valor
+            filas.append(_fila({1: fecha, 2: 'Rec.de Caja', 3: nro, 4: 'Recibos de caja', 6: valor, 8: saldo, 9: f"RC# {nro}"}))
+        else:
+            valor = float(rng.randint(1000, 99999))
+            saldo += valor
+            filas.append(_fila({1: fecha, 2: 'Inter.xMora', 3: nro, 4: 'Intereses por mora', 6: valor, 8: saldo, 9: 'Interes mora. Diciembre/2'}))
+
+    saldo += cuota
+    filas += [
+        _fila({1: '01/Ene/26', 2: 'Factura', 3: cuenta, 4: 'Cuota administracion', 6: cuota, 8: saldo, 9: 'Factura. Enero/2026'}),
+        _fila({}),
+        _fila({}),
+        _fila({0: ESTRELLAS}),
+        _fila({0: ' ', 4: 'Total a pagar', 8: max(saldo, 0.0)}),
+        _fila({0: ESTRELLAS}),
+    ]
+    if not compacto:
+        filas += [
+            _fila({}),
+            _fila({0: '******', 1: 'FIRMA RESPONSABLE:   NOMBRE DE PRUEBA'}),
+            _fila({0: '*********', 1: 'Consignar cuenta corriente de recaudo BANCO PRUEBA Numero 000000000'}),
+            _fila({0: '*********', 1: 'Favor realizar el pago de su cuota mediante el pago referenciado.'}),
+            _fila({0: '*********'}),
+            _fila({0: '*********'}),
+            _fila({0: '***************', 1: 'www.diprosoft.com'}),
+            _fila({}),
+            _fila({}),
+        ]
+    return filas
+
+def iterar_filas(unidades, transacciones, semilla=0, compacto=False):
+    rng = random.Random(semilla)
+    for numero in range(unidades):
+        yield from filas_unidad(numero, rng, transacciones, compacto)
+
+def contar_filas(unidades, transacciones, compacto=False):
+    por_unidad = 14 + transacciones + (0 if compacto else 9)
+    return unidades * por_unidad
+
+def _escribir_xlsx(ruta, filas):
+    from openpyxl import Workbook
+
+    book = Workbook(write_only=True)
+    sheet = book.create_sheet('FACT')
+    for fila in filas:
+        sheet.append(fila)
+    book.save(ruta)
+
+def _escribir_xls(ruta, filas):
+    try:
+        import xlwt
+    except ImportError:
+        raise RuntimeError("xlwt is required to write .xls files (pip install xlwt)")
+
+    book = xlwt.Workbook()
+    sheet = book.add_sheet('FACT')
+    for i, fila in enumerate(filas):
+        for j, valor in enumerate(fila):
+            if valor is not None:
+                sheet.write(i, j, valor)
+    book.save(ruta)
+
+def generar_reporte(ruta, unidades, transacciones=4, semilla=0, compacto=False):
+    """Escribe un reporte sintético (.xls o .xlsx según la extensión) y devuelve su número de filas"""
+    extension = '.xls' if ruta.endswith('.xls') else '.xlsx'
+    filas = contar_filas(unidades, transacciones, compacto)
+    if filas > MAX_FILAS[extension]:
+        raise ValueError(f"{unidades} units need {filas} rows, more than the {MAX_FILAS[extension]} rows a {extension} sheet allows")
+
+    escribir = _escribir_xls if extension == '.xls' else _escribir_xlsx
+    escribir(ruta, iterar_filas(unidades, transacciones, semilla, compacto))
+    return filas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un reporte FACT sintético")
+    parser.add_argument('output', help="Archivo de salida (.xls o .xlsx)")
+    parser.add_argument('--units', type=int, default=1000)
+    parser.add_argument('--transactions', type=int, default=4, help="Movimientos por unidad")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compact', action='store_true', help="Sin pie de firma (menos filas por unidad)")
+    args = parser.parse_args()
+
+    filas = generar_reporte(args.output, args.units, args.transactions, args.seed, args.compact)
+    print(f"{args.output}: {args.units} units, {filas} rows")
@@ -0,0 +1,85 @@
+import argparse
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from etl_engine import PERFIL_DEFAULT, analizar_con_resumen
+from etl_unidades import a_json
+
+EXTENSIONES = ('.xls', '.xlsx')
+
+def buscar_reportes(patrones):
+    """Expande directorios y globs a la lista ordenada de reportes .xls/.xlsx"""
+    archivos = set()
+    for patron in patrones:
+        if os.path.isdir(patron):
+            candidatos = [os.path.join(patron, nombre) for nombre in os.listdir(patron)]
+        else:
+            candidatos = glob.glob(patron)
+        for ruta in candidatos:
+            nombre = os.path.basename(ruta)
+            # Ignorar archivos temporales de Excel (~$FACT.xlsx)
+            if nombre.lower().endswith(EXTENSIONES) and not nombre.startswith('~$') and os.path.isfile(ruta):
+                archivos.add(os.path.abspath(ruta))
+    return sorted(archivos)
+
+def procesar_archivo(file_path, directorio_salida, perfil=PERFIL_DEFAULT):
+    """Analiza un reporte y guarda su resultado; nunca lanza excepción para no cortar el lote"""
+    resumen = {'file': file_path}
+    try:
+        resultado, indicadores = analizar_con_resumen(file_path, perfil=perfil)
+    except Exception as e:
+        resumen['error'] = str(e)
+        return resumen
+
+    salida = os.path.join(directorio_salida, os.path.splitext(os.path.basename(file_path))[0] + '.json')
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2, default=a_json)
+    resumen.update(indicadores)
+    resumen['output'] = salida
+    return resumen
+
+def procesar_lote(archivos, directorio_salida, workers=None, perfil=PERFIL_DEFAULT):
+    """Procesa los reportes en paralelo y devuelve el resumen combinado"""
+    os.makedirs(directorio_salida, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        n = len(archivos)
+        resumenes = list(pool.map(procesar_archivo, archivos, [directorio_salida] * n, [perfil] * n))
+
+    combinado = {'units': 0, 'action_classes': {}, 'risk_status': {}, 'total_debt': 0.0, 'overdue_amount': 0.0, 'aging_histogram': {}}
+    for resumen in resumenes:
+        if 'error' in resumen:
+            continue
+        for clave, valor in combinado.items():
+            if isinstance(valor, dict):
+                for nombre, cantidad in resumen[clave].items():
+                    valor[nombre] = valor.get(nombre, 0) + cantidad
+            else:
+                combinado[clave] += resumen[clave]
+
+    return {
+        'files': len(resumenes),
+        'failed': sum(1 for r in resumenes if 'error' in r),
+        **combinado,
+        'results': resumenes
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analiza en paralelo un lote de reportes de cartera")
+    parser.add_argument('inputs', nargs='+', help="Directorios o globs con reportes .xls/.xlsx")
+    parser.add_argument('--out', required=True, help="Directorio donde guardar un JSON por reporte y resumen.json")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument('--layout', default=PERFIL_DEFAULT, help="Perfil de formato (nombre en perfiles/ o ruta a un JSON)")
+    args = parser.parse_args()
+
+    archivos = buscar_reportes(args.inputs)
+    if not archivos:
+        print(json.dumps({"error": "No input files found"}))
+        sys.exit(1)
+
+    resumen = procesar_lote(archivos, args.out, args.workers, args.layout)
+    with open(os.path.join(args.out, 'resumen.json'), 'w', encoding='utf-8') as f:
+        json.dump(resumen, f, indent=2)
+    print(json.dumps(resumen, indent=2))
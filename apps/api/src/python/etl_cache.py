@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import tempfile
+
+# Tamaño de lectura para calcular el hash del archivo
+BLOQUE_HASH = 1024 * 1024
+
+def hash_archivo(file_path):
+    """SHA-256 del contenido del archivo"""
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for bloque in iter(lambda: f.read(BLOQUE_HASH), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+class CacheResultados:
+    """Cache en disco de resultados del ETL, indexado por hash del archivo y versión del motor.
+
+    Cada entrada es un JSON; la fecha de modificación marca el último uso y se
+    eliminan las menos usadas cuando el directorio supera `max_bytes`.
+    """
+
+    def __init__(self, directorio, max_bytes, version):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def desde_entorno(cls, version):
+        """Configuración por variables de entorno (ETL_CACHE_DIR, ETL_CACHE_MAX_MB)"""
+        directorio = os.environ.get('ETL_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'cartera-lc-etl-cache')
+        max_mb = float(os.environ.get('ETL_CACHE_MAX_MB', '200'))
+        return cls(directorio, int(max_mb * 1024 * 1024), version)
+
+    def clave(self, file_path, variante=''):
+        """Clave de la entrada: hash del archivo, versión del motor y variante (perfil de formato)"""
+        clave = f"{hash_archivo(file_path)}-v{self.version}"
+        return f"{clave}-{variante}" if variante else clave
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + '.json')
+
+    def leer(self, clave):
+        """Devuelve el resultado guardado o None si no existe"""
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                resultado = json.load(f)
+            os.utime(ruta)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return resultado
+
+    def registrar(self, clave, unidades, default=None):
+        """Deja pasar las unidades de un iterable y las va escribiendo en el cache.
+
+        La entrada solo se publica si el iterable se consume completo, así un
+        análisis interrumpido no deja resultados parciales.
+        """
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            fd, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+        except OSError:
+            yield from unidades
+            return
+
+        completo = False
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write('[')
+                for i, unidad in enumerate(unidades):
+                    if i:
+                        f.write(', ')
+                    json.dump(unidad, f, default=default)
+                    yield unidad
+                f.write(']')
+            os.replace(temporal, self._ruta(clave))
+            completo = True
+            self.depurar()
+        finally:
+            if not completo and os.path.exists(temporal):
+                os.remove(temporal)
+
+    def depurar(self):
+        """Elimina las entradas menos usadas hasta quedar dentro del límite (LRU)"""
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if not nombre.endswith('.json'):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                info = os.stat(ruta)
+            except OSError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, ruta))
+
+        total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, ruta in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            total -= tamano
+
+    def estadisticas(self):
+        return {'hits': self.hits, 'misses': self.misses, 'dir': self.directorio}
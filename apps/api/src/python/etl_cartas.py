@@ -0,0 +1,569 @@
+"""Generación masiva de cartas de cobro en PDF.
+
+Toma las unidades del motor (reporte .xls/.xlsx o su salida JSON), elige la
+plantilla según `action_class` (las unidades AD no reciben carta) y reparte
+las cartas en lotes entre procesos. Cada worker carga las fuentes y compila
+las plantillas una sola vez; el resultado es un PDF combinado o un .zip con
+un archivo por carta, nombrado con el consecutivo como en la web:
+
+    python etl_cartas.py "FACT ENE-26.xls" --output cartas.zip --start AB=12
+"""
+import argparse
+import datetime
+import functools
+import io
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from etl_engine import PERFIL_DEFAULT, unidades_reporte
+from etl_formato import MESES, formato_fecha, formato_pesos
+from etl_unidades import Unidad
+
+DIRECTORIO_PLANTILLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plantillas')
+PLANTILLAS_DEFAULT = os.path.join(DIRECTORIO_PLANTILLAS, 'cartas.json')
+
+# Cartas por lote: por debajo de dos lotes no compensa iniciar procesos
+CARTAS_POR_LOTE = 100
+
+# Membrete y firma por defecto (mismas claves que la configuración del conjunto en la web)
+AJUSTES_DEFAULT = {
+    'companyName': 'Conjunto Residencial',
+    'companySubtitle': 'Residencial',
+    'nit': '-',
+    'address': '-',
+    'city': 'Cali',
+    'email': '',
+    'adminName': '',
+    'adminTitle': 'Administrador/a',
+    'adminEmail': '',
+    'adminPhone': '',
+    'footerText': '',
+    'ccText': 'CC: Archivo',
+}
+
+# Día del mes hasta el que se pide el pago (si ya pasó, el del mes siguiente)
+DIA_LIMITE = 22
+
+# Filas del desglose ({{TABLA_DESGLOSE}}): etiqueta y variable con el valor
+FILAS_DESGLOSE = (
+    ('Saldo Anterior Acumulado', 'SALDO_ANTERIOR'),
+    ('Cuota Ordinaria del Mes', 'CUOTA_ACTUAL'),
+    ('Intereses por Mora', 'INTERESES_MORA'),
+    ('Otros Conceptos / Ajustes', 'OTROS'),
+)
+
+PATRON_VARIABLE = re.compile(r'\{\{(\w+)\}\}')
+PATRON_NEGRITA = re.compile(r'\*\*(.+?)\*\*', re.S)
+MARCA_TABLA = '{{TABLA_DESGLOSE}}'
+
+def _reportlab():
+    try:
+        import reportlab.pdfgen.canvas
+        import reportlab.pdfbase.pdfmetrics
+        import reportlab.pdfbase.ttfonts
+        import reportlab.lib.pagesizes
+        import reportlab.rl_config
+    except ImportError:
+        raise RuntimeError("reportlab is required to render letters (pip install reportlab)")
+    return reportlab
+
+# --- Variables de la carta ---------------------------------------------------
+
+UNIDADES = ['', 'UN ', 'DOS ', 'TRES ', 'CUATRO ', 'CINCO ', 'SEIS ', 'SIETE ', 'OCHO ', 'NUEVE ']
+DECENAS = ['', 'DIEZ ', 'VEINTE ', 'TREINTA ', 'CUARENTA ', 'CINCUENTA ', 'SESENTA ', 'SETENTA ', 'OCHENTA ', 'NOVENTA ']
+DIEZ_DIEZ = ['DIEZ ', 'ONCE ', 'DOCE ', 'TRECE ', 'CATORCE ', 'QUINCE ', 'DIECISEIS ', 'DIECISIETE ', 'DIECIOCHO ', 'DIECINUEVE ']
+VEINTE_VEINTE = ['VEINTE ', 'VEINTIÚN ', 'VEINTIDOS ', 'VEINTITRES ', 'VEINTICUATRO ', 'VEINTICINCO ', 'VEINTISEIS ', 'VEINTISIETE ', 'VEINTIOCHO ', 'VEINTINUEVE ']
+CENTENAS = ['', 'CIENTO ', 'DOSCIENTOS ', 'TRESCIENTOS ', 'CUATROCIENTOS ', 'QUINIENTOS ', 'SEISCIENTOS ', 'SETECIENTOS ', 'OCHOCIENTOS ', 'NOVECIENTOS ']
+
+def _tres_digitos(n):
+    if n == 100:
+        return 'CIEN '
+    texto = CENTENAS[n // 100] if n > 100 else ''
+    resto = n % 100
+    if resto >= 30:
+        texto += DECENAS[resto // 10] + ('Y ' + UNIDADES[resto % 10] if resto % 10 else '')
+    elif resto >= 20:
+        texto += VEINTE_VEINTE[resto - 20]
+    elif resto >= 10:
+        texto += DIEZ_DIEZ[resto - 10]
+    else:
+        texto += UNIDADES[resto]
+    return texto
+
+def _menor_millon(n):
+    """Palabras de 1 a 999.999"""
+    miles, resto = divmod(n, 1000)
+    texto = ''
+    if miles:
+        texto += 'MIL ' if miles == 1 else _tres_digitos(miles) + 'MIL '
+    if resto:
+        texto += _tres_digitos(resto)
+    return texto
+
+def _entero(n):
+    """Palabras de un entero positivo; los millones y billones se leen como grupos de hasta seis cifras"""
+    billones, n = divmod(n, 10 ** 12)
+    millones, resto = divmod(n, 10 ** 6)
+    texto = ''
+    if billones:
+        texto += 'UN BILLÓN ' if billones == 1 else _entero(billones) + 'BILLONES '
+    if millones:
+        texto += 'UN MILLÓN ' if millones == 1 else _menor_millon(millones) + 'MILLONES '
+    if resto:
+        texto += _menor_millon(resto)
+    return texto
+
+def monto_en_letras(n):
+    """Monto en palabras para la carta (igual que numberToWords de la web): 1554749 -> 'UN MILLÓN ... PESOS M/CTE'.
+
+    Se redondea al peso como formato_pesos, para que las letras digan lo mismo que la cifra.
+    """
+    n = round(n)
+    if n < 0:
+        return 'MENOS ' + monto_en_letras(-n)
+    if n == 0:
+        return 'CERO PESOS M/CTE'
+    if n == 1:
+        return 'UN PESO M/CTE'
+    texto = _entero(n)
+    # "Un millón de pesos", pero "un millón doscientos mil pesos"
+    if n % 10 ** 6 == 0:
+        texto += 'DE '
+    return texto + 'PESOS M/CTE'
+
+def fecha_limite(fecha):
+    """El día DIA_LIMITE del mes de la carta, o del siguiente si ya pasó"""
+    anio, mes = fecha.year, fecha.month
+    if fecha.day > DIA_LIMITE:
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    return datetime.date(anio, mes, DIA_LIMITE)
+
+def variables_fecha(fecha):
+    """Variables comunes a todas las cartas del lote (fecha de emisión y de pago)"""
+    return {
+        'FECHA': formato_fecha(fecha),
+        'FECHA_LIMITE': formato_fecha(fecha_limite(fecha)),
+        'MES_COBRO': MESES[fecha.month - 1].upper(),
+    }
+
+def variables_unidad(unidad):
+    return {
+        'UNIDAD': unidad.unit_number,
+        'NOMBRE_PROPIETARIO': unidad.owner_name,
+        'SALDO_ANTERIOR': formato_pesos(unidad.prev_balance),
+        'CUOTA_ACTUAL': formato_pesos(unidad.current_fee),
+        'INTERESES_MORA': formato_pesos(unidad.interest),
+        'OTROS': formato_pesos(unidad.adjustments),
+        'TOTAL_PAGAR': formato_pesos(unidad.total_debt),
+        'TOTAL_LETRAS': monto_en_letras(unidad.total_debt),
+    }
+
+# --- Plantillas compiladas ---------------------------------------------------
+
+class PlantillaCompilada:
+    """Plantilla de un tipo de carta partida en párrafos de palabras y variables.
+
+    Cada renglón del contenido queda como lista de piezas (texto, negrita,
+    es_variable); el texto fijo ya viene con su ancho medido, así que al
+    rellenar una carta solo se miden los valores de las variables.
+    """
+
+    def __init__(self, tipo, config, medir):
+        self.tipo = tipo
+        self.titulo = config['title']
+        self.asunto = config['subject']
+        self.parrafos = [self._compilar(renglon.strip(), medir) for renglon in config['content'].split('\n')]
+
+    @staticmethod
+    def _compilar(renglon, medir):
+        if renglon == MARCA_TABLA:
+            return MARCA_TABLA
+        piezas = []
+        for k, tramo in enumerate(PATRON_NEGRITA.split(renglon)):
+            negrita = k % 2 == 1
+            for j, parte in enumerate(PATRON_VARIABLE.split(tramo)):
+                if j % 2 == 1:
+                    piezas.append((parte, negrita, True))
+                else:
+                    # Los espacios quedan pegados a la palabra que sigue ('de', ' la', ' unidad')
+                    for palabra in re.findall(r'\s*\S+|\s+$', parte):
+                        piezas.append((palabra, negrita, False))
+                        medir(palabra, negrita)
+        return piezas
+
+    def rellenar_asunto(self, datos):
+        return PATRON_VARIABLE.sub(lambda m: datos.get(m.group(1), m.group(0)), self.asunto).upper()
+
+    def palabras(self, parrafo, datos):
+        """Palabras del párrafo con las variables reemplazadas: [(texto, negrita)]"""
+        for texto, negrita, es_variable in parrafo:
+            if not es_variable:
+                yield texto, negrita
+                continue
+            valor = datos.get(texto)
+            if valor is None:
+                yield '{{' + texto + '}}', negrita
+                continue
+            for palabra in re.findall(r'\s*\S+', str(valor)):
+                yield palabra, negrita
+
+def cargar_plantillas(ruta=PLANTILLAS_DEFAULT):
+    """Configuración de plantillas por tipo de carta ({'CS': {...}, 'CP': {...}, 'AB': {...}})"""
+    if not os.path.isfile(ruta):
+        raise ValueError(f"Letter templates not found: {ruta}")
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)['templates']
+
+# --- Dibujo ------------------------------------------------------------------
+
+MARGEN = 71            # 2.5 cm
+MARGEN_INFERIOR = 57   # 2 cm
+TAMANO = 10.5
+INTERLINEA = 15
+
+class Dibujante:
+    """Fuentes registradas y plantillas compiladas de un proceso; dibuja cartas en un canvas"""
+
+    def __init__(self, plantillas, ajustes, fuente=None, fuente_negrita=None):
+        rl = _reportlab()
+        # Flujos comprimidos en binario: la codificación ASCII85 de reportlab es Python puro y la más lenta del guardado
+        rl.rl_config.useA85 = 0
+        self.canvas = rl.pdfgen.canvas.Canvas
+        self.ancho_pagina, self.alto_pagina = rl.lib.pagesizes.A4
+        self.ancho_texto = self.ancho_pagina - 2 * MARGEN
+        self.string_width = rl.pdfbase.pdfmetrics.stringWidth
+        self.normal, self.negrita = 'Helvetica', 'Helvetica-Bold'
+        if fuente:
+            rl.pdfbase.pdfmetrics.registerFont(rl.pdfbase.ttfonts.TTFont('Carta', fuente))
+            rl.pdfbase.pdfmetrics.registerFont(rl.pdfbase.ttfonts.TTFont('Carta-Negrita', fuente_negrita or fuente))
+            self.normal, self.negrita = 'Carta', 'Carta-Negrita'
+        self.ajustes = dict(AJUSTES_DEFAULT, **(ajustes or {}))
+        self.plantillas = {tipo: PlantillaCompilada(tipo, config, self.medir) for tipo, config in plantillas.items()}
+
+    def fuente(self, negrita):
+        return self.negrita if negrita else self.normal
+
+    @functools.lru_cache(maxsize=65536)
+    def medir(self, texto, negrita, tamano=TAMANO):
+        return self.string_width(texto, self.fuente(negrita), tamano)
+
+    def documento(self, salida, titulo):
+        c = self.canvas(salida, pagesize=(self.ancho_pagina, self.alto_pagina))
+        c.setTitle(titulo)
+        c.setAuthor(self.ajustes['companyName'])
+        return c
+
+    def carta(self, c, tipo, consecutivo, datos):
+        """Dibuja una carta completa (una o más páginas) en el canvas `c`"""
+        plantilla = self.plantillas[tipo]
+        a = self.ajustes
+        self._membrete(c)
+        y = self.alto_pagina - MARGEN - 80
+
+        c.setFont(self.normal, TAMANO)
+        c.drawString(MARGEN, y, f"{a['city']}, {datos['FECHA']}")
+        c.setFont(self.negrita, TAMANO)
+        c.drawRightString(self.ancho_pagina - MARGEN, y, f"Ref: {plantilla.titulo}")
+        c.setFont(self.normal, TAMANO)
+        c.drawRightString(self.ancho_pagina - MARGEN, y - INTERLINEA, f"No. {tipo}-{consecutivo:04d}")
+        y -= 3 * INTERLINEA
+
+        c.drawString(MARGEN, y, 'Señor(a)')
+        c.setFont(self.negrita, TAMANO)
+        c.drawString(MARGEN, y - INTERLINEA, datos['NOMBRE_PROPIETARIO'])
+        c.setFont(self.normal, TAMANO)
+        c.drawString(MARGEN, y - 2 * INTERLINEA, f"Unidad {datos['UNIDAD']}")
+        y -= 4 * INTERLINEA
+
+        c.setFont(self.negrita, TAMANO)
+        for renglon in self._renglones([(palabra, True) for palabra in re.findall(r'\s*\S+', plantilla.rellenar_asunto(datos))]):
+            y = self._espacio(c, y, INTERLINEA)
+            ancho = sum(self.medir(texto, negrita) for texto, negrita in renglon)
+            self._renglon(c, (self.ancho_pagina - ancho) / 2, y, renglon)
+            y -= INTERLINEA
+        y -= INTERLINEA
+
+        for parrafo in plantilla.parrafos:
+            if parrafo == MARCA_TABLA:
+                y = self._desglose(c, y, datos)
+            elif not parrafo:
+                y -= INTERLINEA / 2
+            else:
+                for renglon in self._renglones(plantilla.palabras(parrafo, datos)):
+                    y = self._espacio(c, y, INTERLINEA)
+                    self._renglon(c, MARGEN, y, renglon)
+                    y -= INTERLINEA
+
+        y = self._espacio(c, y - 2 * INTERLINEA, 6 * INTERLINEA)
+        c.setFont(self.normal, TAMANO)
+        c.drawString(MARGEN, y, 'Atentamente,')
+        y -= 3 * INTERLINEA
+        c.line(MARGEN, y + INTERLINEA - 2, MARGEN + 180, y + INTERLINEA - 2)
+        c.setFont(self.negrita, TAMANO)
+        c.drawString(MARGEN, y, a['adminName'] or a['adminTitle'])
+        c.setFont(self.normal, 9)
+        lineas = [a['adminTitle'] if a['adminName'] else '', a['companyName'],
+                  ' | '.join(v for v in (a['adminPhone'], a['adminEmail']) if v), a['ccText']]
+        for linea in filter(None, lineas):
+            y -= 12
+            c.drawString(MARGEN, y, linea)
+        self._pie(c)
+        c.showPage()
+
+    def _membrete(self, c):
+        a = self.ajustes
+        centro = self.ancho_pagina / 2
+        tope = self.alto_pagina - MARGEN + 20
+        c.setFont(self.negrita, 8)
+        c.drawCentredString(centro, tope, a['companySubtitle'].upper())
+        c.setFont(self.negrita, 20)
+        c.drawCentredString(centro, tope - 24, a['companyName'].upper())
+        c.setFont(self.normal, 9)
+        c.drawCentredString(centro, tope - 40, f"NIT: {a['nit']}")
+        c.line(MARGEN, tope - 50, self.ancho_pagina - MARGEN, tope - 50)
+
+    def _pie(self, c):
+        a = self.ajustes
+        c.setFont(self.normal, 8)
+        centro = self.ancho_pagina / 2
+        c.drawCentredString(centro, MARGEN_INFERIOR - 20, ' | '.join(v for v in (a['address'], a['email']) if v and v != '-'))
+        if a['footerText']:
+            c.drawCentredString(centro, MARGEN_INFERIOR - 30, a['footerText'])
+
+    def _espacio(self, c, y, alto):
+        """Pasa a una página nueva si no caben `alto` puntos; devuelve la y donde seguir"""
+        if y - alto >= MARGEN_INFERIOR:
+            return y
+        self._pie(c)
+        c.showPage()
+        return self.alto_pagina - MARGEN
+
+    def _renglones(self, palabras):
+        """Reparte las palabras en renglones del ancho del texto"""
+        renglon, ancho = [], 0.0
+        for texto, negrita in palabras:
+            medida = self.medir(texto, negrita)
+            if renglon and ancho + medida > self.ancho_texto:
+                yield renglon
+                texto = texto.lstrip()
+                medida = self.medir(texto, negrita)
+                renglon, ancho = [], 0.0
+            elif not renglon:
+                texto = texto.lstrip()
+                medida = self.medir(texto, negrita)
+            renglon.append((texto, negrita))
+            ancho += medida
+        if renglon:
+            yield renglon
+
+    def _renglon(self, c, x, y, renglon):
+        # Un textOut por tramo de la misma fuente, no por palabra
+        objeto = c.beginText(x, y)
+        tramo, actual = [], None
+        for texto, negrita in renglon:
+            if negrita is not actual and tramo:
+                objeto.setFont(self.fuente(actual), TAMANO)
+                objeto.textOut(''.join(tramo))
+                tramo = []
+            tramo.append(texto)
+            actual = negrita
+        objeto.setFont(self.fuente(actual), TAMANO)
+        objeto.textOut(''.join(tramo))
+        c.drawText(objeto)
+
+    def _desglose(self, c, y, datos):
+        filas = [(etiqueta, datos[variable], False) for etiqueta, variable in FILAS_DESGLOSE]
+        filas.append(('Total Neto Exigible', datos['TOTAL_PAGAR'], True))
+        y = self._espacio(c, y, (len(filas) + 1) * 18)
+        izquierda, derecha = MARGEN + 20, self.ancho_pagina - MARGEN - 20
+        c.line(izquierda, y + 12, derecha, y + 12)
+        for etiqueta, valor, total in filas:
+            if total:
+                c.line(izquierda, y + 12, derecha, y + 12)
+            c.setFont(self.fuente(total), TAMANO)
+            c.drawString(izquierda + 6, y, etiqueta)
+            c.drawRightString(derecha - 6, y, valor)
+            y -= 18
+        c.line(izquierda, y + 12, derecha, y + 12)
+        return y - INTERLINEA / 2
+
+# Estado de cada worker: se arma una vez en el inicializador del pool
+_dibujante = None
+
+def iniciar_worker(plantillas, ajustes, fuente=None, fuente_negrita=None):
+    global _dibujante
+    _dibujante = Dibujante(plantillas, ajustes, fuente, fuente_negrita)
+
+def renderizar_lote(cartas, por_archivo):
+    """Dibuja un lote de cartas [(tipo, consecutivo, datos, archivo, monto)].
+
+    Devuelve un PDF con todas las cartas del lote, o con `por_archivo` una
+    lista de (archivo, PDF) con un documento por carta.
+    """
+    if por_archivo:
+        archivos = []
+        for tipo, consecutivo, datos, archivo, _ in cartas:
+            salida = io.BytesIO()
+            c = _dibujante.documento(salida, f"{tipo}-{consecutivo} {datos['UNIDAD']}")
+            _dibujante.carta(c, tipo, consecutivo, datos)
+            c.save()
+            archivos.append((archivo, salida.getvalue()))
+        return archivos
+    salida = io.BytesIO()
+    c = _dibujante.documento(salida, 'Cartas de cobro')
+    for tipo, consecutivo, datos, _, _ in cartas:
+        _dibujante.carta(c, tipo, consecutivo, datos)
+    c.save()
+    return salida.getvalue()
+
+def combinar_pdfs(documentos, salida):
+    """Une los PDF de los lotes en uno solo (sin volver a dibujar las páginas)"""
+    if len(documentos) == 1:
+        salida.write(documentos[0])
+        return
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        raise RuntimeError("pypdf is required to merge letters into one PDF (pip install pypdf)")
+    escritor = PdfWriter()
+    for documento in documentos:
+        escritor.append(io.BytesIO(documento))
+    escritor.write(salida)
+
+# --- Orquestación ------------------------------------------------------------
+
+def nombre_archivo(tipo, consecutivo, unidad, marca):
+    """Nombre de la carta como los de la web: AB-1_L102_202512082146.pdf"""
+    return f"{tipo}-{consecutivo}_{re.sub(r'[^A-Za-z0-9-]+', '', unidad)}_{marca}.pdf"
+
+def planificar_cartas(unidades, tipos, inicio=None, fecha=None):
+    """Cartas a generar en el orden del reporte, con su consecutivo por tipo.
+
+    `tipos` son los tipos con plantilla (las demás clases, como AD, se omiten)
+    e `inicio` el primer consecutivo de cada tipo ({'CS': 12}).
+    """
+    fecha = fecha or datetime.date.today()
+    marca = datetime.datetime.now().strftime('%Y%m%d%H%M')
+    comunes = variables_fecha(fecha)
+    siguiente = {tipo: (inicio or {}).get(tipo, 1) for tipo in tipos}
+    cartas = []
+    for unidad in unidades:
+        tipo = unidad.action_class
+        if tipo not in siguiente:
+            continue
+        consecutivo = siguiente[tipo]
+        siguiente[tipo] += 1
+        datos = dict(comunes, **variables_unidad(unidad))
+        cartas.append((tipo, consecutivo, datos, nombre_archivo(tipo, consecutivo, unidad.unit_number, marca), unidad.total_debt))
+    return cartas, siguiente
+
+def generar_cartas(cartas, salida, plantillas, ajustes=None, workers=None, fuente=None, fuente_negrita=None):
+    """Dibuja las cartas planificadas y escribe `salida` (.pdf combinado o .zip de cartas)"""
+    por_archivo = salida.lower().endswith('.zip')
+    workers = workers or os.cpu_count() or 1
+    # Lotes parejos entre workers, sin bajar de CARTAS_POR_LOTE
+    tamano = max(CARTAS_POR_LOTE, -(-len(cartas) // (workers * 4)))
+    lotes = [cartas[i:i + tamano] for i in range(0, len(cartas), tamano)]
+    inicializacion = (plantillas, ajustes, fuente, fuente_negrita)
+
+    if workers > 1 and len(lotes) > 1:
+        with ProcessPoolExecutor(min(workers, len(lotes)), initializer=iniciar_worker, initargs=inicializacion) as pool:
+            resultados = list(pool.map(renderizar_lote, lotes, [por_archivo] * len(lotes)))
+    else:
+        iniciar_worker(*inicializacion)
+        resultados = [renderizar_lote(lote, por_archivo) for lote in lotes]
+
+    directorio = os.path.dirname(os.path.abspath(salida))
+    os.makedirs(directorio, exist_ok=True)
+    with open(salida, 'wb') as f:
+        if por_archivo:
+            # Los PDF ya van comprimidos: se guardan sin volver a comprimir
+            with zipfile.ZipFile(f, 'w', zipfile.ZIP_STORED) as archivo:
+                for lote in resultados:
+                    for nombre, documento in lote:
+                        archivo.writestr(nombre, documento)
+        else:
+            combinar_pdfs([documento for documento in resultados if documento], f)
+    return len(lotes)
+
+def unidades_entrada(file_path, perfil=PERFIL_DEFAULT):
+    """Unidades de un reporte .xls/.xlsx o de una salida JSON del motor (lista o {"units": [...]})"""
+    if not file_path.lower().endswith('.json'):
+        return list(unidades_reporte(file_path, perfil=perfil))
+    with open(file_path, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    if isinstance(datos, dict):
+        if 'error' in datos:
+            raise ValueError(datos['error'])
+        datos = datos.get('units', datos.get('data', []))
+    return [Unidad.desde_dict(unidad) for unidad in datos]
+
+def leer_inicio(valores):
+    """['CS=12', 'AB=3'] -> {'CS': 12, 'AB': 3}"""
+    inicio = {}
+    for valor in valores or []:
+        tipo, _, numero = valor.partition('=')
+        if not numero.isdigit():
+            raise ValueError(f"Invalid start '{valor}' (expected TYPE=NUMBER)")
+        inicio[tipo.strip().upper()] = int(numero)
+    return inicio
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera las cartas de cobro de un periodo (PDF combinado o .zip por unidad)")
+    parser.add_argument('file', help="Reporte .xls/.xlsx o salida JSON del motor")
+    parser.add_argument('--output', required=True, help="Archivo de salida: .pdf (combinado) o .zip (una carta por unidad)")
+    parser.add_argument('--templates', default=PLANTILLAS_DEFAULT, help="JSON de plantillas por tipo de carta")
+    parser.add_argument('--settings', help="JSON con membrete y firma (companyName, nit, adminName, ...)")
+    parser.add_argument('--types', help="Tipos a generar separados por coma (por defecto todos los de las plantillas)")
+    parser.add_argument('--start', action='append', metavar='TYPE=N', help="Primer consecutivo de un tipo (p. ej. --start CS=12)")
+    parser.add_argument('--date', help="Fecha de las cartas YYYY-MM-DD (por defecto hoy)")
+    parser.add_argument('--font', help="Fuente TTF para el texto (por defecto Helvetica)")
+    parser.add_argument('--font-bold', help="Fuente TTF para las negritas")
+    parser.add_argument('--workers', type=int, help="Procesos para dibujar (por defecto uno por CPU)")
+    parser.add_argument('--layout', default=PERFIL_DEFAULT, help="Perfil de formato (nombre en perfiles/ o ruta a un JSON)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(json.dumps({"error": f"File not found: {args.file}"}))
+        sys.exit(1)
+    try:
+        inicio_reloj = time.perf_counter()
+        plantillas = cargar_plantillas(args.templates)
+        if args.types:
+            pedidos = [tipo.strip().upper() for tipo in args.types.split(',')]
+            desconocidos = [tipo for tipo in pedidos if tipo not in plantillas]
+            if desconocidos:
+                raise ValueError(f"No template for letter types: {', '.join(desconocidos)}")
+            plantillas = {tipo: plantillas[tipo] for tipo in pedidos}
+        ajustes = None
+        if args.settings:
+            with open(args.settings, 'r', encoding='utf-8') as f:
+                ajustes = json.load(f)
+        fecha = datetime.date.fromisoformat(args.date) if args.date else None
+
+        cartas, siguiente = planificar_cartas(unidades_entrada(args.file, args.layout), list(plantillas), leer_inicio(args.start), fecha)
+        lotes = generar_cartas(cartas, args.output, plantillas, ajustes, args.workers, args.font, args.font_bold) if cartas else 0
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+
+    por_tipo = {}
+    for tipo, *_ in cartas:
+        por_tipo[tipo] = por_tipo.get(tipo, 0) + 1
+    print(json.dumps({
+        'output': os.path.abspath(args.output) if cartas else None,
+        'letters': [
+            {'consecutive': f"{tipo}-{consecutivo:04d}", 'type': tipo, 'unit_number': datos['UNIDAD'],
+             'owner_name': datos['NOMBRE_PROPIETARIO'], 'amount': monto, 'file': archivo}
+            for tipo, consecutivo, datos, archivo, monto in cartas
+        ],
+        'by_type': por_tipo,
+        'next_consecutive': siguiente,
+        'batches': lotes,
+        'elapsed_ms': round((time.perf_counter() - inicio_reloj) * 1000, 1)
+    }, indent=2, ensure_ascii=False))
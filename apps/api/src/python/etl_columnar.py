@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import sys
+
+from etl_cache import hash_archivo
+from etl_engine import PERFIL_DEFAULT, unidades_reporte
+from etl_probe import periodo_desde_nombre
+from etl_unidades import CAMPOS_ANALISIS, CAMPOS_FINANCIEROS
+
+FORMATOS = {'parquet': 'parquet', 'arrow': 'ipc'}
+PARTICIONES = ['complex', 'period']
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError:
+        raise RuntimeError("pyarrow is required for the columnar export (pip install pyarrow)")
+    return pyarrow
+
+def esquema():
+    """Columnas de la tabla: una fila por unidad con financials/analysis aplanados"""
+    pa = _pyarrow()
+    return pa.schema([
+        ('complex', pa.string()),
+        ('period', pa.string()),
+        ('source_sha256', pa.string()),
+        ('unit_number', pa.string()),
+        ('owner_name', pa.string()),
+        ('prev_balance', pa.float64()),
+        ('current_fee', pa.float64()),
+        ('interest', pa.float64()),
+        ('adjustments', pa.float64()),
+        ('total_debt', pa.float64()),
+        ('overdue_amount', pa.float64()),
+        ('months_overdue', pa.float64()),
+        ('risk_status', pa.string()),
+        ('action_class', pa.string()),
+    ])
+
+def tabla_unidades(unidades, complejo, periodo, sha):
+    """Convierte las unidades del motor en una tabla Arrow tipada"""
+    pa = _pyarrow()
+    schema = esquema()
+    unidades = list(unidades)
+    columnas = {}
+    for campo in ('unit_number', 'owner_name') + CAMPOS_FINANCIEROS + CAMPOS_ANALISIS:
+        columnas[campo] = [getattr(unidad, campo) for unidad in unidades]
+    n = len(unidades)
+    columnas['complex'] = [complejo] * n
+    columnas['period'] = [periodo] * n
+    columnas['source_sha256'] = [sha] * n
+    return pa.table(columnas, schema=schema)
+
+def exportar_reporte(file_path, destino, complejo, periodo=None, formato='parquet', perfil=PERFIL_DEFAULT):
+    """Analiza un reporte y escribe sus unidades en la partición complex=/period= de `destino`.
+
+    Volver a exportar el mismo complejo y periodo reemplaza esa partición; las
+    demás no se tocan, así el historial crece mes a mes.
+    """
+    pa = _pyarrow()
+    periodo = periodo or periodo_desde_nombre(file_path)
+    if not periodo:
+        raise ValueError(f"Cannot infer the period from '{os.path.basename(file_path)}'; pass --period YYYY-MM")
+
+    tabla = tabla_unidades(unidades_reporte(file_path, perfil=perfil), complejo, periodo, hash_archivo(file_path))
+    pa.dataset.write_dataset(
+        tabla,
+        destino,
+        format=FORMATOS[formato],
+        partitioning=PARTICIONES,
+        partitioning_flavor='hive',
+        existing_data_behavior='delete_matching',
+        basename_template='unidades-{i}.' + ('parquet' if formato == 'parquet' else 'arrow')
+    )
+    return {'complex': complejo, 'period': periodo, 'units': tabla.num_rows, 'output': destino}
+
+def leer_historial(destino, complejo=None, desde=None, hasta=None, columnas=None, formato='parquet'):
+    """Lee el historial filtrando por complejo y rango de periodos sin abrir las demás particiones"""
+    pa = _pyarrow()
+    ds = pa.dataset
+    dataset = ds.dataset(destino, format=FORMATOS[formato], partitioning='hive', schema=esquema())
+    filtro = None
+    for condicion in (
+        ds.field('complex') == complejo if complejo else None,
+        ds.field('period') >= desde if desde else None,
+        ds.field('period') <= hasta if hasta else None,
+    ):
+        if condicion is not None:
+            filtro = condicion if filtro is None else filtro & condicion
+    return dataset.to_table(columns=columnas, filter=filtro)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta las unidades de un reporte a un historial columnar (Parquet/Arrow)")
+    parser.add_argument('file', help="Reporte .xls/.xlsx a analizar")
+    parser.add_argument('--out', required=True, help="Directorio del historial (particionado por complex/period)")
+    parser.add_argument('--complex', required=True, help="Identificador del conjunto (p. ej. ciudad-jardin)")
+    parser.add_argument('--period', help="Periodo YYYY-MM (por defecto se toma del nombre: 'FACT ENE-26.xls' -> 2026-01)")
+    parser.add_argument('--format', choices=list(FORMATOS), default='parquet')
+    parser.add_argument('--layout', default=PERFIL_DEFAULT, help="Perfil de formato (nombre en perfiles/ o ruta a un JSON)")
+    args = parser.parse_args()
+
+    try:
+        resumen = exportar_reporte(args.file, args.out, args.complex, args.period, args.format, args.layout)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+    print(json.dumps(resumen, indent=2))
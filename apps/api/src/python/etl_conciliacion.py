@@ -0,0 +1,249 @@
+import argparse
+import collections
+import json
+import os
+import re
+import sys
+import unicodedata
+
+from etl_engine import PERFIL_DEFAULT, unidades_reporte
+
+# Prefijos de tipo de unidad y su forma canónica ("LOCAL 102", "L102" y "Local: L-102" -> "L102")
+TIPOS_UNIDAD = {
+    'APARTAMENTO': 'APTO', 'APTO': 'APTO', 'APT': 'APTO', 'AP': 'APTO',
+    'LOCAL': 'L', 'LOC': 'L', 'L': 'L',
+    'OFICINA': 'OF', 'OFIC': 'OF', 'OF': 'OF',
+    'PARQUEADERO': 'P', 'PARQ': 'P', 'P': 'P',
+    'DEPOSITO': 'D', 'DEP': 'D', 'D': 'D',
+    'CASA': 'CASA',
+}
+_PREFIJOS = '|'.join(sorted(TIPOS_UNIDAD, key=len, reverse=True))
+PATRON_UNIDAD = re.compile(
+    rf'^(?:({_PREFIJOS})\W*)?(?:({_PREFIJOS})\W*)?0*(\d+)\s*-?\s*([A-Z]?)$'
+)
+
+# Palabras que no distinguen a un propietario (conectores y tipos de sociedad)
+PALABRAS_VACIAS = {'DE', 'DEL', 'LA', 'LAS', 'LOS', 'Y', 'SAS', 'SA', 'LTDA', 'CIA', 'EU', 'SUCESION', 'HEREDEROS'}
+
+# Similitud mínima (Dice de trigramas) para considerar que el propietario es el mismo,
+# y para sugerir una unidad registrada a una unidad nueva por el nombre del propietario
+UMBRAL_MISMO_PROPIETARIO = 0.5
+UMBRAL_SUGERENCIA = 0.8
+
+def _sin_tildes(texto):
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+
+def clave_unidad(identificador):
+    """Identificador canónico de una unidad: tipo + número sin ceros a la izquierda ('OF 0203' -> 'OF203')"""
+    texto = re.sub(r'\s+', ' ', _sin_tildes(str(identificador)).upper()).strip()
+    encontrado = PATRON_UNIDAD.match(texto)
+    if not encontrado:
+        return re.sub(r'[^A-Z0-9]', '', texto)
+    prefijo = encontrado.group(1) or encontrado.group(2)
+    tipo = TIPOS_UNIDAD[prefijo] if prefijo else ''
+    return f"{tipo}{encontrado.group(3)}{encontrado.group(4)}"
+
+def numero_unidad(clave):
+    """Número de la clave sin el tipo ('L102' -> '102'), para cruzar listados que no lo escriben"""
+    return re.sub(r'^[A-Z]+(?=\d)', '', clave)
+
+def tokens_nombre(nombre):
+    """Palabras significativas del nombre, normalizadas (mayúsculas, sin tildes ni puntuación)"""
+    texto = re.sub(r'[^A-Z0-9]+', ' ', _sin_tildes(str(nombre or '')).upper())
+    return [palabra for palabra in texto.split() if len(palabra) > 1 and palabra not in PALABRAS_VACIAS]
+
+def trigramas(tokens):
+    """Trigramas de cada palabra (con bordes), sin importar el orden de las palabras"""
+    resultado = set()
+    for token in tokens:
+        token = f" {token} "
+        resultado.update(token[i:i + 3] for i in range(len(token) - 2))
+    return resultado
+
+def similitud(a, b):
+    """Coeficiente de Dice entre dos conjuntos de trigramas"""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+class IndiceConciliacion:
+    """Unidades registradas de un conjunto, indexadas para cruzar un reporte en una pasada.
+
+    `registros` son dicts con 'identifier' y 'ownerName' (y opcionalmente 'id',
+    'email', 'phone'), como los de la tabla Unit o el directorio de residentes.
+    """
+
+    def __init__(self, registros):
+        self.registros = list(registros)
+        self.por_clave = collections.defaultdict(list)
+        self.por_numero = collections.defaultdict(list)
+        self.por_token = collections.defaultdict(list)
+        self.trigramas = []
+        for i, registro in enumerate(self.registros):
+            clave = clave_unidad(registro['identifier'])
+            self.por_clave[clave].append(i)
+            self.por_numero[numero_unidad(clave)].append(i)
+            tokens = tokens_nombre(registro.get('ownerName'))
+            for token in set(tokens):
+                self.por_token[token].append(i)
+            self.trigramas.append(trigramas(tokens))
+
+    def buscar_unidad(self, identificador):
+        """Índices de los registros de la unidad (el primero es el vigente), o [].
+
+        Si a uno de los dos lados le falta el tipo ('102' y 'L102') se cruza por
+        número cuando solo hay una unidad registrada con ese número.
+        """
+        clave = clave_unidad(identificador)
+        if clave in self.por_clave:
+            return self.por_clave[clave]
+        candidatos = self.por_numero.get(numero_unidad(clave), [])
+        if len(candidatos) == 1 and (clave.isdigit() or clave_unidad(self.registros[candidatos[0]]['identifier']).isdigit()):
+            return candidatos
+        return []
+
+    def buscar_propietario(self, nombre, excluir=()):
+        """(índice, similitud) del registro con el propietario más parecido, o (None, 0.0)"""
+        tokens = tokens_nombre(nombre)
+        buscados = trigramas(tokens)
+        candidatos = collections.Counter()
+        for token in set(tokens):
+            candidatos.update(self.por_token.get(token, ()))
+        mejor, puntaje = None, 0.0
+        for i, _ in candidatos.most_common():
+            if i in excluir:
+                continue
+            valor = similitud(buscados, self.trigramas[i])
+            if valor > puntaje:
+                mejor, puntaje = i, valor
+        return mejor, puntaje
+
+    def conciliar(self, unidades):
+        """Cruza las unidades del motor con los registros.
+
+        Estados: 'matched' (misma unidad y propietario), 'owner_changed' (misma
+        unidad, propietario distinto), 'owner_unknown' (el reporte no trae
+        propietario) y 'new_unit' (sin registro; con 'suggestion' si el
+        propietario coincide con el de otra unidad registrada).
+        """
+        resultados = []
+        vistas = set()
+        nuevas = []
+        for unidad in unidades:
+            encontrados = self.buscar_unidad(unidad.unit_number)
+            resultado = {
+                'unit_number': unidad.unit_number,
+                'key': clave_unidad(unidad.unit_number),
+                'owner_name': unidad.owner_name,
+            }
+            if not encontrados:
+                resultado['status'] = 'new_unit'
+                nuevas.append(resultado)
+            else:
+                # Registros repetidos de la misma unidad cuentan como vistos
+                vistas.update(encontrados)
+                i = encontrados[0]
+                registro = self.registros[i]
+                resultado.update(self._registro(registro))
+                if unidad.owner_name == 'N/D':
+                    resultado['status'] = 'owner_unknown'
+                else:
+                    parecido = similitud(trigramas(tokens_nombre(unidad.owner_name)), self.trigramas[i])
+                    resultado['owner_similarity'] = round(parecido, 3)
+                    resultado['status'] = 'matched' if parecido >= UMBRAL_MISMO_PROPIETARIO else 'owner_changed'
+            resultados.append(resultado)
+
+        # Unidades nuevas: ¿el propietario ya tiene otra unidad registrada que no apareció en el reporte?
+        for resultado in nuevas:
+            if resultado['owner_name'] == 'N/D':
+                continue
+            i, parecido = self.buscar_propietario(resultado['owner_name'], excluir=vistas)
+            if i is not None and parecido >= UMBRAL_SUGERENCIA:
+                resultado['suggestion'] = dict(self._registro(self.registros[i]), owner_similarity=round(parecido, 3))
+
+        faltantes = [self._registro(registro) for i, registro in enumerate(self.registros) if i not in vistas]
+        estados = collections.Counter(resultado['status'] for resultado in resultados)
+        return {
+            'units': resultados,
+            'missing_units': faltantes,
+            'stats': dict(estados, units=len(resultados), registered=len(self.registros), missing=len(faltantes))
+        }
+
+    @staticmethod
+    def _registro(registro):
+        return {
+            'unit_id': registro.get('id'),
+            'identifier': registro['identifier'],
+            'registered_owner': registro.get('ownerName'),
+        }
+
+# Encabezados aceptados en el directorio de residentes y en el maestro de unidades
+COLUMNAS_DIRECTORIO = {
+    'identifier': ('UNIDAD', 'NUMERO UNIDAD', 'IDENTIFICADOR'),
+    'ownerName': ('NOMBRE PROPIETARIO', 'PROPIETARIO', 'COPROPIETARIO'),
+    'email': ('EMAIL', 'CORREO'),
+    'phone': ('TELEFONO', 'CELULAR', 'MOVIL'),
+}
+
+def registros_directorio(ruta):
+    """Registros de un directorio de residentes o maestro de unidades (.csv, .xls o .xlsx)"""
+    import pandas as pd
+
+    df = pd.read_csv(ruta, dtype=str) if ruta.lower().endswith('.csv') else pd.read_excel(ruta, dtype=str)
+    columnas = {}
+    for columna in df.columns:
+        nombre = re.sub(r'\s+', ' ', _sin_tildes(str(columna)).upper()).strip()
+        for campo, alias in COLUMNAS_DIRECTORIO.items():
+            if nombre in alias and campo not in columnas:
+                columnas[campo] = columna
+    if 'identifier' not in columnas:
+        raise ValueError(f"No unit column in {os.path.basename(ruta)} (expected one of {COLUMNAS_DIRECTORIO['identifier']})")
+    df = df[df[columnas['identifier']].notna()]
+    return [
+        {campo: (None if pd.isna(fila[columna]) else str(fila[columna]).strip()) for campo, columna in columnas.items()}
+        for _, fila in df.iterrows()
+    ]
+
+def registros_base(complex_id, url=None):
+    """Unidades activas de un conjunto en la tabla Unit (postgresql://... o sqlite:///...)"""
+    from etl_loader import destino_desde_url
+
+    url = url or os.environ.get('DATABASE_URL')
+    if not url:
+        raise ValueError("No database URL (set DATABASE_URL or pass --database-url)")
+    destino = destino_desde_url(url)
+    conexion = destino.conectar()
+    try:
+        cursor = conexion.cursor()
+        cursor.execute(
+            'SELECT id, identifier, "ownerName" FROM "Unit" WHERE "complexId" = ? AND "isActive"'.replace('?', destino.marcador),
+            (complex_id,)
+        )
+        return [{'id': id_unidad, 'identifier': identificador, 'ownerName': propietario} for id_unidad, identificador, propietario in cursor.fetchall()]
+    finally:
+        destino.liberar(conexion)
+
+def indice_desde(opciones):
+    """Índice según {"directory": ruta} o {"complex_id", "database_url"?}"""
+    if opciones.get('directory'):
+        return IndiceConciliacion(registros_directorio(opciones['directory']))
+    if opciones.get('complex_id'):
+        return IndiceConciliacion(registros_base(opciones['complex_id'], opciones.get('database_url')))
+    raise ValueError("Reconciliation needs a directory file or a complex_id")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cruza las unidades de un reporte con las registradas (directorio o tabla Unit)")
+    parser.add_argument('file', help="Reporte .xls/.xlsx a analizar")
+    parser.add_argument('--directory', help="Directorio de residentes o maestro de unidades (.csv/.xlsx)")
+    parser.add_argument('--complex-id', help="Id del conjunto en la base (tabla Unit)")
+    parser.add_argument('--database-url', help="postgresql://... o sqlite:///ruta.db (por defecto DATABASE_URL)")
+    parser.add_argument('--layout', default=PERFIL_DEFAULT, help="Perfil de formato (nombre en perfiles/ o ruta a un JSON)")
+    args = parser.parse_args()
+
+    try:
+        indice = indice_desde({'directory': args.directory, 'complex_id': args.complex_id, 'database_url': args.database_url})
+        resultado = indice.conciliar(unidades_reporte(args.file, perfil=args.layout))
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import sys
+
+from etl_engine import PERFIL_DEFAULT, iterar_unidades, unidades_reporte
+from etl_profiles import cargar_perfil
+from etl_reader import leer_filas
+from etl_unidades import Unidad, a_json, a_json_con_huella
+
+EXTENSIONES = ('.xls', '.xlsx')
+
+def cargar_previas(ruta, perfil=PERFIL_DEFAULT):
+    """Unidades del periodo anterior.
+
+    Acepta el reporte anterior (.xls/.xlsx), que se toma del cache si ya fue
+    analizado (las entradas del cache traen las huellas), la salida de este modo
+    o una entrada del cache (listas JSON con huellas), o la salida de etl_engine.py
+    (sin huellas: sirve para comparar, pero no se reutiliza ningún bloque).
+    """
+    if ruta.lower().endswith(EXTENSIONES):
+        unidades = list(unidades_reporte(ruta, perfil=perfil))
+    else:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            unidades = json.load(f)
+        if isinstance(unidades, dict):
+            if 'error' in unidades:
+                raise ValueError(f"Previous output has an error: {unidades['error']}")
+            unidades = unidades['units']
+        unidades = [Unidad.desde_dict(unidad) for unidad in unidades]
+    return unidades
+
+def comparar_periodos(previas, unidades):
+    """Unidades nuevas, retiradas y cambios de clasificación respecto al periodo anterior"""
+    previas = {unidad.unit_number: unidad for unidad in previas}
+    actuales = {unidad.unit_number: unidad for unidad in unidades}
+    transiciones = []
+    for numero, unidad in actuales.items():
+        previa = previas.get(numero)
+        if previa is None:
+            continue
+        if previa.action_class != unidad.action_class or previa.risk_status != unidad.risk_status:
+            transiciones.append({
+                'unit_number': numero,
+                'from': previa.action_class,
+                'to': unidad.action_class,
+                'from_status': previa.risk_status,
+                'to_status': unidad.risk_status,
+                'total_debt_change': unidad.total_debt - previa.total_debt
+            })
+
+    return {
+        'new_units': [numero for numero in actuales if numero not in previas],
+        'removed_units': [numero for numero in previas if numero not in actuales],
+        'transitions': transiciones
+    }
+
+def delta_reporte(file_path, previas, perfil=PERFIL_DEFAULT):
+    """Analiza el reporte nuevo extrayendo y clasificando solo los bloques que cambiaron.
+
+    Un bloque se reutiliza si la unidad, el propietario y sus montos son los del
+    periodo anterior aunque cambien la fecha o el número de la cuenta de cobro.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    por_huella = {unidad.fingerprint: unidad for unidad in previas if unidad.fingerprint is not None}
+    unidades = list(iterar_unidades(leer_filas(file_path), perfil=cargar_perfil(perfil), previas=por_huella))
+    reutilizadas = sum(1 for unidad in unidades if por_huella.get(unidad.fingerprint) is unidad)
+    return {
+        'units': unidades,
+        'diff': comparar_periodos(previas, unidades),
+        'stats': {'units': len(unidades), 'reused': reutilizadas, 'reprocessed': len(unidades) - reutilizadas}
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análisis incremental de un reporte contra el periodo anterior")
+    parser.add_argument('file', help="Reporte .xls/.xlsx del periodo nuevo")
+    parser.add_argument('--previous', required=True, help="Salida del periodo anterior (JSON) o su reporte .xls/.xlsx")
+    parser.add_argument('--layout', default=PERFIL_DEFAULT, help="Perfil de formato (nombre en perfiles/ o ruta a un JSON)")
+    parser.add_argument('--out', help="Guardar el resultado (con huellas) para usarlo como --previous el próximo mes")
+    args = parser.parse_args()
+
+    try:
+        resultado = delta_reporte(args.file, cargar_previas(args.previous, args.layout), args.layout)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, default=a_json_con_huella)
+    print(json.dumps(resultado, indent=2, default=a_json))
@@ -1,164 +1,555 @@
+import numpy as np
 import pandas as pd
+import argparse
+import contextlib
+import hashlib
 import re
 import sys
 import json
 import os
 
+from etl_cache import CacheResultados
+from etl_metrics import MetricasEtl
+from etl_montos import normalizar_montos
+from etl_profiles import FILA_CABECERA, FILA_SALDO, FILA_RECIBO, FILA_INTERES, FILA_CUOTA, FILA_TOTAL, PERFIL_DEFAULT, cargar_perfil
+from etl_reader import leer_filas
+from etl_riesgo import kpis_cartera
+from etl_unidades import CAMPOS_FINANCIEROS, Unidad, a_json, a_json_con_huella
+
 # Configurar encoding para stdout
 sys.stdout.reconfigure(encoding='utf-8')
 
-def parsear_monto(valor):
-    """Extrae valor numérico de cualquier formato"""
-    if pd.isna(valor):
-        return 0.0
-    if isinstance(valor, (int, float)):
-        return float(valor)
-    # Convertir a string y limpiar
-    text = str(valor).replace('$', '').replace(' ', '').strip()
-    # Separadores: eliminar comas y puntos de miles, asumir que no hay decimales si es formato colombiano estándar
-    # O mejor, usar expresión regular para extraer números
-    text = text.replace(',', '').replace('.', '')
-    try:
-        return float(text)
-    except:
-        return 0.0
+# Versión de las reglas de extracción y clasificación: cambiarla invalida el cache
+VERSION_MOTOR = '5'
+
+# Cache de resultados por hash del archivo (ETL_CACHE=0 lo desactiva)
+cache = None if os.environ.get('ETL_CACHE') == '0' else CacheResultados.desde_entorno(VERSION_MOTOR)
+
+# Métricas por etapa de la ejecución en curso (--profile o ETL_PROFILE=1)
+PERFILAR = os.environ.get('ETL_PROFILE') == '1'
+metricas = None
+
+def iniciar_metricas():
+    global metricas
+    metricas = MetricasEtl()
+    return metricas
+
+def etapa(nombre):
+    """Mide una etapa del ETL si las métricas están activas"""
+    return metricas.etapa(nombre) if metricas is not None else contextlib.nullcontext()
+
+# Función (filas, unidades) llamada tras cada lote (--progress)
+avance = None
+
+def imprimir_avance(filas, unidades):
+    print(json.dumps({'progress': {'rows': filas, 'units': unidades}}), file=sys.stderr, flush=True)
+
+# Filas que se acumulan antes de analizar un lote en modo streaming
+FILAS_POR_LOTE = 5000
+
+a_texto = np.frompyfunc(str, 1, 1)
+es_numero = np.frompyfunc(lambda v: isinstance(v, (int, float)), 1, 1)
+
+def columna_texto(valores):
+    """Texto de cada fila: une sus celdas no vacías con espacios, columna por columna"""
+    n = valores.shape[0]
+    texto = np.full(n, '', dtype=object)
+    con_texto = np.zeros(n, dtype=bool)
+    for j in range(valores.shape[1]):
+        presente = pd.notna(valores[:, j])
+        separador = np.where(con_texto & presente, ' ', '')
+        texto = np.where(presente, texto + separador + a_texto(valores[:, j]), texto)
+        con_texto |= presente
+    return pd.Series(texto, dtype=object)
+
+def matriz_numerica(valores, columnas_numericas=None):
+    """Matriz float64 con las celdas numéricas (int/float) y NaN en el resto.
+
+    Los montos escritos como texto ("$1.234.567", "(12.500)") se convierten
+    con normalizar_montos; los que no se pueden interpretar se cuentan en
+    las métricas ('unparsed_amounts').
+
+    `columnas_numericas` marca las columnas que ya se sabe que son solo números
+    (dtype numérico del DataFrame) para no revisarlas celda por celda.
+    """
+    numeros = np.full(valores.shape, np.nan)
+    textos = np.zeros(valores.shape, dtype=bool)
+    for j in range(valores.shape[1]):
+        if columnas_numericas is not None and columnas_numericas[j]:
+            numeros[:, j] = valores[:, j].astype(float)
+            continue
+        mascara = es_numero(valores[:, j]).astype(bool)
+        numeros[mascara, j] = valores[mascara, j].astype(float)
+        textos[:, j] = ~mascara & pd.notna(valores[:, j])
+
+    # Todas las celdas de texto del lote en una sola llamada
+    if textos.any():
+        montos, no_reconocidas = normalizar_montos(valores[textos], exigir_marca=True)
+        numeros[textos] = montos
+        if metricas is not None and no_reconocidas.any():
+            metricas.contar('unparsed_amounts', int(no_reconocidas.sum()))
+    return numeros
+
+def primera_columna(mascara):
+    """Índice de la primera columna True por fila (-1 si no hay)"""
+    idx = mascara.argmax(axis=1)
+    idx[~mascara.any(axis=1)] = -1
+    return idx
+
+def ultima_columna(mascara):
+    """Índice de la última columna True por fila (-1 si no hay)"""
+    idx = mascara.shape[1] - 1 - mascara[:, ::-1].argmax(axis=1)
+    idx[~mascara.any(axis=1)] = -1
+    return idx
+
+def delimitar_bloques(etiquetas, inicios, perfil):
+    """Calcula el rango [ini, fin) de filas del bloque de cada cabecera de unidad.
+
+    El bloque empieza en la fila siguiente a la cabecera y termina en el siguiente
+    LOCAL:/OF: (sin contar las `filas_cabecera` filas inmediatas), en la fila
+    'Total a pagar' (incluida) o a las `max_filas_bloque` filas del perfil.
+
+    También indica si cada bloque quedó cerrado dentro de las filas disponibles
+    (si no, puede continuar en filas que todavía no se han leído).
+    """
+    n = len(etiquetas)
+    cabeceras = np.flatnonzero(etiquetas & FILA_CABECERA)
+    totales = np.flatnonzero(etiquetas & FILA_TOTAL)
+    # Centinela más allá de cualquier bloque para las búsquedas sin resultado
+    sin_corte = n + perfil.max_filas_bloque + 1
+    cabeceras = np.append(cabeceras, sin_corte)
+    totales = np.append(totales, sin_corte)
+
+    ini = inicios + 1
+    corte_cabecera = cabeceras[np.searchsorted(cabeceras, inicios + perfil.filas_cabecera + 1)]
+    corte_total = totales[np.searchsorted(totales, ini)] + 1
+    limite = np.minimum.reduce([inicios + 1 + perfil.max_filas_bloque, corte_cabecera, corte_total])
+    fin = np.maximum(np.minimum(limite, n), ini)
+    return ini, fin, limite <= n
+
+def extraer_campos(numeros, etiquetas, selecciones, ini, fin):
+    """Extrae los valores financieros de un bloque a partir de las selecciones por fila"""
+    saldo_col, recibos, interes_col, cuota_col, total_col = selecciones
+    bloque = etiquetas[ini:fin]
+
+    saldo_anterior = 0.0
+    cuota_actual = 0.0
+    intereses_mora = 0.0
+    otros = 0.0
+    total_a_pagar = 0.0
+
+    # SALDO ANTERIOR: primer valor positivo de la última fila de saldo que lo tenga
+    filas = ini + np.flatnonzero(((bloque & FILA_SALDO) > 0) & (saldo_col[ini:fin] >= 0))
+    if len(filas):
+        saldo_anterior = float(numeros[filas[-1], saldo_col[filas[-1]]])
+
+    # OTROS / RECIBOS DE CAJA: todos los valores negativos, en orden de lectura
+    filas = ini + np.flatnonzero(bloque & FILA_RECIBO)
+    for val in numeros[filas][recibos[filas]]:
+        otros += val
+
+    # INTERESES: primer valor entre 0 y el máximo del perfil de cada fila de intereses
+    filas = ini + np.flatnonzero(((bloque & FILA_INTERES) > 0) & (interes_col[ini:fin] >= 0))
+    for fila in filas:
+        intereses_mora += numeros[fila, interes_col[fila]]
+
+    # CUOTA ACTUAL: primer valor mayor al mínimo del perfil de la última fila de cuota que lo tenga
+    filas = ini + np.flatnonzero(((bloque & FILA_CUOTA) > 0) & (cuota_col[ini:fin] >= 0))
+    if len(filas):
+        cuota_actual = float(numeros[filas[-1], cuota_col[filas[-1]]])
+
+    # TOTAL A PAGAR: último valor positivo de la fila de total (cierra el bloque)
+    filas = ini + np.flatnonzero(((bloque & FILA_TOTAL) > 0) & (total_col[ini:fin] >= 0))
+    if len(filas):
+        total_a_pagar = float(numeros[filas[-1], total_col[filas[-1]]])
+
+    return {
+        'prev_balance': saldo_anterior,
+        'current_fee': cuota_actual,
+        'interest': float(intereses_mora),
+        'adjustments': float(otros),
+        'total_debt': total_a_pagar
+    }
+
+def analizar_valores(valores, columnas_numericas=None, final=True, perfil=None, previas=None):
+    """Analiza las unidades de una matriz (object) de celdas.
+
+    Devuelve (unidades, consumidas): con final=False solo se entregan las
+    unidades cuyo bloque ya cerró, y `consumidas` es la fila desde la que hay
+    que volver a analizar cuando lleguen más filas.
+    """
+    if valores.size == 0:
+        return [], len(valores)
+    with etapa('scan'):
+        texto = columna_texto(valores)
+        numeros = matriz_numerica(valores, columnas_numericas)
+    return analizar_filas(texto, numeros, final, perfil=perfil, previas=previas)
+
+def huella_bloque(unidad, propietario, etiquetas, numeros, inicio, fin, perfil):
+    """Huella de lo que determina el resultado de un bloque bajo las reglas actuales del motor.
+
+    Cubre la unidad, el propietario, la etiqueta de cada fila y los montos con su
+    columna; no el texto libre (número de cuenta de cobro, fechas, conceptos),
+    que cambia cada periodo aunque los montos de la unidad sean los mismos.
+    """
+    sha = hashlib.sha1(f"{VERSION_MOTOR}:{perfil.huella}:{unidad}:{propietario}".encode('utf-8'))
+    bloque = numeros[inicio:fin]
+    presentes = ~np.isnan(bloque)
+    # Sin las columnas vacías del final: el ancho del lote varía entre archivos
+    columnas = np.flatnonzero(presentes.any(axis=0))
+    ancho = columnas[-1] + 1 if len(columnas) else 0
+    sha.update(etiquetas[inicio:fin].tobytes())
+    sha.update(presentes[:, :ancho].tobytes())
+    sha.update(np.where(presentes, bloque, 0.0)[:, :ancho].tobytes())
+    return sha.hexdigest()
+
+def analizar_filas(texto, numeros, final=True, perfil=None, previas=None):
+    """Analiza las unidades a partir del texto (Series) y la matriz numérica de cada fila.
+
+    Sin `perfil` se usa el formato por defecto (PERFIL_DEFAULT).
+
+    Cada unidad lleva la huella de su bloque ('fingerprint', ver huella_bloque).
+    Con `previas` ({fingerprint: unidad} de un análisis anterior) los bloques
+    con una huella ya conocida se reutilizan sin volver a extraer ni clasificar.
+    """
+    perfil = perfil or cargar_perfil()
+    with etapa('label'):
+        etiquetas = perfil.etiquetar(texto)
+
+        # Cabeceras de unidad y propietario (la fila siguiente a la cabecera)
+        unidad = texto.str.extract(perfil.patron_unidad)[perfil.grupo_unidad - 1].to_numpy(dtype=object)
+        propietario = texto.str.extract(perfil.patron_propietario)[0].str.strip().to_numpy(dtype=object)
+        inicios = np.flatnonzero(pd.notna(unidad))
+    if not len(inicios):
+        return [], len(texto)
+
+    ini, fin, cerrado = delimitar_bloques(etiquetas, inicios, perfil)
+    consumidas = len(texto)
+    if not final and not cerrado.all():
+        pendiente = np.argmin(cerrado)
+        consumidas = inicios[pendiente]
+        inicios, ini, fin = inicios[:pendiente], ini[:pendiente], fin[:pendiente]
+
+    positivos = numeros > 0
+    selecciones = (
+        primera_columna(positivos),
+        numeros < 0,
+        primera_columna(positivos & (numeros < perfil.interes_max)),
+        primera_columna(numeros > perfil.cuota_min),
+        ultima_columna(positivos),
+    )
 
-def analizar_reporte(file_path):
+    propietarios = [propietario[a] if a < b and pd.notna(propietario[a]) else "N/D" for a, b in zip(ini, fin)]
+    with etapa('fingerprint'):
+        huellas = [
+            huella_bloque(unidad[inicio], dueno, etiquetas, numeros, inicio, b, perfil)
+            for inicio, b, dueno in zip(inicios, fin, propietarios)
+        ]
+    reutilizadas = [previas.get(huella) for huella in huellas] if previas else [None] * len(inicios)
+
+    with etapa('extract'):
+        campos = [
+            extraer_campos(numeros, etiquetas, selecciones, a, b) if previa is None else None
+            for a, b, previa in zip(ini, fin, reutilizadas)
+        ]
+
+    unidades = []
+    with etapa('classify'):
+        # Clasificación de todo el lote de una vez
+        nuevas = [financials for financials in campos if financials is not None]
+        clasificaciones = zip(*perfil.reglas.clasificar(
+            [financials['total_debt'] for financials in nuevas],
+            [financials['current_fee'] for financials in nuevas]
+        ))
+        for inicio, dueno, financials, huella, previa in zip(inicios, propietarios, campos, huellas, reutilizadas):
+            if previa is not None:
+                unidades.append(previa)
+                continue
+            unidades.append(Unidad(
+                unidad[inicio],
+                dueno,
+                *(financials[campo] for campo in CAMPOS_FINANCIEROS),
+                *next(clasificaciones),
+                huella
+            ))
+    return unidades, consumidas
+
+def matriz_filas(filas):
+    """Convierte una lista de filas de distinto largo en una matriz object rectangular"""
+    ancho = max((len(fila) for fila in filas), default=0)
+    valores = np.full((len(filas), ancho), None, dtype=object)
+    for i, fila in enumerate(filas):
+        valores[i, :len(fila)] = fila
+    return valores
+
+def iterar_unidades(filas, filas_por_lote=FILAS_POR_LOTE, perfil=None, previas=None, al_avanzar=None):
+    """Analiza un iterable de filas por lotes y entrega las unidades a medida que cierran.
+
+    En memoria solo quedan el lote actual y las filas de los bloques aún abiertos.
+    `al_avanzar(filas, unidades)` recibe los totales leídos y entregados tras cada lote.
+    """
+    pendientes = []
+    leidas = 0
+    entregadas = 0
+    for fila in filas:
+        pendientes.append(fila)
+        leidas += 1
+        if len(pendientes) >= filas_por_lote:
+            unidades, consumidas = analizar_valores(matriz_filas(pendientes), final=False, perfil=perfil, previas=previas)
+            yield from unidades
+            del pendientes[:consumidas]
+            entregadas += len(unidades)
+            if al_avanzar is not None:
+                al_avanzar(leidas, entregadas)
+
+    unidades, _ = analizar_valores(matriz_filas(pendientes), perfil=perfil, previas=previas)
+    yield from unidades
+    if al_avanzar is not None:
+        al_avanzar(leidas, entregadas + len(unidades))
+
+def unidades_reporte(file_path, usar_cache=True, perfil=PERFIL_DEFAULT):
+    """Entrega las unidades del reporte a medida que se analizan (o desde el cache).
+
+    `perfil` es el nombre (o ruta JSON) del formato del software contable.
+    """
     if not os.path.exists(file_path):
-        return {"error": f"File not found: {file_path}"}
+        raise FileNotFoundError(f"File not found: {file_path}")
+    compilado = cargar_perfil(perfil)
+
+    def analizar():
+        filas = leer_filas(file_path)
+        if metricas is not None:
+            filas = metricas.contar_iterable('rows', metricas.medir_iterable('read', filas))
+        return iterar_unidades(filas, perfil=compilado, al_avanzar=avance)
 
+    def entregar(unidades):
+        return metricas.contar_iterable('units', unidades) if metricas is not None else unidades
+
+    if not usar_cache or cache is None:
+        yield from entregar(analizar())
+        return
+
+    with etapa('cache'):
+        clave = cache.clave(file_path, compilado.huella)
+        unidades = cache.leer(clave)
+    if unidades is not None:
+        if metricas is not None:
+            metricas.contar('cache_hits')
+        yield from entregar(map(Unidad.desde_dict, unidades))
+    else:
+        # El cache guarda las huellas: etl_delta reutiliza los bloques de un reporte ya analizado
+        yield from entregar(cache.registrar(clave, analizar(), default=a_json_con_huella))
+
+def analizar_reporte(file_path, usar_cache=True, perfil=PERFIL_DEFAULT):
+    """Lista de unidades (Unidad) del reporte, o {"error"}; se serializan con json.dumps(..., default=a_json)"""
     try:
-        # Intentar leer con engine por defecto o xlrd dependiendo de la extensión
-        if file_path.endswith('.xls'):
-            df = pd.read_excel(file_path, sheet_name=0, engine='xlrd') # xls antiguo
-        else:
-            df = pd.read_excel(file_path, sheet_name=0)
+        return list(unidades_reporte(file_path, usar_cache, perfil))
     except Exception as e:
         return {"error": str(e)}
 
+def resumen_unidades(unidades, perfil=PERFIL_DEFAULT):
+    """Indicadores del reporte (línea final de --ndjson, resumen de --serve y de lotes)"""
+    return kpis_cartera(unidades, cargar_perfil(perfil).reglas)
+
+def analizar_con_resumen(file_path, usar_cache=True, perfil=PERFIL_DEFAULT):
+    """Unidades del reporte y sus indicadores, calculados en la misma pasada"""
     unidades = []
 
-    for idx, row in df.iterrows():
-        # Convertir fila a string
-        row_values = [str(x) for x in row.values if pd.notna(x)]
-        row_str = ' '.join(row_values)
-        
-        # Detectar inicio de unidad
-        match_local = re.search(r'(LOCAL|OF):\s*([A-Z0-9]+)', row_str)
-        if not match_local:
+    def guardar():
+        for unidad in unidades_reporte(file_path, usar_cache, perfil):
+            unidades.append(unidad)
+            yield unidad
+
+    resumen = resumen_unidades(guardar(), perfil)
+    return unidades, resumen
+
+def escribir_ndjson(file_path, salida, usar_cache=True, perfil=PERFIL_DEFAULT):
+    """Escribe cada unidad como una línea JSON compacta apenas se analiza, y al final un resumen"""
+    def emitir():
+        for unidad in unidades_reporte(file_path, usar_cache, perfil):
+            with etapa('serialize'):
+                linea = json.dumps(unidad, separators=(',', ':'), default=a_json)
+            salida.write(linea + '\n')
+            salida.flush()
+            yield unidad
+
+    try:
+        resumen = resumen_unidades(emitir(), perfil)
+    except Exception as e:
+        salida.write(json.dumps({"error": str(e)}) + '\n')
+        return
+    salida.write(json.dumps({'summary': resumen}, separators=(',', ':')) + '\n')
+
+@contextlib.contextmanager
+def paso_opcional(respuesta, clave):
+    """Paso opcional de un trabajo: si falla deja {"error"} en respuesta[clave] sin perder el análisis"""
+    try:
+        yield
+    except Exception as e:
+        respuesta[clave] = {"error": str(e)}
+
+def ejecutar_trabajo(trabajo):
+    """Ejecuta un trabajo del modo --serve y arma la respuesta con su id"""
+    global metricas
+    respuesta = {'id': trabajo.get('id')}
+    if trabajo.get('stats'):
+        respuesta['result'] = {'cache': cache.estadisticas() if cache is not None else None}
+        return respuesta
+
+    if trabajo.get('profile') or PERFILAR:
+        iniciar_metricas()
+    try:
+        if trabajo.get('probe'):
+            # Sondeo rápido (etl_probe): perfil, periodo, NIT y unidades estimadas sin analizar el reporte
+            from etl_probe import sondear_reporte
+            resultado = sondear_reporte(trabajo.get('file', ''))
+        elif trabajo.get('reclassify') is not None:
+            # Reglas de mora nuevas sobre la instantánea del reporte ({"aging", "units"?}); el Excel solo se
+            # lee si la instantánea falta o está vencida
+            from etl_snapshot import reclasificar
+            opciones = trabajo['reclassify']
+            resultado = reclasificar(trabajo.get('file', ''), opciones.get('aging'), opciones.get('units', False), trabajo.get('layout'))
+        elif trabajo.get('sheets'):
+            # Todas las hojas reconocidas del libro, agrupadas por hoja (etl_libro)
+            from etl_libro import analizar_libro
+            resultado = analizar_libro(trabajo.get('file', ''), trabajo.get('layout'), trabajo.get('workers'))
+        elif trabajo.get('load'):
+            # Carga directa a la base ({"report_id", "database_url"?}): responde con los conteos
+            from etl_loader import cargar_reporte
+            carga = trabajo['load']
+            resultado = cargar_reporte(
+                trabajo.get('file', ''),
+                carga['report_id'],
+                carga.get('database_url'),
+                perfil=trabajo.get('layout') or PERFIL_DEFAULT
+            )
+        else:
+            resultado, respuesta['summary'] = analizar_con_resumen(
+                trabajo.get('file', ''),
+                usar_cache=trabajo.get('cache', True),
+                perfil=trabajo.get('layout') or PERFIL_DEFAULT
+            )
+            # Pasos opcionales sobre el análisis: si uno falla, su clave trae {"error"}
+            # y la respuesta conserva las unidades y los indicadores
+            if trabajo.get('reconcile'):
+                # Cruce con las unidades registradas ({"directory"} o {"complex_id", "database_url"?})
+                with paso_opcional(respuesta, 'reconciliation'):
+                    from etl_conciliacion import indice_desde
+                    respuesta['reconciliation'] = indice_desde(trabajo['reconcile']).conciliar(resultado)
+            if trabajo.get('snapshot'):
+                # Instantánea de los campos extraídos junto al reporte, para reclasificar después
+                with paso_opcional(respuesta, 'snapshot'):
+                    from etl_snapshot import crear_snapshot
+                    respuesta['snapshot'] = crear_snapshot(
+                        trabajo['file'], trabajo.get('layout') or PERFIL_DEFAULT, unidades=resultado
+                    )
+            if trabajo.get('history'):
+                # Agrega el periodo al historial entre periodos ({"complex", "period"?, "db"?})
+                with paso_opcional(respuesta, 'history'):
+                    from etl_historial import HistorialCartera
+                    historia = trabajo['history']
+                    respuesta['history'] = HistorialCartera(historia.get('db')).registrar_reporte(
+                        trabajo['file'], historia['complex'], historia.get('period'), unidades=resultado
+                    )
+    except Exception as e:
+        respuesta.pop('summary', None)
+        resultado = {"error": str(e)}
+
+    if isinstance(resultado, dict) and 'error' in resultado:
+        respuesta['error'] = resultado['error']
+    else:
+        respuesta['result'] = resultado
+    if metricas is not None:
+        respuesta['metrics'] = metricas.como_dict()
+        metricas = None
+    return respuesta
+
+def servir(entrada, salida):
+    """Modo residente: lee trabajos JSONL ({"id", "file", "layout"?, "profile"?, "probe"?, "reclassify"?, "sheets"?, "load"?, "reconcile"?, "snapshot"?, "history"?}) y escribe una línea JSON por trabajo.
+
+    Los perfiles compilados y el pool de conexiones de la base quedan en
+    memoria entre trabajos (cargar_perfil, etl_loader).
+    """
+    for linea in entrada:
+        linea = linea.strip()
+        if not linea:
             continue
-        
-        local_ofi = match_local.group(2)
-        
-        # Extraer propietario
-        propietario = "N/D"
-        if idx + 1 < len(df):
-            next_row = df.iloc[idx + 1]
-            next_str = ' '.join([str(x) for x in next_row.values if pd.notna(x)])
-            prop_match = re.search(r'Copropietario:\s*(.+?)(?:Fecha:|$)', next_str)
-            if prop_match:
-                propietario = prop_match.group(1).strip()
-        
-        # Variables
-        saldo_anterior = 0.0
-        cuota_actual = 0.0
-        intereses_mora = 0.0
-        otros = 0.0
-        total_a_pagar = 0.0
-        
-        # Buscar valores
-        for i in range(idx + 1, min(idx + 35, len(df))):
-            fila = df.iloc[i]
-            fila_values = list(fila.values)
-            fila_str = ' '.join([str(x) for x in fila_values if pd.notna(x)])
-            
-            if i > idx + 3 and ('LOCAL:' in fila_str or 'OF:' in fila_str):
-                break
-            
-            # SALDO ANTERIOR
-            if 'Saldo anterior' in fila_str or 'Saldo  anterior' in fila_str:
-                for val in fila_values:
-                    if isinstance(val, (int, float)) and val > 0:
-                        saldo_anterior = val
-                        break
-            
-            # OTROS / RECIBOS DE CAJA
-            if 'Recibos de caja' in fila_str or 'Rec.de Caja' in fila_str:
-                for val in fila_values:
-                    if isinstance(val, (int, float)) and val < 0:
-                        otros += val
-            
-            # INTERESES
-            if 'Intereses por mora' in fila_str or 'Inter.xMora' in fila_str:
-                for val in fila_values:
-                    if isinstance(val, (int, float)) and 0 < val < 100000:
-                        intereses_mora += val
-                        break
-            
-            # CUOTA ACTUAL
-            if 'Cuota administracion' in fila_str or 'Cuota administración' in fila_str:
-                for val in fila_values:
-                    if isinstance(val, (int, float)) and val > 100000:
-                        cuota_actual = val
-                        break
-            
-            # TOTAL A PAGAR
-            if 'Total a pagar' in fila_str or 'Total  a  pagar' in fila_str:
-                valores_numericos = [v for v in fila_values if isinstance(v, (int, float)) and not pd.isna(v) and v > 0]
-                if valores_numericos:
-                    total_a_pagar = valores_numericos[-1]
-                break
-        
-        # Cálculos de Negocio
-        deuda_vencida = total_a_pagar - cuota_actual
-        if deuda_vencida <= 0: deuda_vencida = 0.0
-        
-        edad_vencida = 0.00
-        if cuota_actual > 0:
-            edad_vencida = round(deuda_vencida / cuota_actual, 2)
-        
-        # Clasificación
-        if edad_vencida <= 0:
-            tipo_carta = 'AD'
-            estado_real = 'AL_DIA'
-        elif 0 < edad_vencida <= 1:
-            tipo_carta = 'CS'
-            estado_real = 'MORA_BAJA'
-        elif 1 < edad_vencida <= 2:
-            tipo_carta = 'CP'
-            estado_real = 'MORA_MODERADA'
-        elif 2 < edad_vencida < 6:
-            tipo_carta = 'AB'
-            estado_real = 'RIESGO_ALTO'
+        try:
+            trabajo = json.loads(linea)
+            if not isinstance(trabajo, dict):
+                raise ValueError("job must be a JSON object")
+        except ValueError as e:
+            respuesta = {'id': None, 'error': f"Invalid job: {e}"}
         else:
-            tipo_carta = 'AB'
-            estado_real = 'CRITICO'
-
-        unidades.append({
-            'unit_number': local_ofi,
-            'owner_name': propietario,
-            'financials': {
-                'prev_balance': saldo_anterior,
-                'current_fee': cuota_actual,
-                'interest': intereses_mora,
-                'adjustments': otros,
-                'total_debt': total_a_pagar
-            },
-            'analysis': {
-                'overdue_amount': deuda_vencida,
-                'months_overdue': edad_vencida,
-                'risk_status': estado_real,
-                'action_class': tipo_carta
-            }
-        })
-    
-    return unidades
+            respuesta = ejecutar_trabajo(trabajo)
+        salida.write(json.dumps(respuesta, default=a_json) + '\n')
+        salida.flush()
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description="Motor ETL de reportes de cartera")
+    parser.add_argument('file', nargs='?', help="Reporte .xls/.xlsx a analizar")
+    parser.add_argument('--serve', action='store_true', help="Modo residente: trabajos JSONL por stdin")
+    parser.add_argument('--no-cache', action='store_true', help="No usar el cache de resultados")
+    parser.add_argument('--ndjson', action='store_true', help="Una línea JSON por unidad y un resumen al final")
+    parser.add_argument('--workers', type=int, default=None, help="Con --all-sheets, procesos para analizar hojas en paralelo")
+    parser.add_argument('--layout', default=PERFIL_DEFAULT, help="Perfil de formato (nombre en perfiles/ o ruta a un JSON)")
+    parser.add_argument('--profile', action='store_true', help="Métricas por etapa en stderr (también con ETL_PROFILE=1)")
+    parser.add_argument('--profile-out', help="Guardar un volcado de cProfile (pstats) de la ejecución")
+    parser.add_argument('--probe', action='store_true', help="Solo sondear el reporte (perfil, periodo, NIT, unidades estimadas); ver etl_probe.py")
+    parser.add_argument('--all-sheets', action='store_true', help="Analizar todas las hojas reconocidas del libro, agrupadas por hoja; ver etl_libro.py")
+    parser.add_argument('--progress', action='store_true', help="Avance {\"progress\": {rows, units}} en stderr tras cada lote")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        cache = None
+    if args.progress:
+        avance = imprimir_avance
+
+    if args.serve:
+        sys.stdin.reconfigure(encoding='utf-8')
+        servir(sys.stdin, sys.stdout)
+        sys.exit(0)
+
+    if not args.file:
         print(json.dumps({"error": "No input file provided"}))
         sys.exit(1)
-        
-    input_file = sys.argv[1]
-    results = analizar_reporte(input_file)
-    print(json.dumps(results, indent=2))
+
+    if args.probe:
+        from etl_probe import sondear_reporte
+        try:
+            print(json.dumps(sondear_reporte(args.file), indent=2, ensure_ascii=False))
+        except Exception as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
+        sys.exit(0)
+
+    if args.all_sheets:
+        from etl_libro import analizar_libro
+        try:
+            print(json.dumps(analizar_libro(args.file, args.layout, args.workers), indent=2, default=a_json))
+        except Exception as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
+        sys.exit(0)
+
+    if args.profile or PERFILAR:
+        iniciar_metricas()
+    perfilador = None
+    if args.profile_out:
+        import cProfile
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+
+    if args.ndjson:
+        escribir_ndjson(args.file, sys.stdout, perfil=args.layout)
+    else:
+        results = analizar_reporte(args.file, perfil=args.layout)
+        with etapa('serialize'):
+            salida = json.dumps(results, indent=2, default=a_json)
+        print(salida)
+
+    if perfilador is not None:
+        perfilador.disable()
+        perfilador.dump_stats(args.profile_out)
+    if metricas is not None:
+        print(json.dumps({'metrics': metricas.como_dict()}), file=sys.stderr)
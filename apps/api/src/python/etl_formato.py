@@ -0,0 +1,20 @@
+"""Formatos en español compartidos por las salidas del motor (cartas, tablas Markdown)."""
+
+MESES = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio',
+         'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre']
+
+def formato_pesos(valor):
+    """Pesos sin decimales con miles en punto ('$ 1.554.749'), como formatCurrency en la web"""
+    texto = f"$ {abs(round(valor)):,}".replace(',', '.')
+    return f"-{texto}" if valor < 0 else texto
+
+def formato_fecha(fecha):
+    """'08 de enero de 2026'"""
+    return f"{fecha.day:02d} de {MESES[fecha.month - 1]} de {fecha.year}"
+
+def nombre_periodo(periodo):
+    """'2026-01' -> 'Enero 2026'"""
+    if not periodo:
+        return 'Sin periodo'
+    anio, mes = periodo.split('-')
+    return f"{MESES[int(mes) - 1].capitalize()} {anio}"
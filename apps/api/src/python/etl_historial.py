@@ -0,0 +1,304 @@
+"""Historial de cartera entre periodos (SQLite).
+
+Cada periodo analizado se agrega con sus unidades; la clave primaria
+(complex, unit_number, period) deja la serie de una unidad contigua en disco y
+los índices por periodo resuelven las transiciones entre estados y los mayores
+deudores sin recorrer el resto del historial:
+
+    python etl_historial.py add "FACT ENE-26.xls" --complex ciudad-jardin
+    python etl_historial.py series L102 --complex ciudad-jardin --last 12
+    python etl_historial.py roll-rate --complex ciudad-jardin            # últimos dos periodos
+    python etl_historial.py entered CRITICO --complex ciudad-jardin
+    python etl_historial.py top --complex ciudad-jardin --limit 20
+"""
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from etl_profiles import PERFIL_DEFAULT, cargar_perfil
+from etl_unidades import CAMPOS_ANALISIS, CAMPOS_FINANCIEROS
+
+CAMPOS_UNIDAD = ('owner_name',) + CAMPOS_FINANCIEROS + CAMPOS_ANALISIS
+
+# Campos por los que se puede ordenar el ranking de deudores
+CAMPOS_RANKING = ('total_debt', 'overdue_amount', 'months_overdue', 'interest')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS periods (
+    complex TEXT NOT NULL,
+    period TEXT NOT NULL,
+    source_sha256 TEXT,
+    units INTEGER NOT NULL,
+    loaded_at REAL NOT NULL,
+    PRIMARY KEY (complex, period)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS unit_history (
+    complex TEXT NOT NULL,
+    unit_number TEXT NOT NULL,
+    period TEXT NOT NULL,
+    owner_name TEXT,
+    prev_balance REAL,
+    current_fee REAL,
+    interest REAL,
+    adjustments REAL,
+    total_debt REAL,
+    overdue_amount REAL,
+    months_overdue REAL,
+    risk_status TEXT,
+    action_class TEXT,
+    PRIMARY KEY (complex, unit_number, period)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS unit_history_status ON unit_history (complex, period, risk_status);
+CREATE INDEX IF NOT EXISTS unit_history_debt ON unit_history (complex, period, total_debt);
+"""
+
+def directorio_datos():
+    """Directorio de datos de la aplicación del usuario: sobrevive a reinicios, a diferencia del temporal"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'cartera-lc')
+
+def ruta_por_defecto():
+    """ETL_HISTORY_DB o historial-cartera.db en el directorio de datos de la aplicación"""
+    return os.environ.get('ETL_HISTORY_DB') or os.path.join(directorio_datos(), 'historial-cartera.db')
+
+class HistorialCartera:
+    """Unidades de cada periodo analizado, por conjunto"""
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or ruta_por_defecto()
+        os.makedirs(os.path.dirname(os.path.abspath(self.ruta)), exist_ok=True)
+        self.conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.execute('PRAGMA journal_mode=WAL')
+        self.conexion.execute('PRAGMA synchronous=NORMAL')
+        self.conexion.executescript(ESQUEMA)
+
+    def registrar(self, unidades, complejo, periodo, sha=None):
+        """Guarda las unidades de un periodo; si el periodo ya estaba, lo reemplaza"""
+        filas = [
+            (complejo, unidad.unit_number, periodo, *(getattr(unidad, campo) for campo in CAMPOS_UNIDAD))
+            for unidad in unidades
+        ]
+        # Una unidad repetida en el reporte queda con su última aparición
+        total = len({fila[1] for fila in filas})
+        marcadores = ', '.join('?' * (3 + len(CAMPOS_UNIDAD)))
+        with self._transaccion():
+            self.conexion.execute('DELETE FROM unit_history WHERE complex = ? AND period = ?', (complejo, periodo))
+            self.conexion.executemany(
+                f"INSERT OR REPLACE INTO unit_history (complex, unit_number, period, {', '.join(CAMPOS_UNIDAD)}) VALUES ({marcadores})",
+                filas
+            )
+            self.conexion.execute(
+                'INSERT OR REPLACE INTO periods (complex, period, source_sha256, units, loaded_at) VALUES (?, ?, ?, ?, ?)',
+                (complejo, periodo, sha, total, time.time())
+            )
+        return {'complex': complejo, 'period': periodo, 'units': total}
+
+    def registrar_reporte(self, file_path, complejo, periodo=None, perfil=PERFIL_DEFAULT, unidades=None):
+        """Guarda las unidades del reporte (el periodo sale del nombre si no se indica).
+
+        Si ya se analizó, `unidades` evita volver a leerlo.
+        """
+        from etl_cache import hash_archivo
+        from etl_engine import unidades_reporte
+        from etl_probe import periodo_desde_nombre
+
+        periodo = periodo or periodo_desde_nombre(file_path)
+        if not periodo:
+            raise ValueError(f"Cannot infer the period from '{os.path.basename(file_path)}'; pass --period YYYY-MM")
+        if unidades is None:
+            unidades = unidades_reporte(file_path, perfil=perfil)
+        return self.registrar(unidades, complejo, periodo, hash_archivo(file_path))
+
+    def periodos(self, complejo):
+        filas = self.conexion.execute(
+            'SELECT period, units, source_sha256, loaded_at FROM periods WHERE complex = ? ORDER BY period', (complejo,)
+        ).fetchall()
+        return [dict(fila) for fila in filas]
+
+    def serie_unidad(self, complejo, unidad, ultimos=None, desde=None, hasta=None):
+        """Historia de una unidad, del periodo más antiguo al más reciente"""
+        condiciones, parametros = self._rango(desde, hasta)
+        consulta = (
+            f"SELECT period, {', '.join(CAMPOS_UNIDAD)} FROM unit_history "
+            f"WHERE complex = ? AND unit_number = ?{condiciones} ORDER BY period DESC"
+        )
+        if ultimos:
+            consulta += f" LIMIT {int(ultimos)}"
+        filas = self.conexion.execute(consulta, (complejo, unidad, *parametros)).fetchall()
+        return [dict(fila) for fila in reversed(filas)]
+
+    def matriz_transicion(self, complejo, desde=None, hasta=None, perfil=PERFIL_DEFAULT):
+        """Cuántas unidades pasaron de cada estado de riesgo a cada otro entre dos periodos.
+
+        Por defecto compara los dos últimos periodos del conjunto. `rates` es la
+        proporción de cada fila (estado de origen) que terminó en cada estado;
+        las unidades que aparecen o desaparecen se cuentan aparte.
+        """
+        desde, hasta = self._par_periodos(complejo, desde, hasta)
+        conteos = self.conexion.execute(
+            """
+            SELECT a.risk_status, b.risk_status, COUNT(*) FROM unit_history a
+            JOIN unit_history b ON b.complex = a.complex AND b.unit_number = a.unit_number AND b.period = ?
+            WHERE a.complex = ? AND a.period = ?
+            GROUP BY a.risk_status, b.risk_status
+            """,
+            (hasta, complejo, desde)
+        ).fetchall()
+        estados = list(cargar_perfil(perfil).reglas.estados.etiquetas)
+        for origen, destino, _ in conteos:
+            for estado in (origen, destino):
+                if estado not in estados:
+                    estados.append(estado)
+
+        matriz = {origen: {destino: 0 for destino in estados} for origen in estados}
+        for origen, destino, cantidad in conteos:
+            matriz[origen][destino] = cantidad
+        tasas = {}
+        for origen, fila in matriz.items():
+            total = sum(fila.values())
+            tasas[origen] = {destino: round(cantidad / total, 4) if total else 0.0 for destino, cantidad in fila.items()}
+
+        comunes = sum(cantidad for _, _, cantidad in conteos)
+        unidades = {periodo: self._contar(complejo, periodo) for periodo in (desde, hasta)}
+        return {
+            'complex': complejo,
+            'from': desde,
+            'to': hasta,
+            'states': estados,
+            'counts': matriz,
+            'rates': tasas,
+            'units_both': comunes,
+            'units_gone': unidades[desde] - comunes,
+            'units_new': unidades[hasta] - comunes,
+        }
+
+    def entraron_a(self, complejo, estado, periodo=None):
+        """Unidades que están en `estado` en el periodo y no lo estaban en el anterior (p. ej. recién CRITICO)"""
+        anterior, periodo = self._par_periodos(complejo, None, periodo)
+        filas = self.conexion.execute(
+            f"""
+            SELECT b.unit_number, a.risk_status AS previous_status, a.months_overdue AS previous_months_overdue,
+                   {', '.join('b.' + campo for campo in CAMPOS_UNIDAD)}
+            FROM unit_history b
+            LEFT JOIN unit_history a ON a.complex = b.complex AND a.unit_number = b.unit_number AND a.period = ?
+            WHERE b.complex = ? AND b.period = ? AND b.risk_status = ? AND a.risk_status IS NOT ?
+            ORDER BY b.total_debt DESC
+            """,
+            (anterior, complejo, periodo, estado, estado)
+        ).fetchall()
+        return {'complex': complejo, 'status': estado, 'from': anterior, 'to': periodo, 'units': [dict(fila) for fila in filas]}
+
+    def mayores_deudores(self, complejo, periodo=None, limite=10, campo='total_debt'):
+        """Las `limite` unidades con mayor `campo` en el periodo (por defecto el último)"""
+        if campo not in CAMPOS_RANKING:
+            raise ValueError(f"Cannot rank by '{campo}' (expected one of {', '.join(CAMPOS_RANKING)})")
+        periodo = periodo or self._ultimo_periodo(complejo)
+        filas = self.conexion.execute(
+            f"SELECT unit_number, {', '.join(CAMPOS_UNIDAD)} FROM unit_history "
+            f"WHERE complex = ? AND period = ? ORDER BY {campo} DESC LIMIT ?",
+            (complejo, periodo, int(limite))
+        ).fetchall()
+        return {'complex': complejo, 'period': periodo, 'by': campo, 'units': [dict(fila) for fila in filas]}
+
+    @contextlib.contextmanager
+    def _transaccion(self):
+        self.conexion.execute('BEGIN')
+        try:
+            yield
+        except BaseException:
+            self.conexion.execute('ROLLBACK')
+            raise
+        self.conexion.execute('COMMIT')
+
+    @staticmethod
+    def _rango(desde, hasta):
+        condiciones, parametros = '', []
+        if desde:
+            condiciones += ' AND period >= ?'
+            parametros.append(desde)
+        if hasta:
+            condiciones += ' AND period <= ?'
+            parametros.append(hasta)
+        return condiciones, parametros
+
+    def _contar(self, complejo, periodo):
+        fila = self.conexion.execute('SELECT units FROM periods WHERE complex = ? AND period = ?', (complejo, periodo)).fetchone()
+        return fila['units'] if fila else 0
+
+    def _ultimo_periodo(self, complejo, antes_de=None):
+        consulta = 'SELECT MAX(period) FROM periods WHERE complex = ?'
+        parametros = [complejo]
+        if antes_de:
+            consulta += ' AND period < ?'
+            parametros.append(antes_de)
+        periodo = self.conexion.execute(consulta, parametros).fetchone()[0]
+        if periodo is None:
+            raise ValueError(f"No history for '{complejo}'" + (f" before {antes_de}" if antes_de else ''))
+        return periodo
+
+    def _par_periodos(self, complejo, desde, hasta):
+        """(periodo de origen, periodo de destino): por defecto el último y el inmediatamente anterior"""
+        hasta = hasta or self._ultimo_periodo(complejo)
+        return desde or self._ultimo_periodo(complejo, antes_de=hasta), hasta
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Historial de cartera entre periodos")
+    parser.add_argument('--db', default=None, help="Base SQLite del historial (por defecto ETL_HISTORY_DB o ~/.local/share/cartera-lc/historial-cartera.db)")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    agregar = comandos.add_parser('add', help="Agregar (o reemplazar) el periodo de un reporte")
+    agregar.add_argument('file')
+    agregar.add_argument('--complex', required=True, help="Identificador del conjunto")
+    agregar.add_argument('--period', help="Periodo YYYY-MM (por defecto se toma del nombre: 'FACT ENE-26.xls' -> 2026-01)")
+    agregar.add_argument('--layout', default=PERFIL_DEFAULT)
+    listar = comandos.add_parser('periods', help="Periodos guardados de un conjunto")
+    listar.add_argument('--complex', required=True)
+    serie = comandos.add_parser('series', help="Historia de una unidad")
+    serie.add_argument('unit')
+    serie.add_argument('--complex', required=True)
+    serie.add_argument('--last', type=int, help="Solo los últimos N periodos")
+    serie.add_argument('--from', dest='desde')
+    serie.add_argument('--to', dest='hasta')
+    transicion = comandos.add_parser('roll-rate', help="Matriz de transición de estados entre dos periodos")
+    transicion.add_argument('--complex', required=True)
+    transicion.add_argument('--from', dest='desde', help="Periodo de origen (por defecto el anterior a --to)")
+    transicion.add_argument('--to', dest='hasta', help="Periodo de destino (por defecto el último)")
+    transicion.add_argument('--layout', default=PERFIL_DEFAULT, help="Perfil con el orden de los estados")
+    entraron = comandos.add_parser('entered', help="Unidades que acaban de entrar a un estado")
+    entraron.add_argument('status')
+    entraron.add_argument('--complex', required=True)
+    entraron.add_argument('--period', help="Periodo (por defecto el último)")
+    ranking = comandos.add_parser('top', help="Mayores deudores de un periodo")
+    ranking.add_argument('--complex', required=True)
+    ranking.add_argument('--period', help="Periodo (por defecto el último)")
+    ranking.add_argument('--limit', type=int, default=10)
+    ranking.add_argument('--by', choices=CAMPOS_RANKING, default='total_debt')
+    args = parser.parse_args()
+
+    try:
+        historial = HistorialCartera(args.db)
+        if args.comando == 'add':
+            if not os.path.exists(args.file):
+                raise FileNotFoundError(f"File not found: {args.file}")
+            resultado = historial.registrar_reporte(args.file, args.complex, args.period, args.layout)
+        elif args.comando == 'periods':
+            resultado = historial.periodos(args.complex)
+        elif args.comando == 'series':
+            resultado = historial.serie_unidad(args.complex, args.unit, args.last, args.desde, args.hasta)
+        elif args.comando == 'roll-rate':
+            resultado = historial.matriz_transicion(args.complex, args.desde, args.hasta, args.layout)
+        elif args.comando == 'entered':
+            resultado = historial.entraron_a(args.complex, args.status, args.period)
+        else:
+            resultado = historial.mayores_deudores(args.complex, args.period, args.limit, args.by)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
@@ -0,0 +1,293 @@
+"""Cola local de análisis (SQLite) y ejecutor asyncio con concurrencia limitada.
+
+    python etl_jobs.py submit "FACT ENE-26.xls"      # -> {"id": ...}
+    python etl_jobs.py status <id>                    # estado, filas y unidades procesadas
+    python etl_jobs.py cancel <id>
+    python etl_jobs.py run --concurrency 2            # ejecutor (--once: termina con la cola vacía)
+
+Cada trabajo corre `etl_engine.py --ndjson --progress` en un subproceso: las
+unidades van a <id>.ndjson junto a la cola (solo si el trabajo termina bien) y
+el avance queda en la base.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
+MOTOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'etl_engine.py')
+PERFIL_DEFAULT = 'diprosoft'
+
+# Segundos entre revisiones de la cola y de las cancelaciones pedidas
+INTERVALO = 0.5
+
+# Un trabajo 'running' sin latido de su ejecutor en este tiempo se considera interrumpido
+PLAZO_LATIDO = 30
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    layout TEXT NOT NULL,
+    status TEXT NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0,
+    units INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    output TEXT,
+    summary TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    runner TEXT,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+def ruta_por_defecto():
+    """ETL_JOBS_DB o un archivo en el directorio temporal"""
+    return os.environ.get('ETL_JOBS_DB') or os.path.join(tempfile.gettempdir(), 'cartera-lc-etl-jobs', 'jobs.db')
+
+class ColaTrabajos:
+    """Trabajos de análisis persistidos en SQLite: queued -> running -> done/failed/cancelled"""
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or ruta_por_defecto()
+        self.directorio = os.path.dirname(os.path.abspath(self.ruta))
+        os.makedirs(self.directorio, exist_ok=True)
+        self.conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.execute('PRAGMA journal_mode=WAL')
+        self.conexion.executescript(ESQUEMA)
+        # Bases creadas antes de que hubiera latidos
+        columnas = {fila['name'] for fila in self.conexion.execute('PRAGMA table_info(jobs)')}
+        for columna, tipo in (('runner', 'TEXT'), ('heartbeat_at', 'REAL')):
+            if columna not in columnas:
+                self.conexion.execute(f'ALTER TABLE jobs ADD COLUMN {columna} {tipo}')
+        # Identifica a este ejecutor en los trabajos que toma
+        self.ejecutor = uuid.uuid4().hex
+
+    def encolar(self, file_path, perfil=PERFIL_DEFAULT):
+        id_trabajo = uuid.uuid4().hex
+        self.conexion.execute(
+            'INSERT INTO jobs (id, file, layout, status, created_at) VALUES (?, ?, ?, ?, ?)',
+            (id_trabajo, os.path.abspath(file_path), perfil, 'queued', time.time())
+        )
+        return id_trabajo
+
+    def estado(self, id_trabajo):
+        fila = self.conexion.execute('SELECT * FROM jobs WHERE id = ?', (id_trabajo,)).fetchone()
+        if fila is None:
+            return None
+        trabajo = dict(fila)
+        trabajo['summary'] = json.loads(trabajo['summary']) if trabajo['summary'] else None
+        trabajo['cancel_requested'] = bool(trabajo['cancel_requested'])
+        return trabajo
+
+    def listar(self, limite=50):
+        filas = self.conexion.execute('SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?', (limite,)).fetchall()
+        return [self.estado(fila['id']) for fila in filas]
+
+    def cancelar(self, id_trabajo):
+        """Cancela un trabajo en cola de inmediato; uno en curso se detiene en la próxima revisión del ejecutor"""
+        ahora = time.time()
+        self.conexion.execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+            (ahora, id_trabajo)
+        )
+        self.conexion.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (id_trabajo,))
+        return self.estado(id_trabajo)
+
+    def tomar(self):
+        """Marca como 'running' el trabajo más antiguo en cola y lo devuelve (None si no hay)"""
+        while True:
+            fila = self.conexion.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if fila is None:
+                return None
+            ahora = time.time()
+            cursor = self.conexion.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, runner = ?, heartbeat_at = ? WHERE id = ? AND status = 'queued'",
+                (ahora, self.ejecutor, ahora, fila['id'])
+            )
+            # Otro ejecutor pudo tomarlo entre la consulta y la actualización
+            if cursor.rowcount:
+                return self.estado(fila['id'])
+
+    def actualizar(self, id_trabajo, **campos):
+        """Actualiza un trabajo tomado por este ejecutor (si se reencoló y lo tomó otro, no lo toca)"""
+        if 'summary' in campos and campos['summary'] is not None:
+            campos['summary'] = json.dumps(campos['summary'])
+        asignaciones = ', '.join(f"{campo} = ?" for campo in campos)
+        self.conexion.execute(
+            f"UPDATE jobs SET {asignaciones} WHERE id = ? AND runner = ?",
+            (*campos.values(), id_trabajo, self.ejecutor)
+        )
+
+    def latido(self, id_trabajo):
+        """Renueva el plazo de un trabajo en curso"""
+        self.actualizar(id_trabajo, heartbeat_at=time.time())
+
+    def cancelacion_pedida(self, id_trabajo):
+        fila = self.conexion.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (id_trabajo,)).fetchone()
+        return bool(fila and fila['cancel_requested'])
+
+    def reencolar_interrumpidos(self, plazo=PLAZO_LATIDO):
+        """Trabajos 'running' cuyo ejecutor dejó de dar latidos vuelven a la cola.
+
+        Los que otro ejecutor sigue procesando sobre la misma base no se tocan.
+        """
+        self.conexion.execute(
+            "UPDATE jobs SET status = 'queued', rows = 0, units = 0, runner = NULL, heartbeat_at = NULL "
+            "WHERE status = 'running' AND COALESCE(heartbeat_at, started_at, 0) < ?",
+            (time.time() - plazo,)
+        )
+
+def salida_temporal(cola, id_trabajo):
+    """Archivo donde se escriben las unidades mientras corre el trabajo (uno por ejecutor)"""
+    return os.path.join(cola.directorio, f"{id_trabajo}.{cola.ejecutor}.ndjson.tmp")
+
+async def ejecutar_trabajo(cola, trabajo):
+    """Corre el motor para un trabajo, registrando avance y resultado; lo detiene si se pide cancelar"""
+    id_trabajo = trabajo['id']
+    salida = os.path.join(cola.directorio, f"{id_trabajo}.ndjson")
+    temporal = salida_temporal(cola, id_trabajo)
+    proceso = await asyncio.create_subprocess_exec(
+        sys.executable, MOTOR, trabajo['file'], '--ndjson', '--progress', '--layout', trabajo['layout'],
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    final = {}
+    errores = []
+
+    async def leer_unidades():
+        with open(temporal, 'wb') as f:
+            async for linea in proceso.stdout:
+                if linea.startswith(b'{"summary"') or linea.startswith(b'{"error"'):
+                    final.update(json.loads(linea))
+                else:
+                    f.write(linea)
+
+    async def leer_avance():
+        async for linea in proceso.stderr:
+            try:
+                mensaje = json.loads(linea)
+            except ValueError:
+                errores.append(linea.decode('utf-8', 'replace'))
+                continue
+            if isinstance(mensaje, dict) and 'progress' in mensaje:
+                cola.actualizar(id_trabajo, rows=mensaje['progress']['rows'], units=mensaje['progress']['units'])
+
+    cancelado = False
+
+    async def vigilar():
+        nonlocal cancelado
+        while proceso.returncode is None:
+            await asyncio.sleep(INTERVALO)
+            if proceso.returncode is None:
+                cola.latido(id_trabajo)
+                if cola.cancelacion_pedida(id_trabajo):
+                    cancelado = True
+                    proceso.kill()
+                    return
+
+    vigilancia = asyncio.create_task(vigilar())
+    try:
+        await asyncio.gather(leer_unidades(), leer_avance())
+        codigo = await proceso.wait()
+    finally:
+        vigilancia.cancel()
+        # Un fallo al leer la salida no debe dejar el motor corriendo
+        if proceso.returncode is None:
+            proceso.kill()
+            await proceso.wait()
+
+    ahora = time.time()
+    if cancelado:
+        cola.actualizar(id_trabajo, status='cancelled', finished_at=ahora)
+    elif 'summary' in final:
+        os.replace(temporal, salida)
+        cola.actualizar(id_trabajo, status='done', output=salida, summary=final['summary'],
+                        units=final['summary']['units'], finished_at=ahora)
+    else:
+        error = final.get('error') or ''.join(errores).strip() or f"Engine exited with code {codigo}"
+        cola.actualizar(id_trabajo, status='failed', error=error, finished_at=ahora)
+
+async def correr_trabajo(cola, trabajo):
+    """ejecutar_trabajo; si falla (p. ej. al lanzar o leer el motor) el trabajo queda 'failed' con el error.
+
+    Las unidades de un trabajo que no terminó bien (fallido o cancelado) se borran.
+    """
+    try:
+        await ejecutar_trabajo(cola, trabajo)
+    except Exception as e:
+        cola.actualizar(trabajo['id'], status='failed', error=str(e) or type(e).__name__, finished_at=time.time())
+    finally:
+        temporal = salida_temporal(cola, trabajo['id'])
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+async def ejecutar_cola(cola, concurrencia=2, una_vez=False):
+    """Toma trabajos de la cola y los corre con a lo sumo `concurrencia` a la vez"""
+    revision = None
+    en_curso = set()
+    while True:
+        # Trabajos de ejecutores que se detuvieron (al arrancar y luego cada tanto)
+        if revision is None or time.monotonic() - revision >= PLAZO_LATIDO:
+            cola.reencolar_interrumpidos()
+            revision = time.monotonic()
+        while len(en_curso) < concurrencia:
+            trabajo = cola.tomar()
+            if trabajo is None:
+                break
+            en_curso.add(asyncio.create_task(correr_trabajo(cola, trabajo)))
+
+        if not en_curso:
+            if una_vez:
+                return
+            await asyncio.sleep(INTERVALO)
+            continue
+        terminados, en_curso = await asyncio.wait(en_curso, timeout=INTERVALO, return_when=asyncio.FIRST_COMPLETED)
+        for tarea in terminados:
+            # correr_trabajo ya registra los fallos del trabajo; aquí solo quedan los de la propia cola
+            if not tarea.cancelled() and tarea.exception() is not None:
+                print(json.dumps({"error": f"Job runner error: {tarea.exception()}"}), file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cola local de análisis de reportes de cartera")
+    parser.add_argument('--db', default=None, help="Base SQLite de la cola (por defecto ETL_JOBS_DB o el directorio temporal)")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    enviar = comandos.add_parser('submit', help="Encolar un reporte")
+    enviar.add_argument('file')
+    enviar.add_argument('--layout', default=PERFIL_DEFAULT)
+    consultar = comandos.add_parser('status', help="Estado de un trabajo")
+    consultar.add_argument('id')
+    cancelar = comandos.add_parser('cancel', help="Cancelar un trabajo")
+    cancelar.add_argument('id')
+    comandos.add_parser('list', help="Últimos trabajos")
+    ejecutar = comandos.add_parser('run', help="Ejecutar los trabajos en cola")
+    ejecutar.add_argument('--concurrency', type=int, default=int(os.environ.get('ETL_JOBS_CONCURRENCY', '2')))
+    ejecutar.add_argument('--once', action='store_true', help="Terminar cuando la cola quede vacía")
+    args = parser.parse_args()
+
+    cola = ColaTrabajos(args.db)
+    if args.comando == 'submit':
+        if not os.path.exists(args.file):
+            print(json.dumps({"error": f"File not found: {args.file}"}))
+            sys.exit(1)
+        print(json.dumps({'id': cola.encolar(args.file, args.layout)}))
+    elif args.comando in ('status', 'cancel'):
+        trabajo = cola.estado(args.id) if args.comando == 'status' else cola.cancelar(args.id)
+        if trabajo is None:
+            print(json.dumps({"error": f"Job not found: {args.id}"}))
+            sys.exit(1)
+        print(json.dumps(trabajo))
+    elif args.comando == 'list':
+        print(json.dumps(cola.listar()))
+    else:
+        asyncio.run(ejecutar_cola(cola, args.concurrency, args.once))
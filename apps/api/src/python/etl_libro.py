@@ -0,0 +1,95 @@
+"""Análisis de libros con varias hojas (un edificio o un mes por hoja).
+
+El libro se abre una vez para reconocer el perfil de cada hoja por sus
+primeras filas; las hojas reconocidas se analizan en procesos paralelos que
+abren el libro una vez cada uno y leen solo las hojas que les tocan:
+
+    python etl_libro.py "CARTERA 2026.xlsx"
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from etl_engine import iterar_unidades, resumen_unidades
+from etl_probe import FILAS_CABEZA, detectar_perfil, metadatos_cabeza, periodo_desde_nombre, texto_celdas
+from etl_profiles import cargar_perfil
+from etl_reader import abrir_libro, cerrar_libro, filas_hoja, nombres_hojas
+from etl_unidades import a_json
+
+# Libro abierto del proceso; cada worker abre el suyo al iniciar
+_libro = None
+
+def reconocer_hojas(book, file_path, perfil=None):
+    """Perfil, periodo y conjunto de cada hoja según sus primeras filas.
+
+    Con `perfil` solo se prueba ese perfil; si no, todos los incluidos. El
+    periodo sale del contenido ('Fecha:'), del nombre de la hoja ('ENE-26') o
+    del nombre del archivo, en ese orden.
+    """
+    hojas = []
+    for indice, nombre in enumerate(nombres_hojas(book)):
+        cabeza = [texto_celdas(fila) for fila in itertools.islice(filas_hoja(book, indice, encabezado=True), FILAS_CABEZA)]
+        encontrado, _ = detectar_perfil(cabeza, [perfil] if perfil else None)
+        metadatos = metadatos_cabeza(cabeza, file_path)
+        if metadatos['period_source'] != 'content' and periodo_desde_nombre(nombre):
+            metadatos.update(period=periodo_desde_nombre(nombre), period_source='sheet_name')
+        hojas.append({'index': indice, 'sheet': nombre, 'layout': encontrado, 'recognized': encontrado is not None, **metadatos})
+    return hojas
+
+def iniciar_worker(file_path):
+    # No se reutiliza el libro heredado por fork: sus descriptores comparten la
+    # posición con el proceso padre y con los demás workers
+    global _libro
+    _libro = abrir_libro(file_path)
+
+def analizar_hoja_libro(indice, perfil):
+    """Unidades e indicadores de una hoja del libro abierto"""
+    unidades = list(iterar_unidades(filas_hoja(_libro, indice), perfil=cargar_perfil(perfil)))
+    return unidades, resumen_unidades(unidades, perfil)
+
+def analizar_libro(file_path, perfil=None, workers=None):
+    """Analiza todas las hojas reconocidas del libro y agrupa las unidades por hoja"""
+    global _libro
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    inicio = time.perf_counter()
+    _libro = abrir_libro(file_path)
+    try:
+        hojas = reconocer_hojas(_libro, file_path, perfil)
+        reconocidas = [hoja for hoja in hojas if hoja['recognized']]
+        workers = min(workers or os.cpu_count() or 1, len(reconocidas))
+        if workers > 1:
+            with ProcessPoolExecutor(workers, initializer=iniciar_worker, initargs=(file_path,)) as pool:
+                resultados = list(pool.map(analizar_hoja_libro, [hoja['index'] for hoja in reconocidas], [hoja['layout'] for hoja in reconocidas]))
+        else:
+            resultados = [analizar_hoja_libro(hoja['index'], hoja['layout']) for hoja in reconocidas]
+    finally:
+        cerrar_libro(_libro)
+        _libro = None
+
+    for hoja, (unidades, resumen) in zip(reconocidas, resultados):
+        hoja['units'] = unidades
+        hoja['summary'] = resumen
+    return {
+        'file': os.path.basename(file_path),
+        'sheets': hojas,
+        'elapsed_ms': round((time.perf_counter() - inicio) * 1000, 1)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analiza todas las hojas reconocidas de un libro (un edificio o un mes por hoja)")
+    parser.add_argument('file', help="Libro .xls/.xlsx")
+    parser.add_argument('--layout', help="Perfil de formato para todas las hojas (por defecto se detecta por hoja)")
+    parser.add_argument('--workers', type=int, help="Procesos para analizar hojas en paralelo (por defecto uno por CPU)")
+    args = parser.parse_args()
+
+    try:
+        resultado = analizar_libro(args.file, args.layout, args.workers)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False, default=a_json))
@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import uuid
+
+from etl_conciliacion import clave_unidad
+from etl_engine import PERFIL_DEFAULT, unidades_reporte
+
+# Columnas de la tabla de staging, en el orden en que se copian
+COLUMNAS_STAGING = [
+    'seq', 'unit_id', 'balance_id', 'identifier', 'owner_name',
+    'prev_balance', 'current_fee', 'interest', 'other_charges', 'total_debt',
+    'months_overdue', 'risk_status', 'action_type'
+]
+
+SQL_STAGING = """
+CREATE TEMP TABLE etl_staging (
+    seq integer, unit_id text, balance_id text, identifier text, owner_name text,
+    prev_balance double precision, current_fee double precision, interest double precision,
+    other_charges double precision, total_debt double precision, months_overdue double precision,
+    risk_status text, action_type text
+)
+"""
+
+# Si una unidad aparece dos veces en el reporte gana la última (como el upsert fila a fila de la API);
+# el identificador de staging ya viene unificado por clave_unidad (ver filas_staging)
+SQL_ULTIMAS = "SELECT MAX(seq) FROM etl_staging GROUP BY identifier"
+
+SQL_UNIDADES = f"""
+INSERT INTO "Unit" (id, "complexId", identifier, "ownerName", "isActive")
+SELECT unit_id, ?, identifier, owner_name, TRUE FROM etl_staging
+WHERE seq IN ({SQL_ULTIMAS})
+ON CONFLICT ("complexId", identifier) DO UPDATE SET "ownerName" = excluded."ownerName"
+"""
+
+SQL_SALDOS = f"""
+INSERT INTO "UnitBalance" (
+    id, "reportId", "unitId", "prevBalance", "currentFee", payments, interest, "otherCharges",
+    "totalDebt", "monthsOverdue", "riskStatus", "actionType", "updatedAt"
+)
+SELECT s.balance_id, ?, u.id, s.prev_balance, s.current_fee, 0, s.interest, s.other_charges,
+       s.total_debt, s.months_overdue, s.risk_status, s.action_type, CURRENT_TIMESTAMP
+FROM etl_staging s JOIN "Unit" u ON u."complexId" = ? AND u.identifier = s.identifier
+WHERE s.seq IN ({SQL_ULTIMAS})
+ON CONFLICT ("reportId", "unitId") DO UPDATE SET
+    "prevBalance" = excluded."prevBalance",
+    "currentFee" = excluded."currentFee",
+    interest = excluded.interest,
+    "otherCharges" = excluded."otherCharges",
+    "totalDebt" = excluded."totalDebt",
+    "monthsOverdue" = excluded."monthsOverdue",
+    "riskStatus" = excluded."riskStatus",
+    "actionType" = excluded."actionType",
+    "updatedAt" = excluded."updatedAt"
+"""
+
+SQL_TOTAL = """
+UPDATE "MonthlyReport" SET
+    "totalAmount" = (SELECT COALESCE(SUM("totalDebt"), 0) FROM "UnitBalance" WHERE "reportId" = ?),
+    "updatedAt" = CURRENT_TIMESTAMP
+WHERE id = ?
+"""
+
+def identificadores_por_clave(identificadores):
+    """{clave_unidad: identificador} de las unidades registradas (con claves repetidas gana el primero)"""
+    por_clave = {}
+    for identificador in identificadores:
+        por_clave.setdefault(clave_unidad(identificador), identificador)
+    return por_clave
+
+def filas_staging(unidades, registradas=None):
+    """Una fila de staging por unidad, con ids nuevos por si hay que insertarla.
+
+    La unidad se cruza por su clave canónica (clave_unidad): si el conjunto ya
+    tiene una con la misma clave ('Local 102' para 'L102') se usa su
+    identificador; si no, el del reporte. `registradas` ({clave: identificador})
+    se completa con las unidades nuevas, así las que se repiten en el reporte
+    con otra escritura quedan en la misma.
+    """
+    registradas = {} if registradas is None else registradas
+    for seq, unidad in enumerate(unidades):
+        identificador = registradas.setdefault(clave_unidad(unidad.unit_number), unidad.unit_number)
+        yield (
+            seq, str(uuid.uuid4()), str(uuid.uuid4()), identificador, unidad.owner_name,
+            unidad.prev_balance, unidad.current_fee, unidad.interest, unidad.adjustments, unidad.total_debt,
+            unidad.months_overdue, unidad.risk_status, unidad.action_class
+        )
+
+def _escapar_copy(valor):
+    """Valor en el formato de texto de COPY (tabs, saltos y backslash escapados)"""
+    if valor is None:
+        return '\\N'
+    return str(valor).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+class LectorCopy:
+    """Archivo de solo lectura que genera las líneas de COPY a medida que se piden"""
+
+    def __init__(self, filas):
+        self.lineas = ('\t'.join(_escapar_copy(v) for v in fila) + '\n' for fila in filas)
+        self.buffer = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            linea = next(self.lineas, None)
+            if linea is None:
+                break
+            self.buffer += linea
+        if size < 0:
+            size = len(self.buffer)
+        bloque, self.buffer = self.buffer[:size], self.buffer[size:]
+        return bloque
+
+class DestinoPostgres:
+    """PostgreSQL con un pool de conexiones compartido por todos los trabajos del proceso"""
+    marcador = '%s'
+    pools = {}
+
+    def __init__(self, dsn):
+        try:
+            from psycopg2 import pool
+        except ImportError:
+            raise RuntimeError("psycopg2 is required to load into PostgreSQL (pip install psycopg2-binary)")
+        if dsn not in self.pools:
+            tamano = int(os.environ.get('ETL_DB_POOL_SIZE', '2'))
+            self.pools[dsn] = pool.ThreadedConnectionPool(1, tamano, dsn)
+        self.pool = self.pools[dsn]
+
+    def conectar(self):
+        return self.pool.getconn()
+
+    def liberar(self, conexion):
+        self.pool.putconn(conexion)
+
+    def copiar(self, cursor, filas):
+        columnas = ', '.join(COLUMNAS_STAGING)
+        cursor.copy_expert(f"COPY etl_staging ({columnas}) FROM STDIN", LectorCopy(filas))
+
+class DestinoSqlite:
+    """SQLite con las mismas tablas que Prisma, para pruebas y cargas locales"""
+    marcador = '?'
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+
+    def conectar(self):
+        return sqlite3.connect(self.ruta)
+
+    def liberar(self, conexion):
+        conexion.close()
+
+    def copiar(self, cursor, filas):
+        marcadores = ', '.join('?' * len(COLUMNAS_STAGING))
+        cursor.executemany(f"INSERT INTO etl_staging ({', '.join(COLUMNAS_STAGING)}) VALUES ({marcadores})", filas)
+
+def destino_desde_url(url):
+    """postgresql://... usa PostgreSQL; sqlite:///ruta.db usa el sustituto SQLite"""
+    if url.startswith('sqlite:///'):
+        return DestinoSqlite(url[len('sqlite:///'):])
+    # Prisma agrega ?schema=public, que libpq no entiende
+    return DestinoPostgres(url.split('?schema=')[0])
+
+def cargar_unidades(destino, report_id, unidades):
+    """Copia las unidades a staging y hace el upsert de Unit y UnitBalance en una sola transacción"""
+    conexion = destino.conectar()
+    try:
+        with conexion:
+            cursor = conexion.cursor()
+            sql = lambda texto: texto.replace('?', destino.marcador)
+
+            cursor.execute(sql('SELECT "complexId" FROM "MonthlyReport" WHERE id = ?'), (report_id,))
+            fila = cursor.fetchone()
+            if fila is None:
+                raise ValueError(f"Report not found: {report_id}")
+            complex_id = fila[0]
+            cursor.execute(sql('SELECT identifier FROM "Unit" WHERE "complexId" = ? ORDER BY identifier'), (complex_id,))
+            registradas = identificadores_por_clave(fila[0] for fila in cursor.fetchall())
+
+            cursor.execute('DROP TABLE IF EXISTS etl_staging')
+            cursor.execute(SQL_STAGING)
+            destino.copiar(cursor, filas_staging(unidades, registradas))
+            cursor.execute('SELECT COUNT(*) FROM etl_staging')
+            copiadas = cursor.fetchone()[0]
+
+            cursor.execute(sql(SQL_UNIDADES), (complex_id,))
+            cursor.execute(sql(SQL_SALDOS), (report_id, complex_id))
+            cargadas = cursor.rowcount
+            cursor.execute(sql(SQL_TOTAL), (report_id, report_id))
+            cursor.execute('DROP TABLE etl_staging')
+    finally:
+        destino.liberar(conexion)
+    return {'report_id': report_id, 'units': copiadas, 'balances': cargadas}
+
+def cargar_reporte(file_path, report_id, url=None, perfil=PERFIL_DEFAULT):
+    """Analiza un reporte y carga sus saldos en el MonthlyReport `report_id`"""
+    url = url or os.environ.get('DATABASE_URL')
+    if not url:
+        raise ValueError("No database URL (set DATABASE_URL or pass --database-url)")
+    return cargar_unidades(destino_desde_url(url), report_id, unidades_reporte(file_path, perfil=perfil))
+
+def crear_esquema_sqlite(ruta):
+    """Crea en SQLite las tablas que usa el cargador, con las mismas restricciones únicas que Prisma"""
+    with sqlite3.connect(ruta) as conexion:
+        conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS "MonthlyReport" (
+                id TEXT PRIMARY KEY, "complexId" TEXT NOT NULL, period TEXT NOT NULL,
+                "totalAmount" REAL NOT NULL DEFAULT 0, "updatedAt" TEXT
+            );
+            CREATE TABLE IF NOT EXISTS "Unit" (
+                id TEXT PRIMARY KEY, "complexId" TEXT NOT NULL, identifier TEXT NOT NULL,
+                "ownerName" TEXT NOT NULL, "isActive" BOOLEAN NOT NULL DEFAULT TRUE,
+                UNIQUE ("complexId", identifier)
+            );
+            CREATE TABLE IF NOT EXISTS "UnitBalance" (
+                id TEXT PRIMARY KEY, "reportId" TEXT NOT NULL, "unitId" TEXT NOT NULL,
+                "prevBalance" REAL NOT NULL, "currentFee" REAL NOT NULL, payments REAL NOT NULL,
+                interest REAL NOT NULL, "otherCharges" REAL NOT NULL, "totalDebt" REAL NOT NULL,
+                "daysOverdue" INTEGER NOT NULL DEFAULT 0, "monthsOverdue" REAL NOT NULL DEFAULT 0,
+                "riskStatus" TEXT NOT NULL, "actionType" TEXT NOT NULL,
+                "createdAt" TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, "updatedAt" TEXT NOT NULL,
+                UNIQUE ("reportId", "unitId")
+            );
+        """)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga los saldos de un reporte en la base de datos (COPY + upsert)")
+    parser.add_argument('file', help="Reporte .xls/.xlsx a analizar")
+    parser.add_argument('--report-id', required=True, help="Id del MonthlyReport destino")
+    parser.add_argument('--database-url', help="postgresql://... o sqlite:///ruta.db (por defecto DATABASE_URL)")
+    parser.add_argument('--layout', default=PERFIL_DEFAULT, help="Perfil de formato (nombre en perfiles/ o ruta a un JSON)")
+    args = parser.parse_args()
+
+    try:
+        resultado = cargar_reporte(args.file, args.report_id, args.database_url, args.layout)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+    print(json.dumps(resultado, indent=2))
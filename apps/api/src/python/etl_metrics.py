@@ -0,0 +1,72 @@
+import contextlib
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+class MetricasEtl:
+    """Tiempos (wall y CPU) por etapa del ETL, contadores y memoria pico de una ejecución"""
+
+    def __init__(self):
+        self.etapas = {}
+        self.contadores = {}
+        self.inicio = time.perf_counter()
+        self.inicio_cpu = time.process_time()
+
+    def sumar(self, etapa, wall, cpu):
+        acumulado = self.etapas.setdefault(etapa, {'wall_s': 0.0, 'cpu_s': 0.0})
+        acumulado['wall_s'] += wall
+        acumulado['cpu_s'] += cpu
+
+    def contar(self, nombre, cantidad=1):
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    @contextlib.contextmanager
+    def etapa(self, nombre):
+        """Mide el bloque `with` y lo suma a la etapa"""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.sumar(nombre, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def medir_iterable(self, nombre, iterable):
+        """Suma a la etapa solo el tiempo que toma producir cada elemento (no el de consumirlo)"""
+        iterador = iter(iterable)
+        while True:
+            wall = time.perf_counter()
+            cpu = time.process_time()
+            try:
+                elemento = next(iterador)
+            except StopIteration:
+                self.sumar(nombre, time.perf_counter() - wall, time.process_time() - cpu)
+                return
+            self.sumar(nombre, time.perf_counter() - wall, time.process_time() - cpu)
+            yield elemento
+
+    def contar_iterable(self, nombre, iterable):
+        """Cuenta en `nombre` los elementos que pasan por el iterable"""
+        for elemento in iterable:
+            self.contar(nombre)
+            yield elemento
+
+    def como_dict(self):
+        return {
+            'wall_s': time.perf_counter() - self.inicio,
+            'cpu_s': time.process_time() - self.inicio_cpu,
+            'stages': self.etapas,
+            **self.contadores,
+            'peak_rss_mb': memoria_pico_mb()
+        }
+
+def memoria_pico_mb():
+    """Memoria residente pico del proceso en MB (None si el sistema no la expone)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss viene en KB en Linux y en bytes en macOS
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
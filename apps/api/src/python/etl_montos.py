@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+# Monto escrito como texto: signo o paréntesis, símbolo de moneda (el paréntesis
+# puede ir antes o después: "($1.000)", "$ (1.000)"), cifra con separadores y un
+# signo al final opcional (exportes contables: "1.234.567-")
+PATRON_MONTO = (
+    r'^\s*(?P<abre>\()?\s*(?P<signo>[-+])?\s*(?P<moneda>\$|COP)?\s*(?P<abre_moneda>\()?\s*(?P<signo_moneda>-)?\s*'
+    r'(?P<cifra>\d+(?:[.,]\d+)*)\s*(?:COP)?\s*(?P<signo_final>-)?\s*(?P<cierra>\))?\s*$'
+)
+# Celdas que parecen un monto (solo dígitos, separadores, signos y moneda);
+# una clase de caracteres es bastante más rápida que alternar con 'COP'
+PATRON_CANDIDATO = r'[\s$()+\-.,COP]*\d[\s$()+\-.,\dCOP]*'
+PATRON_SOLO_DIGITOS = r'\s*\d+\s*'
+
+# Agrupación de miles: colombiana (1.234.567,89), anglosajona (1,234,567.89) o sin miles (1234,5)
+MILES_PUNTO = r'\d{1,3}(?:\.\d{3})+(?:,\d+)?'
+MILES_COMA = r'\d{1,3}(?:,\d{3})+(?:\.\d+)?'
+SIN_MILES = r'\d+(?:[.,]\d+)?'
+
+def normalizar_montos(valores, exigir_marca=False):
+    """Convierte una columna (o un bloque aplanado) de montos en texto a float64.
+
+    Devuelve (montos, no_reconocidas): NaN donde la celda no es un monto y una
+    máscara de las celdas que parecen un monto pero no se pudieron interpretar
+    (p. ej. "$12.34.5"). Con un solo separador seguido de tres dígitos se
+    asume separador de miles ("1.234" -> 1234); con otra cantidad, decimal
+    ("1234,5" -> 1234.5). Los paréntesis indican un monto negativo.
+
+    Con `exigir_marca` los textos de solo dígitos ("01560") se dejan como
+    texto: en los reportes son números de documento, no montos.
+    """
+    textos = pd.Series(np.asarray(valores, dtype=object).ravel(), dtype=object)
+    montos = np.full(len(textos), np.nan)
+    no_reconocidas = np.zeros(len(textos), dtype=bool)
+
+    posiciones = np.flatnonzero(textos.str.fullmatch(PATRON_CANDIDATO).fillna(False).to_numpy(dtype=bool))
+    if exigir_marca and len(posiciones):
+        solo_digitos = textos.iloc[posiciones].str.fullmatch(PATRON_SOLO_DIGITOS).to_numpy(dtype=bool)
+        posiciones = posiciones[~solo_digitos]
+    if not len(posiciones):
+        return montos, no_reconocidas
+
+    partes = textos.iloc[posiciones].str.extract(PATRON_MONTO)
+    cifra = partes['cifra']
+    miles_punto = cifra.str.fullmatch(MILES_PUNTO).fillna(False)
+    miles_coma = cifra.str.fullmatch(MILES_COMA).fillna(False)
+    sin_miles = cifra.str.fullmatch(SIN_MILES).fillna(False)
+    normalizada = np.where(
+        miles_punto, cifra.str.replace('.', '', regex=False).str.replace(',', '.', regex=False),
+        np.where(miles_coma, cifra.str.replace(',', '', regex=False), cifra.str.replace(',', '.', regex=False))
+    )
+
+    parentesis = [partes[grupo].notna() for grupo in ('abre', 'abre_moneda')]
+    con_parentesis = parentesis[0] | parentesis[1]
+    signos = [partes[grupo].notna() for grupo in ('signo_moneda', 'signo_final')] + [partes['signo'] == '-']
+    negativo = con_parentesis | np.logical_or.reduce(signos)
+    validas = (
+        cifra.notna()
+        & (miles_punto | miles_coma | sin_miles)
+        & (con_parentesis == partes['cierra'].notna())
+        & ~(parentesis[0] & parentesis[1])
+        # A lo sumo un signo menos (o los paréntesis)
+        & (np.add.reduce([s.astype(int) for s in signos]) + con_parentesis.astype(int) <= 1)
+    ).to_numpy(dtype=bool)
+
+    valores_validos = pd.to_numeric(pd.Series(normalizada[validas]), errors='coerce').to_numpy(dtype=float)
+    montos[posiciones[validas]] = np.where(negativo.to_numpy(dtype=bool)[validas], -valores_validos, valores_validos)
+    no_reconocidas[posiciones[~validas]] = True
+    return montos, no_reconocidas
@@ -0,0 +1,190 @@
+"""Sondeo rápido de un reporte antes del análisis completo.
+
+Lee solo las primeras filas (en .xls, también unas ventanas repartidas por la
+hoja) para detectar el perfil de formato, el periodo, el NIT del conjunto y
+estimar cuántas unidades trae; si la hoja es corta la lee completa y las
+cuenta. No importa pandas; el .xlsx se lee con openpyxl en modo read_only:
+
+    python etl_probe.py "FACT ENE-26.xls"
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from etl_profiles import FILA_CABECERA, FILA_CUOTA, FILA_SALDO, FILA_TOTAL, cargar_perfil, perfiles_disponibles
+from etl_reader import TEXTOS_NA
+
+FILAS_CABEZA = 300
+VENTANAS = 8
+FILAS_VENTANA = 60
+
+# Meses como aparecen en los reportes ('Fecha: 01/Ene/2026') y en sus nombres (FACT ENE-26.xls)
+MESES = {'ENE': 1, 'FEB': 2, 'MAR': 3, 'ABR': 4, 'MAY': 5, 'JUN': 6,
+         'JUL': 7, 'AGO': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DIC': 12}
+
+PATRON_FECHA = re.compile(r'Fecha:\s*\d{1,2}[/-](' + '|'.join(MESES) + r')[/-](\d{2}|\d{4})\b', re.IGNORECASE)
+PATRON_NIT = re.compile(r'(.*?)[\s-]*\bNIT\.?:?\s*(\d[\d.]*(?:-\d)?)')
+
+def _anio(texto):
+    anio = int(texto)
+    return anio + 2000 if anio < 100 else anio
+
+def periodo_desde_nombre(file_path):
+    """Periodo YYYY-MM a partir del nombre del reporte ('FACT ENE-26.xls' -> '2026-01'), o None"""
+    nombre = os.path.basename(file_path).upper()
+    encontrado = re.search(r'\b(' + '|'.join(MESES) + r')[-_ ]?(\d{2}|\d{4})\b', nombre)
+    if not encontrado:
+        return None
+    return f"{_anio(encontrado.group(2)):04d}-{MESES[encontrado.group(1)]:02d}"
+
+def texto_celdas(valores):
+    """Une las celdas no vacías de una fila (como columna_texto del motor)"""
+    return ' '.join(str(valor) for valor in valores if valor is not None and valor != '' and valor not in TEXTOS_NA)
+
+def muestra_xls(file_path, filas_cabeza, ventanas, filas_ventana):
+    """(filas de la hoja, textos de la cabeza, textos de las ventanas, si se leyó completa) de un .xls"""
+    import xlrd
+
+    book = xlrd.open_workbook(file_path, on_demand=True)
+    try:
+        sheet = book.sheet_by_index(0)
+        total = sheet.nrows
+        cabeza = [texto_celdas(sheet.row_values(i)) for i in range(min(filas_cabeza, total))]
+        muestras = []
+        resto = total - len(cabeza)
+        if resto <= filas_ventana * ventanas:
+            # Hoja corta: leer el resto completo cuesta menos que extrapolar mal
+            muestras.append([texto_celdas(sheet.row_values(i)) for i in range(len(cabeza), total)])
+            return total, cabeza, muestras, True
+        # Ventanas repartidas entre el final de la cabeza y el final de la hoja
+        paso = resto // ventanas
+        for k in range(ventanas):
+            inicio = len(cabeza) + k * paso
+            muestras.append([texto_celdas(sheet.row_values(i)) for i in range(inicio, inicio + filas_ventana)])
+        return total, cabeza, muestras, False
+    finally:
+        book.release_resources()
+
+def muestra_xlsx(file_path, filas_cabeza):
+    """(filas de la hoja, textos de la cabeza, si se leyó completa) de un .xlsx.
+
+    openpyxl en modo read_only recorre el XML de la hoja en streaming y se deja
+    de leer tras `filas_cabeza` filas: no hay ventanas, porque llegar a ellas
+    obliga a recorrer todo lo anterior. El total sale de <dimension>; sin ella
+    solo se conoce si la hoja termina dentro de la cabeza (si no, es None).
+    """
+    from openpyxl import load_workbook
+
+    book = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = book.worksheets[0]
+        total = sheet.max_row
+        # Una fila de más para saber si la hoja sigue después de la cabeza
+        filas = [texto_celdas(fila) for fila in sheet.iter_rows(max_row=filas_cabeza + 1, values_only=True)]
+    finally:
+        book.close()
+    completa = len(filas) <= filas_cabeza
+    if completa and total is None:
+        total = len(filas)
+    elif total is not None and total < len(filas):
+        # <dimension> que no cubre las filas escritas (algunos generadores dejan 'A1')
+        total = None
+    return total, filas[:filas_cabeza], completa
+
+def detectar_perfil(textos, perfiles=None):
+    """Perfil que mejor reconoce las filas de muestra: (nombre, cabeceras por perfil).
+
+    `perfiles` limita la búsqueda (nombres o rutas); por defecto, todos los incluidos.
+    """
+    mejor = None
+    cabeceras = {}
+    for nombre in perfiles or perfiles_disponibles():
+        perfil = cargar_perfil(nombre)
+        etiquetas = perfil.etiquetar(textos)
+        patron = re.compile(perfil.patron_unidad)
+        encontradas = sum(1 for texto, etiqueta in zip(textos, etiquetas) if etiqueta & FILA_CABECERA and patron.search(texto))
+        presentes = 0
+        for bit in (FILA_SALDO, FILA_CUOTA, FILA_TOTAL):
+            presentes += bool((etiquetas & bit).any())
+        cabeceras[nombre] = encontradas
+        # Reconocido: hay cabeceras de unidad y al menos una fila de total
+        if encontradas and (etiquetas & FILA_TOTAL).any():
+            puntaje = (presentes, encontradas)
+            if mejor is None or puntaje > mejor[0]:
+                mejor = (puntaje, nombre)
+    return (mejor[1] if mejor else None), cabeceras
+
+def metadatos_cabeza(cabeza, file_path):
+    """Periodo ('Fecha:' del contenido o el nombre del archivo), NIT y nombre del conjunto"""
+    periodo = None
+    origen_periodo = None
+    nit = None
+    conjunto = None
+    for texto in cabeza:
+        if periodo is None:
+            fecha = PATRON_FECHA.search(texto)
+            if fecha:
+                periodo = f"{_anio(fecha.group(2)):04d}-{MESES[fecha.group(1).upper()]:02d}"
+                origen_periodo = 'content'
+        if nit is None:
+            encontrado = PATRON_NIT.search(texto)
+            if encontrado:
+                nit = encontrado.group(2).replace('.', '')
+                conjunto = re.sub(r'\s+', ' ', encontrado.group(1)).strip(' *-') or None
+    if periodo is None:
+        periodo = periodo_desde_nombre(file_path)
+        origen_periodo = 'filename' if periodo else None
+    return {'period': periodo, 'period_source': origen_periodo, 'nit': nit, 'complex_name': conjunto}
+
+def sondear_reporte(file_path, filas_cabeza=FILAS_CABEZA, ventanas=VENTANAS, filas_ventana=FILAS_VENTANA):
+    """Perfil, periodo, NIT y unidades estimadas a partir de una muestra del reporte"""
+    inicio = time.perf_counter()
+    if file_path.endswith('.xls'):
+        total, cabeza, muestras, completa = muestra_xls(file_path, filas_cabeza, ventanas, filas_ventana)
+    else:
+        total, cabeza, completa = muestra_xlsx(file_path, filas_cabeza)
+        muestras = []
+
+    perfil, cabeceras = detectar_perfil(cabeza)
+    unidades_estimadas = None
+    if perfil is not None:
+        encontradas = cabeceras[perfil]
+        filas_muestra = len(cabeza)
+        for ventana in muestras:
+            encontradas += detectar_perfil(ventana, [perfil])[1][perfil]
+            filas_muestra += len(ventana)
+        if completa:
+            # Se leyó la hoja entera: las cabeceras están contadas, no estimadas
+            unidades_estimadas = encontradas
+        elif total is not None:
+            # Densidad de cabeceras en la muestra extrapolada al resto de la hoja
+            unidades_estimadas = round(encontradas / filas_muestra * total)
+
+    return {
+        'layout': perfil,
+        'recognized': perfil is not None,
+        **metadatos_cabeza(cabeza, file_path),
+        'rows': total,
+        'estimated_units': unidades_estimadas,
+        'sampled_rows': len(cabeza) + sum(len(ventana) for ventana in muestras),
+        'elapsed_ms': round((time.perf_counter() - inicio) * 1000, 1)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sondeo rápido de un reporte: perfil, periodo, NIT y unidades estimadas")
+    parser.add_argument('file', help="Reporte .xls/.xlsx")
+    parser.add_argument('--rows', type=int, default=FILAS_CABEZA, help="Filas iniciales a leer")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(json.dumps({"error": f"File not found: {args.file}"}))
+        sys.exit(1)
+    try:
+        resultado = sondear_reporte(args.file, args.rows)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
@@ -0,0 +1,85 @@
+import functools
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+from etl_riesgo import ReglasMora
+
+# Etiquetas de fila (bits: una fila puede tener varias)
+FILA_CABECERA = 1
+FILA_SALDO = 2
+FILA_RECIBO = 4
+FILA_INTERES = 8
+FILA_CUOTA = 16
+FILA_TOTAL = 32
+
+# Nombre de cada etiqueta en la sección "labels" del perfil
+ETIQUETAS = {
+    'header': FILA_CABECERA,
+    'prev_balance': FILA_SALDO,
+    'payments': FILA_RECIBO,
+    'interest': FILA_INTERES,
+    'fee': FILA_CUOTA,
+    'total': FILA_TOTAL,
+}
+
+DIRECTORIO_PERFILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perfiles')
+PERFIL_DEFAULT = 'diprosoft'
+
+class PerfilCompilado:
+    """Perfil de formato de un software contable, compilado para etiquetar filas por lotes"""
+
+    def __init__(self, config):
+        self.nombre = config['name']
+        self.patron_unidad = config['unit_pattern']
+        self.grupo_unidad = config.get('unit_group', 1)
+        self.patron_propietario = config['owner_pattern']
+        self.max_filas_bloque = config['max_block_rows']
+        self.filas_cabecera = config['header_rows']
+        self.interes_max = config['thresholds']['interest_max']
+        self.cuota_min = config['thresholds']['fee_min']
+        # Cortes de edad de la deuda (por conjunto: se pueden cambiar en una copia del perfil)
+        self.reglas = ReglasMora(config.get('aging'))
+        # Identifica el contenido del perfil (para el cache de resultados)
+        self.huella = hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+        # Una expresión por etiqueta: una misma fila puede tener palabras de varias
+        # etiquetas aunque se solapen (p. ej. "Saldo" y "Saldo anterior")
+        self.patrones = []
+        for nombre, palabras in config['labels'].items():
+            if nombre not in ETIQUETAS:
+                raise ValueError(f"Unknown label '{nombre}' in profile '{self.nombre}'")
+            if palabras:
+                patron = re.compile('|'.join(re.escape(palabra) for palabra in sorted(palabras, key=len, reverse=True)))
+                self.patrones.append((patron, ETIQUETAS[nombre]))
+
+    def etiquetar(self, texto):
+        """Calcula la etiqueta (bits FILA_*) de cada fila: una pasada por etiqueta"""
+        texto = list(texto)
+        etiquetas = np.zeros(len(texto), dtype=np.uint8)
+        for patron, bit in self.patrones:
+            buscar = patron.search
+            encontradas = np.fromiter((isinstance(fila, str) and buscar(fila) is not None for fila in texto), dtype=bool, count=len(texto))
+            etiquetas[encontradas] |= bit
+        return etiquetas
+
+def ruta_perfil(nombre):
+    """Acepta el nombre de un perfil incluido (perfiles/<nombre>.json) o la ruta a un JSON"""
+    if os.path.isfile(nombre):
+        return nombre
+    return os.path.join(DIRECTORIO_PERFILES, f"{nombre}.json")
+
+@functools.lru_cache(maxsize=None)
+def cargar_perfil(nombre=PERFIL_DEFAULT):
+    """Carga y compila un perfil una sola vez por proceso"""
+    ruta = ruta_perfil(nombre)
+    if not os.path.isfile(ruta):
+        raise ValueError(f"Layout profile not found: {nombre}")
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return PerfilCompilado(json.load(f))
+
+def perfiles_disponibles():
+    return sorted(os.path.splitext(nombre)[0] for nombre in os.listdir(DIRECTORIO_PERFILES) if nombre.endswith('.json'))
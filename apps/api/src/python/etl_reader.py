@@ -0,0 +1,98 @@
+import datetime
+
+# Textos que pandas interpreta como celda vacía al leer Excel
+TEXTOS_NA = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+}
+
+def _convertir_texto(valor):
+    return None if valor in TEXTOS_NA else valor
+
+def filas_hoja_xls(book, indice=0):
+    """Genera las filas de una hoja de un libro .xls ya abierto con el API de hojas de xlrd"""
+    import xlrd
+
+    sheet = book.sheet_by_index(indice)
+    datemode = book.datemode
+
+    def convertir(valor, tipo):
+        if tipo == xlrd.XL_CELL_TEXT:
+            return _convertir_texto(valor)
+        if tipo == xlrd.XL_CELL_NUMBER:
+            return float(valor)
+        if tipo == xlrd.XL_CELL_DATE:
+            try:
+                fecha = xlrd.xldate.xldate_as_datetime(valor, datemode)
+            except OverflowError:
+                return float(valor)
+            # Igual que pandas: las fechas en la época son solo horas
+            epoca = (1904, 1, 1) if datemode else (1899, 12, 31)
+            if fecha.timetuple()[0:3] == epoca:
+                return datetime.time(fecha.hour, fecha.minute, fecha.second, fecha.microsecond)
+            return fecha
+        if tipo == xlrd.XL_CELL_BOOLEAN:
+            return bool(valor)
+        # Vacías, en blanco y errores
+        return None
+
+    for i in range(sheet.nrows):
+        yield [convertir(valor, tipo) for valor, tipo in zip(sheet.row_values(i), sheet.row_types(i))]
+
+def filas_hoja_xlsx(book, indice=0):
+    """Genera las filas de una hoja de un libro .xlsx ya abierto con openpyxl en modo read_only"""
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    sheet = book.worksheets[indice]
+    sheet.reset_dimensions()
+
+    def convertir(celda):
+        valor = celda.value
+        if valor is None or celda.data_type == TYPE_ERROR:
+            return None
+        if celda.data_type == TYPE_NUMERIC:
+            return float(valor)
+        if isinstance(valor, str):
+            return _convertir_texto(valor)
+        return valor
+
+    for fila in sheet.iter_rows():
+        yield [convertir(celda) for celda in fila]
+
+def abrir_libro(file_path):
+    """Abre el libro una vez para leer varias de sus hojas (cerrar con cerrar_libro)"""
+    if file_path.endswith('.xls'):
+        import xlrd
+        return xlrd.open_workbook(file_path, on_demand=True)
+    from openpyxl import load_workbook
+    return load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+
+def cerrar_libro(book):
+    if hasattr(book, 'release_resources'):
+        book.release_resources()
+    else:
+        book.close()
+
+def nombres_hojas(book):
+    return book.sheet_names() if hasattr(book, 'sheet_names') else book.sheetnames
+
+def filas_hoja(book, indice=0, encabezado=False):
+    """Filas de datos de una hoja del libro abierto, sin la fila de encabezado (como pd.read_excel) salvo con `encabezado`"""
+    filas = filas_hoja_xls(book, indice) if hasattr(book, 'sheet_by_index') else filas_hoja_xlsx(book, indice)
+    try:
+        if not encabezado:
+            next(filas, None)
+        yield from filas
+    finally:
+        filas.close()
+
+def leer_filas(file_path):
+    """Filas de datos de la primera hoja, sin la fila de encabezado (como pd.read_excel).
+
+    Los números se entregan siempre como float, que es como Excel los guarda.
+    """
+    book = abrir_libro(file_path)
+    try:
+        yield from filas_hoja(book, 0)
+    finally:
+        cerrar_libro(book)
@@ -0,0 +1,116 @@
+import numpy as np
+
+# Cortes por defecto sobre la edad de la deuda (meses vencidos = deuda vencida / cuota).
+# Cada regla aplica si la edad es <= "max" (o < "below"); la primera que cumple gana
+# y la última, sin límite, recoge el resto.
+REGLAS_DEFAULT = {
+    'action_class': [
+        {'label': 'AD', 'max': 0},
+        {'label': 'CS', 'max': 1},
+        {'label': 'CP', 'max': 2},
+        {'label': 'AB'}
+    ],
+    'risk_status': [
+        {'label': 'AL_DIA', 'max': 0},
+        {'label': 'MORA_BAJA', 'max': 1},
+        {'label': 'MORA_MODERADA', 'max': 2},
+        {'label': 'RIESGO_ALTO', 'below': 6},
+        {'label': 'CRITICO'}
+    ],
+    # Límites (meses) del histograma de edades: [0], (0, 1], (1, 2], ... y el resto
+    'histogram_edges': [0, 1, 2, 3, 6, 12]
+}
+
+class EscalaMora:
+    """Una lista de reglas de corte compilada para np.select"""
+
+    def __init__(self, reglas):
+        if not reglas or 'max' in reglas[-1] or 'below' in reglas[-1]:
+            raise ValueError("The last aging rule must have no limit")
+        self.etiquetas = [regla['label'] for regla in reglas]
+        self.cortes = [(regla['max'], True) if 'max' in regla else (regla['below'], False) for regla in reglas[:-1]]
+
+    def aplicar(self, edades):
+        """Etiqueta de cada edad (array object)"""
+        condiciones = [edades <= limite if incluido else edades < limite for limite, incluido in self.cortes]
+        return np.select(condiciones, self.etiquetas[:-1], default=self.etiquetas[-1]).astype(object)
+
+class ReglasMora:
+    """Reglas de clasificación por edad de la deuda (sección "aging" del perfil)"""
+
+    def __init__(self, config=None):
+        config = config or REGLAS_DEFAULT
+        self.cartas = EscalaMora(config.get('action_class', REGLAS_DEFAULT['action_class']))
+        self.estados = EscalaMora(config.get('risk_status', REGLAS_DEFAULT['risk_status']))
+        self.limites_histograma = np.asarray(config.get('histogram_edges', REGLAS_DEFAULT['histogram_edges']), dtype=float)
+
+    def clasificar(self, total_a_pagar, cuota_actual):
+        """Deuda vencida, edad en meses, estado y tipo de carta para arrays de unidades.
+
+        Devuelve listas de Python (floats y str) listas para la salida JSON.
+        """
+        total_a_pagar = np.asarray(total_a_pagar, dtype=float)
+        cuota_actual = np.asarray(cuota_actual, dtype=float)
+        deuda_vencida = total_a_pagar - cuota_actual
+        deuda_vencida = np.where(deuda_vencida <= 0, 0.0, deuda_vencida)
+
+        con_cuota = cuota_actual > 0
+        cocientes = np.divide(deuda_vencida, cuota_actual, out=np.zeros_like(deuda_vencida), where=con_cuota)
+        # round() de Python: np.round difiere en algunos casos límite de medio centésimo
+        edades = np.array([round(x, 2) if c else 0.0 for x, c in zip(cocientes.tolist(), con_cuota.tolist())], dtype=float)
+
+        return (
+            deuda_vencida.tolist(),
+            edades.tolist(),
+            self.estados.aplicar(edades).tolist(),
+            self.cartas.aplicar(edades).tolist()
+        )
+
+    def histograma(self, edades):
+        """Unidades por tramo de edad: '0', '0-1', '1-2', ..., '12+'"""
+        limites = self.limites_histograma
+        tramos = np.digitize(edades, limites, right=True)
+        conteos = np.bincount(tramos, minlength=len(limites) + 1)
+        nombres = [f"{limites[0]:g}"]
+        nombres += [f"{a:g}-{b:g}" for a, b in zip(limites[:-1], limites[1:])]
+        nombres.append(f"{limites[-1]:g}+")
+        return dict(zip(nombres, conteos.tolist()))
+
+def contar(valores, etiquetas):
+    """Conteo por etiqueta en el orden de las reglas (incluye las que no aparecen)"""
+    valores = np.asarray(valores, dtype=object)
+    conteos = {etiqueta: int(np.count_nonzero(valores == etiqueta)) for etiqueta in etiquetas}
+    # Etiquetas que no están en las reglas (p. ej. unidades leídas de un cache anterior)
+    for etiqueta in dict.fromkeys(valores.tolist()):
+        if etiqueta not in conteos:
+            conteos[etiqueta] = int(np.count_nonzero(valores == etiqueta))
+    return conteos
+
+def kpis_cartera(unidades, reglas=None):
+    """Indicadores de la cartera en una sola pasada sobre las unidades (que pueden venir de un generador)"""
+    reglas = reglas or ReglasMora()
+    total = []
+    vencido = []
+    edades = []
+    cartas = []
+    estados = []
+    for unidad in unidades:
+        total.append(unidad.total_debt)
+        vencido.append(unidad.overdue_amount)
+        edades.append(unidad.months_overdue)
+        cartas.append(unidad.action_class)
+        estados.append(unidad.risk_status)
+
+    return kpis_columnas(total, vencido, edades, cartas, estados, reglas)
+
+def kpis_columnas(total, vencido, edades, cartas, estados, reglas):
+    """Indicadores de la cartera a partir de sus columnas (listas o arrays)"""
+    edades = np.asarray(edades, dtype=float)
+    return {
+        'units': len(total),
+        'action_classes': contar(cartas, reglas.cartas.etiquetas),
+        'risk_status': contar(estados, reglas.estados.etiquetas),
+        'total_debt': float(np.sum(total)),
+        'overdue_amount': float(np.sum(vencido)),
+        'aging_histogram': reglas.histograma(edades)
+    }
@@ -0,0 +1,191 @@
+"""Salidas de un análisis: JSON, tabla maestra en Markdown y estructura del reporte.
+
+El reporte se lee una sola vez (`leer_analisis`): mientras el motor extrae las
+unidades se guardan la cabeza de la hoja (periodo, NIT, conjunto) y las filas
+de la primera unidad. Cada escritor recibe ese mismo resultado en memoria:
+
+    python etl_salidas.py "FACT ENE-26.xls" --json analisis.json --markdown ANALISIS.md --structure -
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from etl_engine import iterar_unidades
+from etl_formato import formato_pesos, nombre_periodo
+from etl_probe import FILAS_CABEZA, metadatos_cabeza, texto_celdas
+from etl_profiles import PERFIL_DEFAULT, cargar_perfil
+from etl_reader import leer_filas
+from etl_riesgo import kpis_cartera
+from etl_unidades import a_json
+
+# Filas de la estructura: posiciones de las primeras unidades y filas de la unidad de ejemplo
+UNIDADES_MUESTRA = 10
+FILAS_EJEMPLO = 30
+
+# Nombre de cada estado en la tabla maestra (los de reglas propias se muestran tal cual)
+NOMBRES_ESTADO = {
+    'AL_DIA': '🟢 Al Día',
+    'MORA_BAJA': '🟡 Mora Baja/Técnica',
+    'MORA_MODERADA': '🟡 Mora Moderada',
+    'RIESGO_ALTO': '🟠 Riesgo Alto',
+    'CRITICO': '🔴 Crítico',
+}
+
+def leer_analisis(file_path, perfil=PERFIL_DEFAULT):
+    """Unidades, indicadores, metadatos y estructura del reporte en una sola lectura.
+
+    Las unidades son las mismas de etl_engine.analizar_reporte (sin pasar por el cache,
+    porque la estructura sale de las filas leídas).
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    inicio = time.perf_counter()
+    compilado = cargar_perfil(perfil)
+    patron = re.compile(compilado.patron_unidad)
+    cabeza = []
+    posiciones = []
+    ejemplo = []
+    dimensiones = {'rows': 0, 'columns': 0}
+
+    def observar(filas):
+        # Solo se arma el texto de las filas mientras falte algo de la estructura
+        for indice, fila in enumerate(filas):
+            dimensiones['rows'] = indice + 1
+            dimensiones['columns'] = max(dimensiones['columns'], len(fila))
+            if indice < FILAS_CABEZA or len(posiciones) < UNIDADES_MUESTRA:
+                texto = texto_celdas(fila)
+                if indice < FILAS_CABEZA:
+                    cabeza.append(texto)
+                encontrada = patron.search(texto)
+                if encontrada and len(posiciones) < UNIDADES_MUESTRA:
+                    posiciones.append({'row': indice, 'unit': encontrada.group(compilado.grupo_unidad)})
+                # La unidad de ejemplo va desde la primera cabecera hasta la siguiente
+                if len(posiciones) == 1 and len(ejemplo) < FILAS_EJEMPLO and texto:
+                    ejemplo.append({'row': indice, 'cells': [str(valor) for valor in fila if valor is not None and valor != '']})
+            yield fila
+
+    unidades = list(iterar_unidades(observar(leer_filas(file_path)), perfil=compilado))
+    return {
+        'file': os.path.basename(file_path),
+        'layout': compilado.nombre,
+        **metadatos_cabeza(cabeza, file_path),
+        'summary': kpis_cartera(unidades, compilado.reglas),
+        'structure': {**dimensiones, 'unit_rows': posiciones, 'example': ejemplo},
+        'units': unidades,
+        'elapsed_ms': round((time.perf_counter() - inicio) * 1000, 1)
+    }
+
+# Escritores por nombre: cada uno recibe el análisis y un stream de texto
+ESCRITORES = {}
+
+def escritor(nombre):
+    """Registra una función escritor(analisis, salida) bajo `nombre`"""
+    def registrar(funcion):
+        ESCRITORES[nombre] = funcion
+        return funcion
+    return registrar
+
+@escritor('json')
+def escribir_json(analisis, salida):
+    """Metadatos, indicadores y unidades en la forma JSON del motor"""
+    json.dump({clave: valor for clave, valor in analisis.items() if clave != 'structure'},
+              salida, indent=2, ensure_ascii=False, default=a_json)
+    salida.write('\n')
+
+def tabla_markdown(encabezados, filas, derecha=()):
+    """Tabla Markdown con columnas alineadas; las columnas en `derecha` van alineadas a la derecha"""
+    filas = [[str(celda).replace('|', '\\|') for celda in fila] for fila in filas]
+    anchos = [max([len(encabezado)] + [len(fila[i]) for fila in filas]) for i, encabezado in enumerate(encabezados)]
+
+    def renglon(celdas):
+        return '| ' + ' | '.join(
+            celda.rjust(ancho) if i in derecha else celda.ljust(ancho)
+            for i, (celda, ancho) in enumerate(zip(celdas, anchos))
+        ) + ' |'
+
+    separador = '|' + '|'.join(('-' * (ancho + 1) + ':') if i in derecha else (':' + '-' * (ancho + 1)) for i, ancho in enumerate(anchos)) + '|'
+    return '\n'.join([renglon(encabezados), separador] + [renglon(fila) for fila in filas])
+
+@escritor('markdown')
+def escribir_markdown(analisis, salida):
+    """Tabla maestra de análisis de riesgo con el resumen de la cartera"""
+    resumen = analisis['summary']
+    salida.write("# TABLA MAESTRA DE ANÁLISIS DE RIESGO\n\n")
+    if analisis.get('complex_name'):
+        salida.write(f"**{analisis['complex_name']}**  \n")
+    if analisis.get('nit'):
+        salida.write(f"**NIT:** {analisis['nit']}  \n")
+    salida.write(f"**Periodo:** {nombre_periodo(analisis.get('period'))}  \n\n")
+    salida.write("---\n\n")
+
+    encabezados = ['LOCAL/OFI', 'PROPIETARIO', 'SALDO ANTERIOR', 'CUOTA ACTUAL', 'INTERESES DE MORA',
+                   'OTROS', 'TOTAL A PAGAR', 'EDAD VENCIDA', 'ESTADO REAL', 'TIPO DE CARTA']
+    filas = [
+        [u.unit_number, u.owner_name, formato_pesos(u.prev_balance), formato_pesos(u.current_fee),
+         formato_pesos(u.interest), formato_pesos(u.adjustments), formato_pesos(u.total_debt),
+         f"{u.months_overdue:.2f}", NOMBRES_ESTADO.get(u.risk_status, u.risk_status), u.action_class]
+        for u in analisis['units']
+    ]
+    salida.write(tabla_markdown(encabezados, filas, derecha={2, 3, 4, 5, 6, 7}))
+
+    salida.write("\n\n---\n\n")
+    salida.write("## RESUMEN DE CARTERA\n\n")
+    salida.write(f"**Total Unidades:** {resumen['units']}\n\n")
+    salida.write("### Distribución por Tipo de Carta\n\n")
+    for carta, cantidad in resumen['action_classes'].items():
+        salida.write(f"- **{carta}:** {cantidad} unidades\n")
+    salida.write("\n### Distribución por Estado Real\n\n")
+    for estado, cantidad in resumen['risk_status'].items():
+        salida.write(f"- {NOMBRES_ESTADO.get(estado, estado)}: {cantidad} unidades\n")
+    salida.write("\n### Edad de la Deuda (meses)\n\n")
+    salida.write(tabla_markdown(['MESES', 'UNIDADES'], resumen['aging_histogram'].items(), derecha={1}))
+    salida.write(f"\n\n**Cartera Total:** {formato_pesos(resumen['total_debt'])}  \n")
+    salida.write(f"**Cartera Vencida:** {formato_pesos(resumen['overdue_amount'])}\n")
+
+@escritor('structure')
+def escribir_estructura(analisis, salida):
+    """Dimensiones de la hoja, filas donde empiezan las unidades y las filas de la primera"""
+    estructura = analisis['structure']
+    linea = '=' * 80
+    salida.write(f"{linea}\nANÁLISIS DEL ARCHIVO: {analisis['file']}\n{linea}\n\n")
+    salida.write(f"Perfil: {analisis['layout']}  Periodo: {analisis.get('period') or '-'}  NIT: {analisis.get('nit') or '-'}\n")
+    salida.write(f"Dimensiones: {estructura['rows']} filas x {estructura['columns']} columnas\n\n")
+
+    total = analisis['summary']['units']
+    salida.write(f"UNIDADES ENCONTRADAS: {total}\n{'-' * 80}\n")
+    for posicion in estructura['unit_rows']:
+        salida.write(f"Fila {posicion['row']}: {posicion['unit']}\n")
+    if total > len(estructura['unit_rows']):
+        salida.write(f"... y {total - len(estructura['unit_rows'])} más\n")
+
+    if estructura['unit_rows']:
+        salida.write(f"\nESTRUCTURA DE EJEMPLO - {estructura['unit_rows'][0]['unit']}:\n{'-' * 80}\n")
+        for fila in estructura['example']:
+            salida.write(f"Fila {fila['row']}: {' | '.join(fila['cells'])}\n")
+
+def escribir_salidas(analisis, destinos):
+    """Escribe el análisis con cada escritor en su destino ({nombre: ruta}; '-' es stdout)"""
+    for nombre, ruta in destinos.items():
+        if ruta == '-':
+            ESCRITORES[nombre](analisis, sys.stdout)
+            continue
+        with open(ruta, 'w', encoding='utf-8') as salida:
+            ESCRITORES[nombre](analisis, salida)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analiza un reporte una vez y escribe sus salidas (JSON, Markdown, estructura)")
+    parser.add_argument('file', help="Reporte .xls/.xlsx")
+    parser.add_argument('--layout', default=PERFIL_DEFAULT, help="Perfil de formato (nombre en perfiles/ o ruta a un JSON)")
+    for nombre in ESCRITORES:
+        parser.add_argument(f"--{nombre}", metavar='PATH', help=f"Escribir la salida {nombre} en PATH ('-' para stdout)")
+    args = parser.parse_args()
+
+    destinos = {nombre: getattr(args, nombre) for nombre in ESCRITORES if getattr(args, nombre)}
+    try:
+        escribir_salidas(leer_analisis(args.file, args.layout), destinos or {'json': '-'})
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
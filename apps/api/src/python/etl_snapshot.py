@@ -0,0 +1,232 @@
+"""Instantánea binaria de las unidades extraídas, para reclasificar sin releer el Excel.
+
+Junto al reporte queda un directorio <archivo>.snap con los campos
+financieros de cada unidad antes de clasificar (financieros.npy, float64 de
+n x 5) y sus identificadores y propietarios (texto UTF-8 con sus posiciones).
+Reclasificar abre la matriz con mmap y solo vuelve a correr las reglas de mora.
+La instantánea guarda el SHA-256 del reporte, la versión del motor y la huella
+del perfil con que se extrajo; si cambió alguno, reclasificar la vuelve a crear:
+
+    python etl_snapshot.py create "FACT ENE-26.xls"
+    python etl_snapshot.py reclassify "FACT ENE-26.xls" --rules reglas.json
+"""
+import argparse
+import collections
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from etl_profiles import PERFIL_DEFAULT, cargar_perfil, ruta_perfil
+from etl_riesgo import REGLAS_DEFAULT, ReglasMora, kpis_columnas
+from etl_unidades import CAMPOS_FINANCIEROS, Unidad, a_json
+
+SUFIJO = '.snap'
+VERSION_SNAPSHOT = 1
+
+def ruta_snapshot(file_path):
+    """Directorio de la instantánea de un reporte (o la ruta dada si ya es una)"""
+    return file_path if file_path.endswith(SUFIJO) else file_path + SUFIJO
+
+def reglas_perfil(perfil=PERFIL_DEFAULT):
+    """Sección "aging" del perfil (la configuración, no compilada)"""
+    with open(ruta_perfil(perfil), 'r', encoding='utf-8') as f:
+        return json.load(f).get('aging') or REGLAS_DEFAULT
+
+def guardar_snapshot(unidades, destino, origen=None):
+    """Escribe la instantánea de las unidades en `destino`.
+
+    `origen` ({"file", "sha256", "engine_version", "layout", "layout_fingerprint", "aging"}) queda en
+    meta.json; "aging" son las reglas con que se clasificó el análisis original.
+    """
+    unidades = list(unidades)
+    financieros = np.array([[getattr(u, campo) for campo in CAMPOS_FINANCIEROS] for u in unidades], dtype=float).reshape(-1, len(CAMPOS_FINANCIEROS))
+    # Identificador y propietario intercalados: [unidad0, propietario0, unidad1, ...]
+    codificados = [texto.encode('utf-8') for u in unidades for texto in (u.unit_number, u.owner_name)]
+    offsets = np.zeros(len(codificados) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in codificados], out=offsets[1:])
+
+    # Se escribe en un directorio temporal y se reemplaza de una vez
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    os.makedirs(temporal, exist_ok=True)
+    np.save(os.path.join(temporal, 'financieros.npy'), financieros)
+    np.save(os.path.join(temporal, 'texto.npy'), np.frombuffer(b''.join(codificados), dtype=np.uint8))
+    np.save(os.path.join(temporal, 'offsets.npy'), offsets)
+    with open(os.path.join(temporal, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': VERSION_SNAPSHOT,
+            'units': len(unidades),
+            'fields': list(CAMPOS_FINANCIEROS),
+            'created_at': time.time(),
+            **(origen or {})
+        }, f, ensure_ascii=False)
+    if os.path.isdir(destino):
+        shutil.rmtree(destino)
+    os.replace(temporal, destino)
+    return destino
+
+def crear_snapshot(file_path, perfil=PERFIL_DEFAULT, unidades=None):
+    """Instantánea del reporte junto al archivo; `unidades` evita volver a analizarlo"""
+    from etl_cache import hash_archivo
+    from etl_engine import VERSION_MOTOR, unidades_reporte
+
+    if unidades is None:
+        unidades = unidades_reporte(file_path, perfil=perfil)
+    origen = {
+        'file': os.path.basename(file_path),
+        'sha256': hash_archivo(file_path),
+        'engine_version': VERSION_MOTOR,
+        'layout': perfil,
+        'layout_fingerprint': cargar_perfil(perfil).huella,
+        'aging': reglas_perfil(perfil),
+    }
+    return guardar_snapshot(unidades, ruta_snapshot(file_path), origen)
+
+def leer_meta(ruta):
+    """meta.json de la instantánea, o None si no existe"""
+    meta = os.path.join(ruta_snapshot(ruta), 'meta.json')
+    if not os.path.isfile(meta):
+        return None
+    with open(meta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def motivo_vencida(meta, file_path=None, perfil=None):
+    """Por qué la instantánea ya no corresponde al reporte, al motor o al perfil (None si sigue vigente).
+
+    El perfil es `perfil` o, sin él, el de la instantánea (por si su JSON cambió).
+    Sin `file_path` (o si el reporte ya no está) no se compara el contenido del reporte.
+    """
+    from etl_cache import hash_archivo
+    from etl_engine import VERSION_MOTOR
+
+    if meta.get('version') != VERSION_SNAPSHOT:
+        return f"snapshot format {meta.get('version')} is not {VERSION_SNAPSHOT}"
+    if meta.get('engine_version') != VERSION_MOTOR:
+        return f"built by engine version {meta.get('engine_version')}, current is {VERSION_MOTOR}"
+    # La misma huella que usa el cache en su clave
+    perfil = perfil or meta.get('layout') or PERFIL_DEFAULT
+    huella = cargar_perfil(perfil).huella
+    if meta.get('layout_fingerprint') != huella:
+        return f"built with layout {meta.get('layout')} ({meta.get('layout_fingerprint')}), requested {perfil} ({huella})"
+    if file_path and os.path.isfile(file_path) and meta.get('sha256') != hash_archivo(file_path):
+        return "the report changed since the snapshot was created"
+    return None
+
+def snapshot_vigente(file_path, perfil=None):
+    """Ruta de una instantánea al día del reporte: la crea si falta y la rehace si está vencida.
+
+    Sin `perfil` se rehace con el perfil de la instantánea anterior.
+    """
+    meta = leer_meta(file_path)
+    if meta is not None and motivo_vencida(meta, file_path, perfil) is None:
+        return ruta_snapshot(file_path)
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    return crear_snapshot(file_path, perfil or (meta or {}).get('layout') or PERFIL_DEFAULT)
+
+class Snapshot:
+    """Instantánea abierta: la matriz financiera queda en mmap y el texto se decodifica solo si se pide"""
+
+    def __init__(self, ruta, perfil=None, validar=True):
+        self.ruta = ruta_snapshot(ruta)
+        self.meta = leer_meta(self.ruta)
+        if self.meta is None:
+            raise FileNotFoundError(f"Snapshot not found: {self.ruta}")
+        if validar:
+            # El reporte queda junto a su instantánea, con el mismo nombre sin el sufijo
+            motivo = motivo_vencida(self.meta, self.ruta[:-len(SUFIJO)], perfil)
+            if motivo:
+                raise ValueError(f"Stale snapshot {self.ruta}: {motivo}; create it again")
+        self.financieros = np.load(os.path.join(self.ruta, 'financieros.npy'), mmap_mode='r')
+
+    def columna(self, campo):
+        """Vista (sin copia) de una columna financiera"""
+        return self.financieros[:, CAMPOS_FINANCIEROS.index(campo)]
+
+    def textos(self):
+        """(identificadores, propietarios) de las unidades"""
+        datos = np.load(os.path.join(self.ruta, 'texto.npy'), mmap_mode='r').tobytes()
+        offsets = np.load(os.path.join(self.ruta, 'offsets.npy')).tolist()
+        textos = [datos[a:b].decode('utf-8') for a, b in zip(offsets[:-1], offsets[1:])]
+        return textos[0::2], textos[1::2]
+
+def leer_reglas(ruta):
+    """Reglas de un JSON: un perfil completo (usa su "aging") o solo la sección "aging" """
+    with open(ruta_perfil(ruta), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return config.get('aging', config)
+
+def reclasificar(ruta, reglas=None, con_unidades=False, perfil=None):
+    """Vuelve a clasificar las unidades de la instantánea con otras reglas de mora.
+
+    `ruta` es el reporte (su instantánea se crea o se rehace si hace falta, con
+    `perfil`) o el directorio .snap. `reglas` es una configuración "aging" (dict); las escalas que no trae
+    quedan como en el análisis original. Devuelve los indicadores, cuántas unidades cambian de
+    tipo de carta y de estado respecto del análisis original y, con
+    `con_unidades`, las unidades reclasificadas.
+    """
+    inicio = time.perf_counter()
+    if ruta.endswith(SUFIJO):
+        snapshot = Snapshot(ruta, perfil)
+    else:
+        # snapshot_vigente ya la validó o la acaba de crear: el reporte se lee una sola vez
+        snapshot = Snapshot(snapshot_vigente(ruta, perfil), validar=False)
+    aging = snapshot.meta.get('aging') or REGLAS_DEFAULT
+    original = ReglasMora(aging)
+    nuevas = ReglasMora({**aging, **reglas}) if reglas is not None else original
+    total = snapshot.columna('total_debt')
+    cuota = snapshot.columna('current_fee')
+
+    vencido, edades, estados, cartas = nuevas.clasificar(total, cuota)
+    resultado = {
+        'snapshot': snapshot.ruta,
+        'units': snapshot.meta['units'],
+        'summary': kpis_columnas(total, vencido, edades, cartas, estados, nuevas),
+    }
+    if nuevas is not original:
+        _, _, estados_antes, cartas_antes = original.clasificar(total, cuota)
+        cambios = collections.Counter(f"{antes}->{despues}" for antes, despues in zip(cartas_antes, cartas) if antes != despues)
+        resultado['changed_units'] = sum(cambios.values())
+        resultado['action_class_changes'] = dict(cambios.most_common())
+        resultado['risk_status_changes'] = dict(collections.Counter(
+            f"{antes}->{despues}" for antes, despues in zip(estados_antes, estados) if antes != despues
+        ).most_common())
+    if con_unidades:
+        identificadores, propietarios = snapshot.textos()
+        resultado['result'] = [
+            Unidad(identificador, propietario, *fila, *clasificacion)
+            for identificador, propietario, fila, clasificacion
+            in zip(identificadores, propietarios, snapshot.financieros.tolist(), zip(vencido, edades, estados, cartas))
+        ]
+    resultado['elapsed_ms'] = round((time.perf_counter() - inicio) * 1000, 2)
+    return resultado
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Instantánea de las unidades extraídas y reclasificación sin releer el Excel")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    crear = comandos.add_parser('create', help="Analizar el reporte y guardar la instantánea junto a él")
+    crear.add_argument('file')
+    crear.add_argument('--layout', default=PERFIL_DEFAULT)
+    reclasificacion = comandos.add_parser('reclassify', help="Clasificar de nuevo con otras reglas de mora")
+    reclasificacion.add_argument('file', help="Reporte (usa <archivo>.snap, creándolo si falta o está vencido) o el directorio .snap")
+    reclasificacion.add_argument('--layout', help="Perfil para crear la instantánea (por defecto el de la anterior)")
+    reclasificacion.add_argument('--rules', help="JSON con las reglas ('aging' de un perfil, o un perfil completo o su nombre)")
+    reclasificacion.add_argument('--units', action='store_true', help="Incluir las unidades reclasificadas")
+    args = parser.parse_args()
+
+    try:
+        if args.comando == 'create':
+            if not os.path.exists(args.file):
+                raise FileNotFoundError(f"File not found: {args.file}")
+            inicio = time.perf_counter()
+            ruta = crear_snapshot(args.file, args.layout)
+            resultado = {'snapshot': ruta, 'units': Snapshot(ruta).meta['units'], 'elapsed_ms': round((time.perf_counter() - inicio) * 1000, 1)}
+        else:
+            resultado = reclasificar(args.file, leer_reglas(args.rules) if args.rules else None, args.units, args.layout)
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False, default=a_json))
@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from typing import Optional
+
+# Campos de cada sección de la salida JSON, en su orden
+CAMPOS_FINANCIEROS = ('prev_balance', 'current_fee', 'interest', 'adjustments', 'total_debt')
+CAMPOS_ANALISIS = ('overdue_amount', 'months_overdue', 'risk_status', 'action_class')
+
+@dataclass(slots=True)
+class Unidad:
+    """Unidad analizada en un registro plano; se convierte a la forma JSON del motor solo al escribir la salida"""
+    unit_number: str
+    owner_name: str
+    prev_balance: float
+    current_fee: float
+    interest: float
+    adjustments: float
+    total_debt: float
+    overdue_amount: float
+    months_overdue: float
+    risk_status: str
+    action_class: str
+    fingerprint: Optional[str] = None
+
+    @classmethod
+    def desde_campos(cls, unit_number, owner_name, financials, analysis, fingerprint=None):
+        """Arma la unidad a partir de los dicts "financials" y "analysis" de la salida JSON"""
+        return cls(
+            unit_number, owner_name,
+            *(financials[campo] for campo in CAMPOS_FINANCIEROS),
+            *(analysis[campo] for campo in CAMPOS_ANALISIS),
+            fingerprint
+        )
+
+    @classmethod
+    def desde_dict(cls, unidad):
+        """Unidad a partir de su forma JSON (cache, salidas anteriores)"""
+        return cls.desde_campos(
+            unidad['unit_number'], unidad['owner_name'],
+            unidad['financials'], unidad['analysis'], unidad.get('fingerprint')
+        )
+
+    def como_dict(self, con_huella=False):
+        """Forma JSON del motor; la huella del bloque solo va en el cache y en las salidas de etl_delta"""
+        unidad = {
+            'unit_number': self.unit_number,
+            'owner_name': self.owner_name,
+            'financials': {campo: getattr(self, campo) for campo in CAMPOS_FINANCIEROS},
+            'analysis': {campo: getattr(self, campo) for campo in CAMPOS_ANALISIS}
+        }
+        if con_huella and self.fingerprint is not None:
+            unidad['fingerprint'] = self.fingerprint
+        return unidad
+
+def a_json(objeto):
+    """Para `default` de json.dump/json.dumps: serializa las unidades al llegar a la salida"""
+    if isinstance(objeto, Unidad):
+        return objeto.como_dict()
+    raise TypeError(f"Object of type {type(objeto).__name__} is not JSON serializable")
+
+def a_json_con_huella(objeto):
+    """Como a_json, pero con la huella ('fingerprint') de cada unidad"""
+    if isinstance(objeto, Unidad):
+        return objeto.como_dict(con_huella=True)
+    return a_json(objeto)
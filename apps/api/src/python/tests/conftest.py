@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Los módulos del motor se importan como scripts sueltos (etl_*.py) del directorio padre
+DIRECTORIO_MOTOR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_MOTOR)
+
+# Reporte real de ejemplo del repositorio (13 unidades)
+REPORTE_EJEMPLO = os.path.join(DIRECTORIO_MOTOR, '..', '..', '..', '..', 'sample-data', 'ciudad-jardin', 'reportes-cartera', 'FACT ENE-26.xls')
@@ -0,0 +1,35 @@
+import json
+import os
+import shutil
+
+import etl_engine
+from benchmarks.generar_reporte import generar_reporte
+from conftest import REPORTE_EJEMPLO
+from etl_batch import buscar_reportes, procesar_lote
+from etl_engine import analizar_reporte, resumen_unidades
+from etl_unidades import a_json
+
+
+def test_lote_da_lo_mismo_que_cada_archivo_por_separado(tmp_path, monkeypatch):
+    monkeypatch.setattr(etl_engine, 'cache', None)
+    entrada = tmp_path / 'reportes'
+    entrada.mkdir()
+    shutil.copy(REPORTE_EJEMPLO, entrada / 'FACT ENE-26.xls')
+    generar_reporte(str(entrada / 'FACT FEB-26.xlsx'), 20)
+    (entrada / 'roto.xlsx').write_bytes(b'no es un libro')
+    (entrada / '~$FACT ENE-26.xls').write_bytes(b'')
+
+    archivos = buscar_reportes([str(entrada)])
+    assert [os.path.basename(ruta) for ruta in archivos] == ['FACT ENE-26.xls', 'FACT FEB-26.xlsx', 'roto.xlsx']
+
+    lote = procesar_lote(archivos, str(tmp_path / 'salida'), workers=2)
+    assert (lote['files'], lote['failed']) == (3, 1)
+    unidades = 0
+    for resumen in lote['results'][:2]:
+        por_archivo = analizar_reporte(resumen['file'], usar_cache=False)
+        with open(resumen['output'], encoding='utf-8') as f:
+            assert json.load(f) == json.loads(json.dumps(por_archivo, default=a_json))
+        assert {clave: resumen[clave] for clave in resumen_unidades(por_archivo)} == resumen_unidades(por_archivo)
+        unidades += len(por_archivo)
+    assert lote['units'] == unidades == 33
+    assert 'error' in lote['results'][2]
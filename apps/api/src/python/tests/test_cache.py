@@ -0,0 +1,50 @@
+import os
+
+from etl_cache import CacheResultados
+
+
+def test_entrada_se_lee_despues_de_consumir_el_registro(tmp_path):
+    archivo = tmp_path / 'reporte.xls'
+    archivo.write_bytes(b'contenido')
+    cache = CacheResultados(str(tmp_path / 'cache'), 1024 * 1024, '1')
+    clave = cache.clave(str(archivo))
+
+    assert cache.leer(clave) is None
+    assert list(cache.registrar(clave, iter([{'a': 1}, {'a': 2}]))) == [{'a': 1}, {'a': 2}]
+    assert cache.leer(clave) == [{'a': 1}, {'a': 2}]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_clave_cambia_con_el_contenido_la_version_y_el_perfil(tmp_path):
+    archivo = tmp_path / 'reporte.xls'
+    archivo.write_bytes(b'enero')
+    cache = CacheResultados(str(tmp_path), 1024, '1')
+    clave = cache.clave(str(archivo))
+
+    assert CacheResultados(str(tmp_path), 1024, '2').clave(str(archivo)) != clave
+    assert cache.clave(str(archivo), 'otro-perfil') != clave
+    archivo.write_bytes(b'febrero')
+    assert cache.clave(str(archivo)) != clave
+
+
+def test_registro_interrumpido_no_deja_entrada(tmp_path):
+    cache = CacheResultados(str(tmp_path), 1024 * 1024, '1')
+    registro = cache.registrar('parcial', iter([{'a': 1}, {'a': 2}]))
+    next(registro)
+    registro.close()
+
+    assert cache.leer('parcial') is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_elimina_las_entradas_menos_usadas(tmp_path):
+    cache = CacheResultados(str(tmp_path), 10 ** 9, '1')
+    for i, clave in enumerate(['vieja', 'usada', 'nueva']):
+        list(cache.registrar(clave, iter(['x' * 100])))
+        os.utime(tmp_path / f'{clave}.json', (1000 + i, 1000 + i))
+    # Leer una entrada la marca como usada recientemente
+    cache.leer('vieja')
+
+    cache.max_bytes = 2 * os.path.getsize(tmp_path / 'nueva.json')
+    cache.depurar()
+    assert sorted(os.listdir(tmp_path)) == ['nueva.json', 'vieja.json']
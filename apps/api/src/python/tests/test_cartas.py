@@ -0,0 +1,54 @@
+import datetime
+import zipfile
+
+import pytest
+
+from etl_cartas import cargar_plantillas, generar_cartas, monto_en_letras, planificar_cartas
+from etl_unidades import Unidad
+
+
+@pytest.mark.parametrize('monto, letras', [
+    (0, 'CERO PESOS M/CTE'),
+    (1, 'UN PESO M/CTE'),
+    (21, 'VEINTIÚN PESOS M/CTE'),
+    (100, 'CIEN PESOS M/CTE'),
+    (101, 'CIENTO UN PESOS M/CTE'),
+    (1000, 'MIL PESOS M/CTE'),
+    (21000, 'VEINTIÚN MIL PESOS M/CTE'),
+    (1000000, 'UN MILLÓN DE PESOS M/CTE'),
+    (1200000, 'UN MILLÓN DOSCIENTOS MIL PESOS M/CTE'),
+    (21000000, 'VEINTIÚN MILLONES DE PESOS M/CTE'),
+    (1554749, 'UN MILLÓN QUINIENTOS CINCUENTA Y CUATRO MIL SETECIENTOS CUARENTA Y NUEVE PESOS M/CTE'),
+    (1000000000, 'MIL MILLONES DE PESOS M/CTE'),
+    (1500000000, 'MIL QUINIENTOS MILLONES DE PESOS M/CTE'),
+    (2500000000000, 'DOS BILLONES QUINIENTOS MIL MILLONES DE PESOS M/CTE'),
+    (-985000, 'MENOS NOVECIENTOS OCHENTA Y CINCO MIL PESOS M/CTE'),
+])
+def test_monto_en_letras(monto, letras):
+    assert monto_en_letras(monto) == letras
+
+
+def test_centavos_se_redondean_como_formato_pesos():
+    assert monto_en_letras(1554749.6) == monto_en_letras(1554750)
+    assert monto_en_letras(999.4) == 'NOVECIENTOS NOVENTA Y NUEVE PESOS M/CTE'
+
+
+def test_genera_un_pdf_por_carta(tmp_path):
+    pytest.importorskip('reportlab')
+    unidades = [
+        Unidad('L102', 'MUSIDIN SAS', 4214517.0, 1032000.0, 8232.0, -3700000.0, 1554749.0, 522749.0, 0.51, 'MORA_BAJA', 'CS'),
+        Unidad('L103', 'ANA', 0.0, 985000.0, 0.0, 0.0, 985000.0, 0.0, 0.0, 'AL_DIA', 'AD'),
+        Unidad('L104', 'LUIS', 9000000.0, 1000000.0, 500000.0, 0.0, 1500000000.0, 1499000000.0, 14.0, 'CRITICO', 'AB'),
+    ]
+    plantillas = cargar_plantillas()
+    cartas, siguiente = planificar_cartas(unidades, list(plantillas), fecha=datetime.date(2026, 1, 8))
+
+    assert [(tipo, consecutivo) for tipo, consecutivo, *_ in cartas] == [('CS', 1), ('AB', 1)]
+    assert siguiente['CS'] == 2
+
+    salida = tmp_path / 'cartas.zip'
+    generar_cartas(cartas, str(salida), plantillas, workers=1)
+    with zipfile.ZipFile(salida) as archivo:
+        nombres = archivo.namelist()
+        assert len(nombres) == 2
+        assert all(archivo.read(nombre).startswith(b'%PDF') for nombre in nombres)
@@ -0,0 +1,40 @@
+import pytest
+
+import etl_engine
+from conftest import REPORTE_EJEMPLO
+from etl_columnar import exportar_reporte, leer_historial
+from etl_engine import analizar_reporte
+from etl_unidades import CAMPOS_ANALISIS, CAMPOS_FINANCIEROS
+
+pytest.importorskip('pyarrow')
+
+
+def test_columnas_vuelven_iguales_desde_parquet(tmp_path, monkeypatch):
+    monkeypatch.setattr(etl_engine, 'cache', None)
+    destino = str(tmp_path / 'historial')
+
+    resumen = exportar_reporte(REPORTE_EJEMPLO, destino, 'ciudad-jardin')
+    assert (resumen['period'], resumen['units']) == ('2026-01', 13)
+
+    filas = leer_historial(destino, 'ciudad-jardin').to_pylist()
+    unidades = analizar_reporte(REPORTE_EJEMPLO, usar_cache=False)
+    campos = ('unit_number', 'owner_name') + CAMPOS_FINANCIEROS + CAMPOS_ANALISIS
+    assert [{campo: fila[campo] for campo in campos} for fila in filas] == \
+        [{campo: getattr(unidad, campo) for campo in campos} for unidad in unidades]
+    assert {(fila['complex'], fila['period']) for fila in filas} == {('ciudad-jardin', '2026-01')}
+
+
+def test_reexportar_reemplaza_solo_su_particion(tmp_path, monkeypatch):
+    monkeypatch.setattr(etl_engine, 'cache', None)
+    destino = str(tmp_path / 'historial')
+    exportar_reporte(REPORTE_EJEMPLO, destino, 'ciudad-jardin')
+    exportar_reporte(REPORTE_EJEMPLO, destino, 'ciudad-jardin', periodo='2026-02')
+    exportar_reporte(REPORTE_EJEMPLO, destino, 'ciudad-jardin', periodo='2026-02')
+
+    assert leer_historial(destino).num_rows == 26
+    assert leer_historial(destino, desde='2026-02').num_rows == 13
+
+
+def test_periodo_obligatorio_si_el_nombre_no_lo_trae(tmp_path):
+    with pytest.raises(ValueError, match='--period'):
+        exportar_reporte(str(tmp_path / 'reporte.xls'), str(tmp_path / 'historial'), 'ciudad-jardin')
@@ -0,0 +1,54 @@
+import pytest
+
+from etl_conciliacion import IndiceConciliacion, clave_unidad
+from etl_unidades import Unidad
+
+
+def unidad(numero, propietario):
+    return Unidad(numero, propietario, 0.0, 1000.0, 0.0, 0.0, 1000.0, 0.0, 0.0, 'AL_DIA', 'AD')
+
+
+@pytest.mark.parametrize('identificador, clave', [
+    ('L102', 'L102'),
+    ('Local 102', 'L102'),
+    ('LOCAL: L-102', 'L102'),
+    ('l-0102', 'L102'),
+    ('OF 0203', 'OF203'),
+    ('Oficina 203', 'OF203'),
+    ('APARTAMENTO 501 B', 'APTO501B'),
+    ('Depósito 3', 'D3'),
+    ('102', '102'),
+])
+def test_clave_unidad(identificador, clave):
+    assert clave_unidad(identificador) == clave
+
+
+def test_unidad_sin_tipo_cruza_por_numero_si_no_es_ambigua():
+    indice = IndiceConciliacion([{'identifier': 'Local 102', 'ownerName': 'ANA'}, {'identifier': 'OF 7', 'ownerName': 'LUIS'}, {'identifier': 'L7', 'ownerName': 'EVA'}])
+    assert indice.buscar_unidad('102') == [0]
+    assert indice.buscar_unidad('7') == []
+
+
+def test_umbral_mismo_propietario():
+    indice = IndiceConciliacion([
+        {'id': 'u1', 'identifier': 'L105', 'ownerName': 'MARTHA CECILIA RESTREPO'},
+        {'id': 'u2', 'identifier': 'L106', 'ownerName': 'MARTHA CECILIA RESTREPO'},
+    ])
+    # Dice 0.8 (mismas personas, un nombre menos) y 0.42 (otra persona)
+    resultado = indice.conciliar([unidad('Local 105', 'MARTHA RESTREPO'), unidad('L-106', 'CECILIA GOMEZ')])
+    assert [(u['key'], u['status']) for u in resultado['units']] == [('L105', 'matched'), ('L106', 'owner_changed')]
+    assert resultado['units'][0]['owner_similarity'] == 0.8
+
+
+def test_sugerencia_solo_sobre_el_umbral():
+    indice = IndiceConciliacion([
+        {'id': 'u1', 'identifier': 'L201', 'ownerName': 'SOCIEDAD DE ACTIVOS ESPECIALES'},
+        {'id': 'u2', 'identifier': 'L202', 'ownerName': 'OSCAR BURITICA'},
+    ])
+    # 0.94 sugiere la unidad registrada; 0.76 queda por debajo de UMBRAL_SUGERENCIA
+    resultado = indice.conciliar([unidad('L301', 'SOCIEDAD ACTIVOS ESPECIALES SAE'), unidad('L302', 'OSCAR BURITICA SANTIAGO')])
+    nueva, sin_sugerencia = resultado['units']
+    assert nueva['status'] == sin_sugerencia['status'] == 'new_unit'
+    assert nueva['suggestion']['unit_id'] == 'u1'
+    assert 'suggestion' not in sin_sugerencia
+    assert resultado['stats']['missing'] == 2
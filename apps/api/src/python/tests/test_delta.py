@@ -0,0 +1,65 @@
+import re
+
+import pytest
+
+import etl_engine
+from conftest import REPORTE_EJEMPLO
+from etl_cache import CacheResultados
+from etl_delta import cargar_previas, delta_reporte
+
+
+def reporte_mes_siguiente(ruta, unidad_cambiada):
+    """Copia del reporte de ejemplo con otras fechas y otros números de cuenta de cobro
+    en todos los bloques, y el total a pagar de `unidad_cambiada` aumentado en 1000"""
+    xlrd = pytest.importorskip('xlrd')
+    xlwt = pytest.importorskip('xlwt')
+    hoja = xlrd.open_workbook(REPORTE_EJEMPLO).sheet_by_index(0)
+    libro = xlwt.Workbook()
+    salida = libro.add_sheet(hoja.name)
+    en_unidad = False
+    for i in range(hoja.nrows):
+        fila = hoja.row_values(i)
+        if any(isinstance(valor, str) and valor.startswith('LOCAL:') for valor in fila):
+            en_unidad = f'LOCAL: {unidad_cambiada}' in fila
+        for j, valor in enumerate(fila):
+            if isinstance(valor, str):
+                valor = valor.replace('Enero', 'Febrero').replace('Ene/', 'Feb/')
+                valor = re.sub(r'(Cuenta de Cobro # )(\d+)', lambda m: m.group(1) + str(int(m.group(2)) + 13).zfill(5), valor)
+            elif en_unidad and 'Total a pagar' in fila:
+                valor += 1000
+            if valor != '':
+                salida.write(i, j, valor)
+    libro.save(ruta)
+
+
+@pytest.fixture
+def cache_temporal(tmp_path, monkeypatch):
+    monkeypatch.setattr(etl_engine, 'cache', CacheResultados(str(tmp_path / 'cache'), 10 * 1024 * 1024, etl_engine.VERSION_MOTOR))
+
+
+def test_reporte_anterior_desde_el_cache_trae_huellas(cache_temporal):
+    cargar_previas(REPORTE_EJEMPLO)
+    previas = cargar_previas(REPORTE_EJEMPLO)
+    assert etl_engine.cache.hits == 1
+    assert all(unidad.fingerprint for unidad in previas)
+
+
+def test_periodo_nuevo_reutiliza_los_bloques_con_los_mismos_montos(tmp_path, cache_temporal):
+    nuevo = str(tmp_path / 'FACT FEB-26.xls')
+    reporte_mes_siguiente(nuevo, 'L103')
+    cargar_previas(REPORTE_EJEMPLO)
+
+    resultado = delta_reporte(nuevo, cargar_previas(REPORTE_EJEMPLO))
+
+    assert resultado['stats'] == {'units': 13, 'reused': 12, 'reprocessed': 1}
+    cambiada = next(unidad for unidad in resultado['units'] if unidad.unit_number == 'L103')
+    assert cambiada.total_debt == 985000.0 + 1000
+    assert resultado['diff']['new_units'] == resultado['diff']['removed_units'] == []
+
+
+def test_reutilizar_da_lo_mismo_que_analizar_de_nuevo(tmp_path, cache_temporal):
+    nuevo = str(tmp_path / 'FACT FEB-26.xls')
+    reporte_mes_siguiente(nuevo, 'L103')
+
+    incremental = delta_reporte(nuevo, cargar_previas(REPORTE_EJEMPLO))['units']
+    assert incremental == list(etl_engine.unidades_reporte(nuevo, usar_cache=False))
@@ -0,0 +1,14 @@
+from conftest import REPORTE_EJEMPLO
+from etl_engine import ejecutar_trabajo
+
+
+def test_fallo_de_un_paso_opcional_conserva_el_analisis(tmp_path):
+    respuesta = ejecutar_trabajo({
+        'id': 'j1', 'file': REPORTE_EJEMPLO, 'cache': False,
+        'reconcile': {'directory': str(tmp_path / 'no-existe.csv')},
+    })
+
+    assert 'error' not in respuesta
+    assert len(respuesta['result']) == 13
+    assert respuesta['summary']['units'] == 13
+    assert 'No such file' in respuesta['reconciliation']['error']
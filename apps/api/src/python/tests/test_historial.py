@@ -0,0 +1,41 @@
+import shutil
+
+from conftest import REPORTE_EJEMPLO
+from etl_engine import ejecutar_trabajo
+from etl_historial import HistorialCartera, ruta_por_defecto
+from etl_unidades import Unidad
+
+
+def unidad(numero, total):
+    return Unidad(numero, 'ANA', 0.0, 1000.0, 0.0, 0.0, total, max(total - 1000.0, 0.0), 0.0, 'AL_DIA', 'AD')
+
+
+def test_unidad_repetida_cuenta_una_vez(tmp_path):
+    historial = HistorialCartera(str(tmp_path / 'historial.db'))
+    unidades = [unidad('L101', 1000.0), unidad('L102', 2500.0), unidad('L101', 3000.0)]
+
+    resultado = historial.registrar(unidades, 'c1', '2026-01')
+
+    assert resultado['units'] == 2
+    assert historial.periodos('c1')[0]['units'] == 2
+    assert [fila['total_debt'] for fila in historial.serie_unidad('c1', 'L101')] == [3000.0]
+
+
+def test_base_por_defecto_fuera_del_directorio_temporal(tmp_path, monkeypatch):
+    monkeypatch.delenv('ETL_HISTORY_DB', raising=False)
+    monkeypatch.setenv('XDG_DATA_HOME', str(tmp_path / 'datos'))
+    monkeypatch.setattr('os.name', 'posix')
+    assert ruta_por_defecto() == str(tmp_path / 'datos' / 'cartera-lc' / 'historial-cartera.db')
+
+
+def test_fallo_del_historial_conserva_el_analisis(tmp_path):
+    # Sin --period y con un nombre sin periodo: el historial falla, el análisis no
+    reporte = tmp_path / 'reporte.xls'
+    shutil.copy(REPORTE_EJEMPLO, reporte)
+    respuesta = ejecutar_trabajo({
+        'id': 'j1', 'file': str(reporte), 'cache': False,
+        'history': {'complex': 'c1', 'db': str(tmp_path / 'historial.db')},
+    })
+
+    assert len(respuesta['result']) == 13
+    assert 'Cannot infer the period' in respuesta['history']['error']
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import time
+
+import etl_jobs
+from conftest import REPORTE_EJEMPLO
+from etl_jobs import ColaTrabajos, ejecutar_cola
+
+
+def test_trabajo_termina_con_resumen(tmp_path):
+    cola = ColaTrabajos(str(tmp_path / 'jobs.db'))
+    id_trabajo = cola.encolar(REPORTE_EJEMPLO)
+
+    asyncio.run(ejecutar_cola(cola, concurrencia=1, una_vez=True))
+
+    trabajo = cola.estado(id_trabajo)
+    assert trabajo['status'] == 'done'
+    assert trabajo['units'] == 13
+    with open(trabajo['output'], encoding='utf-8') as f:
+        assert len(f.readlines()) == 13
+    assert not [nombre for nombre in os.listdir(tmp_path) if nombre.endswith('.tmp')]
+
+
+def test_fallo_a_mitad_del_reporte_no_deja_salida_parcial(tmp_path, monkeypatch):
+    # Motor que entrega una unidad y luego falla
+    motor = tmp_path / 'motor.py'
+    motor.write_text('import sys\nprint(\'{"unit_number": "L102"}\', flush=True)\nsys.exit("Corrupt sheet")\n')
+    monkeypatch.setattr(etl_jobs, 'MOTOR', str(motor))
+    cola = ColaTrabajos(str(tmp_path / 'cola' / 'jobs.db'))
+    id_trabajo = cola.encolar(REPORTE_EJEMPLO)
+
+    asyncio.run(asyncio.wait_for(ejecutar_cola(cola, concurrencia=1, una_vez=True), timeout=10))
+
+    trabajo = cola.estado(id_trabajo)
+    assert trabajo['status'] == 'failed'
+    assert 'Corrupt sheet' in trabajo['error']
+    assert trabajo['output'] is None
+    assert not [nombre for nombre in os.listdir(tmp_path / 'cola') if 'ndjson' in nombre]
+
+
+def test_fallo_al_lanzar_el_motor_queda_registrado(tmp_path, monkeypatch):
+    cola = ColaTrabajos(str(tmp_path / 'jobs.db'))
+    id_trabajo = cola.encolar(REPORTE_EJEMPLO)
+    monkeypatch.setattr(etl_jobs.sys, 'executable', str(tmp_path / 'no-existe' / 'python'))
+
+    asyncio.run(asyncio.wait_for(ejecutar_cola(cola, concurrencia=1, una_vez=True), timeout=10))
+
+    trabajo = cola.estado(id_trabajo)
+    assert trabajo['status'] == 'failed'
+    assert 'no-existe' in trabajo['error']
+    assert trabajo['finished_at'] is not None
+
+
+def test_solo_se_reencolan_trabajos_sin_latido(tmp_path):
+    ruta = str(tmp_path / 'jobs.db')
+    otro = ColaTrabajos(ruta)
+    vivo = otro.encolar(REPORTE_EJEMPLO)
+    abandonado = otro.encolar(REPORTE_EJEMPLO)
+    otro.tomar()
+    otro.tomar()
+    # El ejecutor del segundo trabajo dejó de dar latidos hace rato
+    otro.actualizar(abandonado, heartbeat_at=time.time() - etl_jobs.PLAZO_LATIDO - 1)
+
+    ColaTrabajos(ruta).reencolar_interrumpidos()
+
+    assert otro.estado(vivo)['status'] == 'running'
+    assert otro.estado(abandonado)['status'] == 'queued'
+    assert otro.estado(abandonado)['runner'] is None
+
+
+def test_ejecutor_anterior_no_pisa_un_trabajo_retomado(tmp_path):
+    ruta = str(tmp_path / 'jobs.db')
+    primero = ColaTrabajos(ruta)
+    id_trabajo = primero.encolar(REPORTE_EJEMPLO)
+    primero.tomar()
+    primero.actualizar(id_trabajo, heartbeat_at=0)
+    segundo = ColaTrabajos(ruta)
+    segundo.reencolar_interrumpidos()
+    segundo.tomar()
+
+    primero.actualizar(id_trabajo, status='failed', error='tarde')
+
+    assert segundo.estado(id_trabajo)['status'] == 'running'
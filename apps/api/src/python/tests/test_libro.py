@@ -0,0 +1,45 @@
+import pytest
+
+import etl_engine
+from benchmarks.generar_reporte import generar_reporte, iterar_filas
+from etl_engine import analizar_reporte
+from etl_libro import analizar_libro
+
+
+@pytest.fixture
+def libro(tmp_path):
+    """Libro con dos hojas de reportes sintéticos y una hoja de notas sin formato reconocido"""
+    openpyxl = pytest.importorskip('openpyxl')
+    libro = openpyxl.Workbook(write_only=True)
+    for nombre, unidades, semilla in (('Torre A', 5, 1), ('Notas', 0, 0), ('Torre B', 8, 2)):
+        hoja = libro.create_sheet(nombre)
+        if nombre == 'Notas':
+            hoja.append(['Reportes de cartera de enero'])
+            continue
+        for fila in iterar_filas(unidades, 4, semilla, False):
+            hoja.append(fila)
+        # El mismo reporte como archivo suelto, para comparar
+        generar_reporte(str(tmp_path / f'{nombre}.xlsx'), unidades, semilla=semilla)
+    ruta = str(tmp_path / 'CARTERA ENE-26.xlsx')
+    libro.save(ruta)
+    return ruta
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_cada_hoja_da_lo_mismo_que_su_reporte_suelto(libro, tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(etl_engine, 'cache', None)
+    resultado = analizar_libro(libro, workers=workers)
+
+    hojas = {hoja['sheet']: hoja for hoja in resultado['sheets']}
+    assert list(hojas) == ['Torre A', 'Notas', 'Torre B']
+    assert not hojas['Notas']['recognized'] and 'units' not in hojas['Notas']
+    for nombre, unidades in (('Torre A', 5), ('Torre B', 8)):
+        hoja = hojas[nombre]
+        assert (hoja['layout'], hoja['period'], hoja['period_source']) == ('diprosoft', '2026-01', 'content')
+        assert hoja['units'] == analizar_reporte(str(tmp_path / f'{nombre}.xlsx'), usar_cache=False)
+        assert hoja['summary']['units'] == unidades
+
+
+def test_libro_inexistente(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        analizar_libro(str(tmp_path / 'no-existe.xlsx'))
@@ -0,0 +1,41 @@
+import math
+
+import pytest
+
+from etl_montos import normalizar_montos
+
+
+@pytest.mark.parametrize('texto, monto', [
+    ('1.234.567,89', 1234567.89),
+    ('1,234,567.89', 1234567.89),
+    ('$ 1.234.567', 1234567.0),
+    ('$1,234', 1234.0),
+    ('1234,5', 1234.5),
+    ('1234.56', 1234.56),
+    ('COP 2.500.000', 2500000.0),
+    ('(1.000)', -1000.0),
+    ('($1.000)', -1000.0),
+    ('$ (1.000)', -1000.0),
+    ('1.234.567-', -1234567.0),
+    ('-$ 1.000', -1000.0),
+    ('$-1.000', -1000.0),
+    ('+1.000', 1000.0),
+])
+def test_montos_en_texto(texto, monto):
+    montos, no_reconocidas = normalizar_montos([texto])
+    assert montos[0] == monto
+    assert not no_reconocidas[0]
+
+
+@pytest.mark.parametrize('texto', ['$12.34.5', '(1.000', '((1.000)', '-(1.000)', '-1.000-', '$ (1.000)-'])
+def test_parecen_montos_pero_no_se_interpretan(texto):
+    montos, no_reconocidas = normalizar_montos([texto])
+    assert math.isnan(montos[0])
+    assert no_reconocidas[0]
+
+
+def test_texto_que_no_es_monto_y_numeros_de_documento():
+    montos, no_reconocidas = normalizar_montos(['Recibos de caja', '01560', None], exigir_marca=True)
+    assert all(math.isnan(monto) for monto in montos)
+    assert not no_reconocidas.any()
+    assert normalizar_montos(['01560'])[0][0] == 1560.0
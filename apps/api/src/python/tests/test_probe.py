@@ -0,0 +1,91 @@
+import zipfile
+from xml.sax.saxutils import escape
+
+import pytest
+
+from benchmarks.generar_reporte import generar_reporte
+from conftest import REPORTE_EJEMPLO
+from etl_probe import sondear_reporte
+
+
+def test_reporte_corto_cuenta_todas_las_cabeceras():
+    sondeo = sondear_reporte(REPORTE_EJEMPLO)
+    assert sondeo['layout'] == 'diprosoft'
+    assert (sondeo['period'], sondeo['nit']) == ('2026-01', '800239591-0')
+    assert (sondeo['rows'], sondeo['estimated_units']) == (626, 13)
+
+
+def test_xlsx_con_dimension_estima_unidades_desde_la_cabeza(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    ruta = str(tmp_path / 'reporte.xlsx')
+    generar_reporte(ruta, 100)
+    # Guardado normal (no write_only): escribe <dimension>
+    libro = openpyxl.load_workbook(ruta)
+    libro.save(ruta)
+    sondeo = sondear_reporte(ruta)
+    assert sondeo['rows'] == libro.active.max_row
+    assert sondeo['sampled_rows'] == 300
+    assert abs(sondeo['estimated_units'] - 100) <= 100 * 0.15
+
+
+def test_xlsx_sin_dimension(tmp_path):
+    # openpyxl en modo write_only no escribe <dimension>
+    ruta = str(tmp_path / 'corto.xlsx')
+    filas = generar_reporte(ruta, 5)
+    sondeo = sondear_reporte(ruta)
+    assert (sondeo['rows'], sondeo['estimated_units']) == (filas, 5)
+
+    # Más larga que la cabeza: no se recorre el resto para contar filas
+    ruta = str(tmp_path / 'largo.xlsx')
+    generar_reporte(ruta, 100)
+    sondeo = sondear_reporte(ruta)
+    assert sondeo['recognized']
+    assert (sondeo['rows'], sondeo['estimated_units'], sondeo['sampled_rows']) == (None, None, 300)
+
+
+def xlsx_con_prefijos(ruta, filas):
+    """.xlsx mínimo con el espacio de nombres de la hoja en el prefijo 'x:' y texto en celdas inlineStr"""
+    ns = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+    rel = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+    celdas = []
+    for i, fila in enumerate(filas, start=1):
+        xml = []
+        for j, valor in enumerate(fila):
+            ref = f'{chr(65 + j)}{i}'
+            if isinstance(valor, str):
+                xml.append(f'<x:c r="{ref}" t="inlineStr"><x:is><x:t xml:space="preserve">{escape(valor)}</x:t></x:is></x:c>')
+            else:
+                xml.append(f'<x:c r="{ref}"><x:v>{valor}</x:v></x:c>')
+        celdas.append(f'<x:row r="{i}">{"".join(xml)}</x:row>')
+    with zipfile.ZipFile(ruta, 'w') as archivo:
+        archivo.writestr('[Content_Types].xml',
+                         '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                         '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                         '<Default Extension="xml" ContentType="application/xml"/>'
+                         '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                         '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                         '</Types>')
+        archivo.writestr('_rels/.rels',
+                         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                         f'<Relationship Id="rId1" Type="{rel}/officeDocument" Target="xl/workbook.xml"/></Relationships>')
+        archivo.writestr('xl/workbook.xml',
+                         f'<x:workbook xmlns:x="{ns}" xmlns:r="{rel}"><x:sheets>'
+                         '<x:sheet name="Hoja1" sheetId="1" r:id="rId1"/></x:sheets></x:workbook>')
+        archivo.writestr('xl/_rels/workbook.xml.rels',
+                         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                         f'<Relationship Id="rId1" Type="{rel}/worksheet" Target="worksheets/sheet1.xml"/></Relationships>')
+        archivo.writestr('xl/worksheets/sheet1.xml',
+                         f'<x:worksheet xmlns:x="{ns}"><x:sheetData>{"".join(celdas)}</x:sheetData></x:worksheet>')
+
+
+def test_xlsx_con_prefijos_y_texto_en_linea(tmp_path):
+    xlrd = pytest.importorskip('xlrd')
+    hoja = xlrd.open_workbook(REPORTE_EJEMPLO).sheet_by_index(0)
+    # Las dos primeras unidades del reporte de ejemplo
+    ruta = str(tmp_path / 'prefijos.xlsx')
+    xlsx_con_prefijos(ruta, [hoja.row_values(i) for i in range(52)])
+
+    sondeo = sondear_reporte(ruta)
+    assert sondeo['layout'] == 'diprosoft'
+    assert (sondeo['period'], sondeo['nit']) == ('2026-01', '800239591-0')
+    assert (sondeo['rows'], sondeo['estimated_units']) == (52, 2)
@@ -0,0 +1,30 @@
+import copy
+import json
+
+from etl_profiles import FILA_CABECERA, FILA_SALDO, FILA_TOTAL, PerfilCompilado, ruta_perfil
+
+
+def perfil_con_etiquetas(labels):
+    with open(ruta_perfil('diprosoft'), 'r', encoding='utf-8') as f:
+        config = copy.deepcopy(json.load(f))
+    config['labels'] = labels
+    return PerfilCompilado(config)
+
+
+def test_palabra_contenida_en_otra_conserva_ambas_etiquetas():
+    perfil = perfil_con_etiquetas({'prev_balance': ['Saldo anterior'], 'total': ['Saldo']})
+    etiquetas = perfil.etiquetar(['Saldo anterior 4214517.0', 'Saldo 10', 'Cuota 5'])
+    assert etiquetas.tolist() == [FILA_SALDO | FILA_TOTAL, FILA_TOTAL, 0]
+
+
+def test_palabras_solapadas_conservan_ambas_etiquetas():
+    # "LOCAL: A" y "A Saldo" comparten la "A": una sola alternativa las consumiría juntas
+    perfil = perfil_con_etiquetas({'header': ['LOCAL: A'], 'prev_balance': ['A Saldo']})
+    etiquetas = perfil.etiquetar(['LOCAL: A Saldo'])
+    assert etiquetas.tolist() == [FILA_CABECERA | FILA_SALDO]
+
+
+def test_perfil_incluido_etiqueta_una_fila_por_etiqueta():
+    perfil = perfil_con_etiquetas({'header': ['LOCAL:', 'OF:'], 'total': ['Total a pagar', 'Total  a  pagar']})
+    etiquetas = perfil.etiquetar(['LOCAL: L102 Cuenta de Cobro', 'Total  a  pagar 1554749.0', None])
+    assert etiquetas.tolist() == [FILA_CABECERA, FILA_TOTAL, 0]
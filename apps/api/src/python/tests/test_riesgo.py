@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from etl_riesgo import EscalaMora, ReglasMora, kpis_cartera
+from etl_unidades import Unidad
+
+
+def test_max_incluye_el_limite_y_below_no():
+    escala = EscalaMora([{'label': 'A', 'max': 1}, {'label': 'B', 'below': 3}, {'label': 'C'}])
+    edades = np.array([0.0, 1.0, 1.01, 2.99, 3.0, 100.0])
+    assert escala.aplicar(edades).tolist() == ['A', 'A', 'B', 'B', 'C', 'C']
+
+
+def test_primera_regla_que_cumple_gana():
+    escala = EscalaMora([{'label': 'A', 'below': 5}, {'label': 'B', 'max': 2}, {'label': 'C'}])
+    assert escala.aplicar(np.array([1.0, 6.0])).tolist() == ['A', 'C']
+
+
+@pytest.mark.parametrize('reglas', [
+    [],
+    [{'label': 'A', 'max': 1}],
+    [{'label': 'A'}, {'label': 'B', 'below': 2}],
+])
+def test_ultima_regla_sin_limite(reglas):
+    with pytest.raises(ValueError, match='no limit'):
+        EscalaMora(reglas)
+
+
+def test_clasificacion_por_defecto():
+    deuda, edades, estados, cartas = ReglasMora().clasificar(
+        [1000.0, 2000.0, 3000.0, 7000.0, 500.0, 500.0],
+        [1000.0, 1000.0, 1000.0, 1000.0, 1000.0, 0.0])
+    assert deuda == [0.0, 1000.0, 2000.0, 6000.0, 0.0, 500.0]
+    assert edades == [0.0, 1.0, 2.0, 6.0, 0.0, 0.0]
+    assert estados == ['AL_DIA', 'MORA_BAJA', 'MORA_MODERADA', 'CRITICO', 'AL_DIA', 'AL_DIA']
+    assert cartas == ['AD', 'CS', 'CP', 'AB', 'AD', 'AD']
+
+
+def test_indicadores_de_la_cartera():
+    unidades = [Unidad('L1', 'A', 0, 0, 0, 0, 3000.0, 2000.0, 2.0, 'MORA_MODERADA', 'CP'),
+                Unidad('L2', 'B', 0, 0, 0, 0, 1000.0, 0.0, 0.0, 'AL_DIA', 'AD')]
+    kpis = kpis_cartera(iter(unidades))
+    assert (kpis['units'], kpis['total_debt'], kpis['overdue_amount']) == (2, 4000.0, 2000.0)
+    assert kpis['action_classes'] == {'AD': 1, 'CS': 0, 'CP': 1, 'AB': 0}
+    assert kpis['aging_histogram'] == {'0': 1, '0-1': 0, '1-2': 1, '2-3': 0, '3-6': 0, '6-12': 0, '12+': 0}
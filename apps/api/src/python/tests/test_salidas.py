@@ -0,0 +1,44 @@
+import io
+import json
+
+import etl_engine
+from conftest import REPORTE_EJEMPLO
+from etl_engine import analizar_reporte
+from etl_salidas import ESCRITORES, escribir_salidas, leer_analisis
+from etl_unidades import a_json
+
+
+def test_una_lectura_da_las_unidades_del_motor_y_la_estructura(monkeypatch):
+    monkeypatch.setattr(etl_engine, 'cache', None)
+    analisis = leer_analisis(REPORTE_EJEMPLO)
+
+    assert analisis['units'] == analizar_reporte(REPORTE_EJEMPLO, usar_cache=False)
+    assert (analisis['period'], analisis['nit']) == ('2026-01', '800239591-0')
+    assert analisis['summary']['units'] == 13
+    estructura = analisis['structure']
+    assert len(estructura['unit_rows']) == 10
+    assert estructura['unit_rows'][0]['unit'] == 'L102'
+    # La unidad de ejemplo termina antes de la cabecera de la segunda
+    assert all(fila['row'] < estructura['unit_rows'][1]['row'] for fila in estructura['example'])
+
+
+def test_escritores_sobre_el_mismo_analisis(tmp_path):
+    analisis = leer_analisis(REPORTE_EJEMPLO)
+    escribir_salidas(analisis, {'json': str(tmp_path / 'analisis.json'), 'markdown': str(tmp_path / 'ANALISIS.md')})
+
+    with open(tmp_path / 'analisis.json', encoding='utf-8') as f:
+        salida = json.load(f)
+    assert salida['units'] == json.loads(json.dumps(analisis['units'], default=a_json))
+    assert 'structure' not in salida
+
+    markdown = (tmp_path / 'ANALISIS.md').read_text(encoding='utf-8')
+    assert '**NIT:** 800239591-0' in markdown
+    assert '**Total Unidades:** 13' in markdown
+    # Tabla maestra: encabezado y una fila por unidad
+    tabla = markdown.split('## RESUMEN DE CARTERA')[0]
+    assert sum(1 for linea in tabla.splitlines() if linea.startswith('| ')) == 1 + 13
+
+    estructura = io.StringIO()
+    ESCRITORES['structure'](analisis, estructura)
+    assert 'UNIDADES ENCONTRADAS: 13' in estructura.getvalue()
+    assert '... y 3 más' in estructura.getvalue()
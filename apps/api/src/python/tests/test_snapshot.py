@@ -0,0 +1,69 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import etl_cache
+from conftest import REPORTE_EJEMPLO
+from etl_profiles import ruta_perfil
+from etl_snapshot import Snapshot, reclasificar, ruta_snapshot
+
+
+@pytest.fixture
+def reporte(tmp_path):
+    ruta = str(tmp_path / 'FACT ENE-26.xls')
+    shutil.copy(REPORTE_EJEMPLO, ruta)
+    return ruta
+
+
+def test_reclasificar_crea_la_instantanea_si_falta(reporte):
+    resultado = reclasificar(reporte)
+    assert resultado['units'] == 13
+    assert os.path.isdir(ruta_snapshot(reporte))
+
+
+def test_instantanea_de_otro_motor_se_rechaza_y_se_rehace(reporte):
+    reclasificar(reporte)
+    meta = os.path.join(ruta_snapshot(reporte), 'meta.json')
+    with open(meta, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    with open(meta, 'w', encoding='utf-8') as f:
+        json.dump({**datos, 'engine_version': '0'}, f)
+
+    with pytest.raises(ValueError, match="engine version 0"):
+        Snapshot(ruta_snapshot(reporte))
+    assert reclasificar(reporte)['units'] == 13
+    assert Snapshot(reporte).meta['engine_version'] != '0'
+
+
+def test_reporte_modificado_invalida_la_instantanea(reporte):
+    reclasificar(reporte)
+    with open(reporte, 'ab') as f:
+        f.write(b'\0')
+
+    with pytest.raises(ValueError, match="report changed"):
+        Snapshot(ruta_snapshot(reporte))
+
+
+def test_otro_perfil_rehace_la_instantanea(reporte, tmp_path):
+    reclasificar(reporte)
+    with open(ruta_perfil('diprosoft'), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    otro = tmp_path / 'otro.json'
+    otro.write_text(json.dumps({**config, 'name': 'otro'}), encoding='utf-8')
+
+    with pytest.raises(ValueError, match="built with layout"):
+        Snapshot(ruta_snapshot(reporte), str(otro))
+    reclasificar(reporte, perfil=str(otro))
+    assert Snapshot(reporte, str(otro)).meta['layout'] == str(otro)
+
+
+def test_reclasificar_lee_el_reporte_una_vez(reporte, monkeypatch):
+    reclasificar(reporte)
+    leidos = []
+    original = etl_cache.hash_archivo
+    monkeypatch.setattr(etl_cache, 'hash_archivo', lambda ruta: leidos.append(ruta) or original(ruta))
+
+    reclasificar(reporte)
+    assert leidos == [reporte]
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from etl_unidades import Unidad, a_json, a_json_con_huella
+
+FORMA_JSON = {
+    'unit_number': 'L102',
+    'owner_name': 'MUSIDIN SAS',
+    'financials': {'prev_balance': 4214517.0, 'current_fee': 1032000.0, 'interest': 8232.0,
+                   'adjustments': 0.0, 'total_debt': 1554749.0},
+    'analysis': {'overdue_amount': 522749.0, 'months_overdue': 0.51, 'risk_status': 'MORA_BAJA',
+                 'action_class': 'CS'},
+}
+
+
+def test_registro_con_slots_sin_dict():
+    unidad = Unidad.desde_dict(FORMA_JSON)
+    assert not hasattr(unidad, '__dict__')
+    with pytest.raises(AttributeError):
+        unidad.campo_nuevo = 1
+
+
+def test_forma_json_ida_y_vuelta():
+    unidad = Unidad.desde_dict({**FORMA_JSON, 'fingerprint': 'abc'})
+    assert json.loads(json.dumps([unidad], default=a_json)) == [FORMA_JSON]
+    assert json.loads(json.dumps(unidad, default=a_json_con_huella)) == {**FORMA_JSON, 'fingerprint': 'abc'}
+    assert Unidad.desde_dict(json.loads(json.dumps(unidad, default=a_json_con_huella))) == unidad
+
+
+def test_otros_objetos_no_se_serializan():
+    with pytest.raises(TypeError, match='set'):
+        json.dumps({1, 2}, default=a_json_con_huella)
@@ -5,6 +5,7 @@ import multer from 'multer';
 import path from 'path';
 import fs from 'fs';
 import { ExcelParser } from '../services/etl/ExcelParser';
+import { EtlJobQueue } from '../services/etl/EtlJobQueue';
 
 const router = Router();
 
@@ -25,6 +26,38 @@ const storage = multer.diskStorage({
 
 const upload = multer({ storage: storage });
 const parser = new ExcelParser();
+const jobs = new EtlJobQueue();
+
+// Sondea el archivo antes del análisis completo; responde 422 si el formato no se reconoce
+async function rejectUnrecognized(filePath: string, res: any): Promise<boolean> {
+    let probe;
+    try {
+        probe = await parser.probe(filePath);
+    } catch (error: any) {
+        res.status(422).json({ error: `Unreadable report: ${error.message}` });
+        return true;
+    }
+    if (probe.recognized) return false;
+    res.status(422).json({ error: 'Unrecognized report layout', probe });
+    return true;
+}
+
+// POST /api/upload/probe
+// Validación rápida: perfil, periodo, NIT y unidades estimadas sin analizar el archivo
+router.post('/probe', upload.single('file'), async (req, res) => {
+    try {
+        if (!req.file) {
+            res.status(400).json({ error: 'No file uploaded' });
+            return;
+        }
+
+        res.json({ fileId: req.file.filename, probe: await parser.probe(req.file.path) });
+
+    } catch (error: any) {
+        console.error('Error probing file:', error);
+        res.status(500).json({ error: error.message || 'Internal server error' });
+    }
+});
 
 // POST /api/upload/analyze
 // Recibe un archivo, lo analiza con Python y devuelve el JSON (Staging Data)
@@ -37,15 +70,20 @@ router.post('/analyze', upload.single('file'), async (req, res) => {
 
         const filePath = req.file.path;
         console.log(`Analyzing file: ${filePath}`);
+        if (await rejectUnrecognized(filePath, res)) return;
 
-        // Llamar al motor ETL
-        const analysisResult = await parser.parse(filePath);
+        // Llamar al motor ETL (con propertyId también cruza las unidades con las registradas;
+        // con snapshot=true deja la instantánea para reclasificar sin releer el Excel)
+        const snapshot = req.body?.snapshot === true || req.body?.snapshot === 'true';
+        const { units, summary, reconciliation } = await parser.analyze(filePath, req.body?.propertyId, snapshot);
 
         // Devolver resultado para revisión (Bloque 2)
         res.json({
             message: 'File analyzed successfully',
             fileId: req.file.filename,
-            data: analysisResult
+            data: units,
+            summary,
+            reconciliation
         });
 
     } catch (error: any) {
@@ -54,4 +92,85 @@ router.post('/analyze', upload.single('file'), async (req, res) => {
     }
 });
 
+// POST /api/upload/reclassify
+// Recalcula la clasificación de un archivo ya analizado con otras reglas de mora ({fileId, aging, units?})
+router.post('/reclassify', async (req, res) => {
+    try {
+        const { fileId, aging, units } = req.body || {};
+        if (!fileId || !aging) {
+            res.status(400).json({ error: 'fileId and aging are required' });
+            return;
+        }
+
+        const filePath = path.join(process.cwd(), 'uploads', path.basename(fileId));
+        res.json(await parser.reclassify(filePath, aging, Boolean(units)));
+
+    } catch (error: any) {
+        console.error('Error reclassifying file:', error);
+        res.status(500).json({ error: error.message || 'Internal server error' });
+    }
+});
+
+// POST /api/upload/workbook
+// Libro con un edificio o un mes por hoja: unidades e indicadores agrupados por hoja
+router.post('/workbook', upload.single('file'), async (req, res) => {
+    try {
+        if (!req.file) {
+            res.status(400).json({ error: 'No file uploaded' });
+            return;
+        }
+
+        const workbook = await parser.analyzeSheets(req.file.path);
+        if (!workbook.sheets.some(sheet => sheet.recognized)) {
+            res.status(422).json({ error: 'No sheet with a recognized report layout', sheets: workbook.sheets });
+            return;
+        }
+        res.json({ fileId: req.file.filename, ...workbook });
+
+    } catch (error: any) {
+        console.error('Error analyzing workbook:', error);
+        res.status(500).json({ error: error.message || 'Internal server error' });
+    }
+});
+
+// POST /api/upload/jobs
+// Encola el análisis y responde de inmediato con el id del trabajo
+router.post('/jobs', upload.single('file'), async (req, res) => {
+    try {
+        if (!req.file) {
+            res.status(400).json({ error: 'No file uploaded' });
+            return;
+        }
+
+        if (await rejectUnrecognized(req.file.path, res)) return;
+
+        const jobId = await jobs.submit(req.file.path);
+        res.status(202).json({ jobId, fileId: req.file.filename });
+
+    } catch (error: any) {
+        console.error('Error queuing file:', error);
+        res.status(500).json({ error: error.message || 'Internal server error' });
+    }
+});
+
+// GET /api/upload/jobs/:id
+// Estado del trabajo: filas y unidades procesadas, resumen al terminar
+router.get('/jobs/:id', async (req, res) => {
+    try {
+        res.json(await jobs.status(req.params.id));
+    } catch (error: any) {
+        res.status(404).json({ error: error.message || 'Job not found' });
+    }
+});
+
+// DELETE /api/upload/jobs/:id
+// Cancela el trabajo (en cola o en curso)
+router.delete('/jobs/:id', async (req, res) => {
+    try {
+        res.json(await jobs.cancel(req.params.id));
+    } catch (error: any) {
+        res.status(404).json({ error: error.message || 'Job not found' });
+    }
+});
+
 export default router;
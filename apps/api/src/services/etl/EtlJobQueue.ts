@@ -0,0 +1,80 @@
+import { spawn, execFile, ChildProcess } from 'child_process';
+import path from 'path';
+import { ETLSummary } from './ExcelParser';
+
+export type EtlJobStatus = 'queued' | 'running' | 'done' | 'failed' | 'cancelled';
+
+export interface EtlJobState {
+    id: string;
+    file: string;
+    layout: string;
+    status: EtlJobStatus;
+    rows: number;
+    units: number;
+    cancel_requested: boolean;
+    output: string | null;
+    summary: ETLSummary | null;
+    error: string | null;
+    created_at: number;
+    started_at: number | null;
+    finished_at: number | null;
+}
+
+const jobsScript = path.resolve(process.cwd(), 'src/python/etl_jobs.py');
+
+// Cola local de análisis (etl_jobs.py): los trabajos quedan en SQLite y un
+// ejecutor `run` los procesa en segundo plano; la API solo encola y consulta.
+export class EtlJobQueue {
+    private runner: ChildProcess | null = null;
+
+    async submit(filePath: string): Promise<string> {
+        const { id } = await this.call(['submit', filePath]);
+        this.ensureRunner();
+        return id;
+    }
+
+    status(id: string): Promise<EtlJobState> {
+        return this.call(['status', id]);
+    }
+
+    cancel(id: string): Promise<EtlJobState> {
+        return this.call(['cancel', id]);
+    }
+
+    shutdown() {
+        this.runner?.kill();
+        this.runner = null;
+    }
+
+    // El ejecutor se inicia con el primer trabajo y se reinicia si termina
+    private ensureRunner() {
+        if (this.runner) return;
+        console.log(`Starting ETL job runner: ${jobsScript}`);
+        const child = spawn('python', [jobsScript, 'run'], { stdio: ['ignore', 'ignore', 'pipe'] });
+        child.stderr!.on('data', (data) => console.error(`ETL job runner: ${data}`));
+        child.on('exit', (code) => {
+            console.error(`ETL job runner exited with code ${code}`);
+            if (this.runner === child) this.runner = null;
+        });
+        this.runner = child;
+    }
+
+    private call(args: string[]): Promise<any> {
+        return new Promise((resolve, reject) => {
+            execFile('python', [jobsScript, ...args], (error, stdout, stderr) => {
+                let response: any;
+                try {
+                    response = JSON.parse(stdout);
+                } catch (e) {
+                    reject(new Error(`Failed to parse Python output: ${stdout || stderr}`));
+                    return;
+                }
+                if (response.error) {
+                    reject(new Error(response.error));
+                } else {
+                    resolve(response);
+                }
+            });
+        });
+    }
+}
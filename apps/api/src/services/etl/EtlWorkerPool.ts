@@ -0,0 +1,110 @@
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
+import readline from 'readline';
+
+interface EtlJob {
+    id: number;
+    filePath: string;
+    options: Record<string, any>;
+    resolve: (result: any) => void;
+    reject: (error: Error) => void;
+}
+
+interface EtlWorker {
+    process: ChildProcessWithoutNullStreams;
+    current: EtlJob | null;
+    stderr: string;
+}
+
+// Pool de procesos `etl_engine.py --serve` residentes.
+// Cada worker atiende un trabajo a la vez; el resto espera en cola.
+export class EtlWorkerPool {
+    private workers: EtlWorker[] = [];
+    private queue: EtlJob[] = [];
+    private nextId = 1;
+
+    constructor(
+        private pythonScript: string,
+        private size: number = Number(process.env.ETL_POOL_SIZE) || 2
+    ) { }
+
+    // Resuelve con { result, summary, reconciliation? } (unidades, indicadores y cruce con las unidades registradas).
+    // `options` se agrega al trabajo (p. ej. { probe: true } para solo sondear el archivo)
+    run(filePath: string, options: Record<string, any> = {}): Promise<{ result: any, summary?: any, reconciliation?: any }> {
+        return new Promise((resolve, reject) => {
+            this.queue.push({ id: this.nextId++, filePath, options, resolve, reject });
+            this.dispatch();
+        });
+    }
+
+    shutdown() {
+        for (const worker of this.workers) {
+            worker.process.stdin.end();
+        }
+        this.workers = [];
+    }
+
+    private dispatch() {
+        while (this.queue.length > 0) {
+            const worker = this.workers.find(w => w.current === null)
+                || (this.workers.length < this.size ? this.spawnWorker() : null);
+            if (!worker) return;
+
+            const job = this.queue.shift()!;
+            worker.current = job;
+            worker.process.stdin.write(JSON.stringify({ ...job.options, id: job.id, file: job.filePath }) + '\n');
+        }
+    }
+
+    private spawnWorker(): EtlWorker {
+        console.log(`Starting ETL worker: ${this.pythonScript}`);
+        const child = spawn('python', [this.pythonScript, '--serve']);
+        const worker: EtlWorker = { process: child, current: null, stderr: '' };
+
+        readline.createInterface({ input: child.stdout }).on('line', (line) => {
+            const job = worker.current;
+            if (!job) return;
+
+            let response: any;
+            try {
+                response = JSON.parse(line);
+            } catch (e) {
+                job.reject(new Error(`Failed to parse Python output: ${line}`));
+                worker.current = null;
+                this.dispatch();
+                return;
+            }
+            if (response.id !== job.id) return;
+
+            worker.current = null;
+            worker.stderr = '';
+            // Con ETL_PROFILE=1 el worker agrega los tiempos por etapa de cada trabajo
+            if (response.metrics) {
+                console.log(`ETL metrics ${job.filePath}: ${JSON.stringify(response.metrics)}`);
+            }
+            if (response.error) {
+                job.reject(new Error(response.error));
+            } else {
+                job.resolve({ result: response.result, summary: response.summary, reconciliation: response.reconciliation });
+            }
+            this.dispatch();
+        });
+
+        child.stderr.on('data', (data) => {
+            worker.stderr += data.toString();
+        });
+
+        const onExit = (reason: string) => {
+            this.workers = this.workers.filter(w => w !== worker);
+            if (worker.current) {
+                worker.current.reject(new Error(`Python worker ${reason}: ${worker.stderr}`));
+                worker.current = null;
+            }
+            this.dispatch();
+        };
+        child.on('exit', (code) => onExit(`exited with code ${code}`));
+        child.on('error', (err) => onExit(`failed: ${err.message}`));
+
+        this.workers.push(worker);
+        return worker;
+    }
+}
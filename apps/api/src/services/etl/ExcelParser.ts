@@ -1,6 +1,8 @@
 
 import { spawn } from 'child_process';
 import path from 'path';
+import readline from 'readline';
+import { EtlWorkerPool } from './EtlWorkerPool';
 
 export interface ETLResult {
     unit_number: string;
@@ -20,19 +22,138 @@ export interface ETLResult {
     };
 }
 
+export interface ETLSummary {
+    units: number;
+    action_classes: Record<string, number>;
+    risk_status: Record<string, number>;
+    total_debt: number;
+    overdue_amount: number;
+    aging_histogram: Record<string, number>;
+}
+
+export interface ETLReconciledUnit {
+    unit_number: string;
+    key: string;
+    owner_name: string;
+    status: 'matched' | 'owner_changed' | 'owner_unknown' | 'new_unit';
+    unit_id?: string | null;
+    identifier?: string;
+    registered_owner?: string | null;
+    owner_similarity?: number;
+    suggestion?: { unit_id: string | null, identifier: string, registered_owner: string | null, owner_similarity: number };
+}
+
+export interface ETLReconciliation {
+    units: ETLReconciledUnit[];
+    missing_units: { unit_id: string | null, identifier: string, registered_owner: string | null }[];
+    stats: Record<string, number>;
+}
+
+export interface ETLProbe {
+    layout: string | null;
+    recognized: boolean;
+    period: string | null;
+    period_source: 'content' | 'filename' | null;
+    nit: string | null;
+    complex_name: string | null;
+    rows: number | null;
+    estimated_units: number | null;
+    sampled_rows: number;
+    elapsed_ms: number;
+}
+
+export interface ETLReclassification {
+    snapshot: string;
+    units: number;
+    summary: ETLSummary;
+    changed_units?: number;
+    action_class_changes?: Record<string, number>;
+    risk_status_changes?: Record<string, number>;
+    result?: ETLResult[];
+    elapsed_ms: number;
+}
+
+export interface ETLSheet {
+    index: number;
+    sheet: string;
+    layout: string | null;
+    recognized: boolean;
+    period: string | null;
+    period_source: 'content' | 'sheet_name' | 'filename' | null;
+    nit: string | null;
+    complex_name: string | null;
+    units?: ETLResult[];
+    summary?: ETLSummary;
+}
+
+export interface ETLWorkbook {
+    file: string;
+    sheets: ETLSheet[];
+    elapsed_ms: number;
+}
+
+// Assuming api root is the cwd when running locally
+const pythonScript = path.resolve(process.cwd(), 'src/python/etl_engine.py');
+
+// Workers compartidos por todas las instancias: pandas se importa una sola vez por worker
+const pool = new EtlWorkerPool(pythonScript);
+
 export class ExcelParser {
     async parse(filePath: string): Promise<ETLResult[]> {
+        return (await pool.run(filePath)).result;
+    }
+
+    // Unidades e indicadores de la cartera, calculados por el motor en la misma pasada.
+    // Con `complexId` también las cruza con las unidades registradas del conjunto (tabla Unit);
+    // si el cruce falla, `reconciliation` trae { error } y las unidades igual llegan.
+    // Con `snapshot` deja la instantánea (<archivo>.snap) para reclasificar después sin volver a leer el Excel
+    async analyze(filePath: string, complexId?: string, snapshot = false): Promise<{ units: ETLResult[], summary: ETLSummary, reconciliation?: ETLReconciliation | { error: string } }> {
+        const options: Record<string, any> = {};
+        if (snapshot) options.snapshot = true;
+        if (complexId) options.reconcile = { complex_id: complexId };
+        const { result, summary, reconciliation } = await pool.run(filePath, options);
+        return { units: result, summary, reconciliation };
+    }
+
+    // Reglas de mora nuevas sobre la instantánea del análisis (etl_snapshot.py): indicadores y cambios, en milisegundos.
+    // Si la instantánea falta o está vencida (otro archivo u otra versión del motor) el motor la crea primero
+    async reclassify(filePath: string, aging: Record<string, unknown>, units = false): Promise<ETLReclassification> {
+        return (await pool.run(filePath, { reclassify: { aging, units } })).result;
+    }
+
+    // Sondeo rápido (etl_probe.py): perfil, periodo, NIT y unidades estimadas sin analizar el archivo
+    async probe(filePath: string): Promise<ETLProbe> {
+        return (await pool.run(filePath, { probe: true })).result;
+    }
+
+    // Libros con varias hojas (etl_libro.py): cada hoja reconocida se analiza en paralelo y se entrega con su periodo y conjunto
+    async analyzeSheets(filePath: string): Promise<ETLWorkbook> {
+        return (await pool.run(filePath, { sheets: true })).result;
+    }
+
+    // Modo --ndjson: entrega cada unidad apenas el motor la analiza
+    async parseStream(filePath: string, onUnit: (unit: ETLResult) => void): Promise<ETLSummary> {
         return new Promise((resolve, reject) => {
-            // Assuming api root is the cwd when running locally
-            const pythonScript = path.resolve(process.cwd(), 'src/python/etl_engine.py');
-            console.log(`Executing python script at: ${pythonScript}`);
-            const pythonProcess = spawn('python', [pythonScript, filePath]);
+            const pythonProcess = spawn('python', [pythonScript, '--ndjson', filePath]);
 
-            let dataString = '';
+            let summary: ETLSummary | null = null;
+            let failure: Error | null = null;
             let errorString = '';
 
-            pythonProcess.stdout.on('data', (data) => {
-                dataString += data.toString();
+            readline.createInterface({ input: pythonProcess.stdout }).on('line', (line) => {
+                if (!line || failure) return;
+                try {
+                    const message = JSON.parse(line);
+                    if (message.error) {
+                        failure = new Error(message.error);
+                    } else if (message.summary) {
+                        summary = message.summary;
+                    } else {
+                        onUnit(message);
+                    }
+                } catch (e) {
+                    failure = new Error(`Failed to parse Python output: ${line}`);
+                }
             });
 
             pythonProcess.stderr.on('data', (data) => {
@@ -42,20 +163,19 @@ export class ExcelParser {
             pythonProcess.on('close', (code) => {
                 if (code !== 0) {
                     reject(new Error(`Python process exited with code ${code}: ${errorString}`));
-                    return;
-                }
-
-                try {
-                    const results = JSON.parse(dataString);
-                    if (results.error) {
-                        reject(new Error(results.error));
-                    } else {
-                        resolve(results);
-                    }
-                } catch (e) {
-                    reject(new Error(`Failed to parse Python output: ${dataString}`));
+                } else if (failure) {
+                    reject(failure);
+                } else if (!summary) {
+                    reject(new Error('Python process ended without a summary'));
+                } else {
+                    resolve(summary);
                 }
             });
         });
     }
+
+    // Cierra los workers (para scripts que deben terminar al acabar)
+    close() {
+        pool.shutdown();
+    }
 }
@@ -19,6 +19,8 @@ async function test() {
         }
     } catch (error) {
         console.error('Error parsing file:', error);
+    } finally {
+        parser.close();
     }
 }
 
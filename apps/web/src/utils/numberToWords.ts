@@ -5,7 +5,7 @@
 const UNIDADES = ['', 'UN ', 'DOS ', 'TRES ', 'CUATRO ', 'CINCO ', 'SEIS ', 'SIETE ', 'OCHO ', 'NUEVE '];
 const DECENAS = ['', 'DIEZ ', 'VEINTE ', 'TREINTA ', 'CUARENTA ', 'CINCUENTA ', 'SESENTA ', 'SETENTA ', 'OCHENTA ', 'NOVENTA '];
 const DIEZ_DIEZ = ['DIEZ ', 'ONCE ', 'DOCE ', 'TRECE ', 'CATORCE ', 'QUINCE ', 'DIECISEIS ', 'DIECISIETE ', 'DIECIOCHO ', 'DIECINUEVE '];
-const VEINTE_VEINTE = ['VEINTE ', 'VEINTIUNO ', 'VEINTIDOS ', 'VEINTITRES ', 'VEINTICUATRO ', 'VEINTICINCO ', 'VEINTISEIS ', 'VEINTISIETE ', 'VEINTIOCHO ', 'VEINTINUEVE '];
+const VEINTE_VEINTE = ['VEINTE ', 'VEINTIÚN ', 'VEINTIDOS ', 'VEINTITRES ', 'VEINTICUATRO ', 'VEINTICINCO ', 'VEINTISEIS ', 'VEINTISIETE ', 'VEINTIOCHO ', 'VEINTINUEVE '];
 const CENTENAS = ['', 'CIENTO ', 'DOSCIENTOS ', 'TRESCIENTOS ', 'CUATROCIENTOS ', 'QUINIENTOS ', 'SEISCIENTOS ', 'SETECIENTOS ', 'OCHOCIENTOS ', 'NOVECIENTOS '];
 
 function leerTresDígitos(n: number): string {
@@ -39,35 +39,51 @@ function leerTresDígitos(n: number): string {
     return output;
 }
 
-export function numberToWords(n: number): string {
-    if (n === 0) return 'CERO';
-    if (n < 0) return 'MENOS ' + numberToWords(Math.abs(n));
-
+// De 1 a 999.999
+function leerMenorMillon(n: number): string {
     let output = '';
-
-    const millones = Math.floor(n / 1000000);
-    const miles = Math.floor((n % 1000000) / 1000);
-    const resto = Math.floor(n % 1000);
-
-    if (millones > 0) {
-        if (millones === 1) {
-            output += 'UN MILLÓN ';
-        } else {
-            output += leerTresDígitos(millones) + 'MILLONES ';
-        }
-    }
+    const miles = Math.floor(n / 1000);
+    const resto = n % 1000;
 
     if (miles > 0) {
-        if (miles === 1) {
-            output += 'MIL ';
-        } else {
-            output += leerTresDígitos(miles) + 'MIL ';
-        }
+        output += miles === 1 ? 'MIL ' : leerTresDígitos(miles) + 'MIL ';
     }
-
     if (resto > 0) {
         output += leerTresDígitos(resto);
     }
+    return output;
+}
+
+// Entero positivo: los millones y billones se leen como grupos de hasta seis cifras
+function leerEntero(n: number): string {
+    let output = '';
+    const billones = Math.floor(n / 1e12);
+    const millones = Math.floor((n % 1e12) / 1e6);
+    const resto = n % 1e6;
+
+    if (billones > 0) {
+        output += billones === 1 ? 'UN BILLÓN ' : leerEntero(billones) + 'BILLONES ';
+    }
+    if (millones > 0) {
+        output += millones === 1 ? 'UN MILLÓN ' : leerMenorMillon(millones) + 'MILLONES ';
+    }
+    if (resto > 0) {
+        output += leerMenorMillon(resto);
+    }
+    return output;
+}
 
-    return output.trim() + ' PESOS M/CTE';
+export function numberToWords(n: number): string {
+    // Al peso, como formatCurrency, para que las letras digan lo mismo que la cifra
+    n = Math.round(n);
+    if (n < 0) return 'MENOS ' + numberToWords(Math.abs(n));
+    if (n === 0) return 'CERO PESOS M/CTE';
+    if (n === 1) return 'UN PESO M/CTE';
+
+    let output = leerEntero(n);
+    // "Un millón de pesos", pero "un millón doscientos mil pesos"
+    if (n % 1e6 === 0) {
+        output += 'DE ';
+    }
+    return output + 'PESOS M/CTE';
 }